@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the NumPy reference QLKNN engine
+Measures rows/second and p50/p99 latency across batch sizes, dtypes and BLAS thread counts
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+# Environment variables honoured by the common BLAS backends
+BLAS_THREAD_VARIABLES = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                         'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS']
+
+DEFAULT_BATCH_SIZES = [1, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+
+def time_engine(engine, x, out, min_time: float, min_repeats: int, max_repeats: int) -> list:
+    """Per-call wall times (seconds) after one warm-up call"""
+    engine(x, out)
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < max_repeats:
+        t0 = time.perf_counter()
+        engine(x, out)
+        timings.append(time.perf_counter() - t0)
+        if len(timings) >= min_repeats and time.perf_counter() - start >= min_time:
+            break
+    return timings
+
+
+def run_worker(args) -> list:
+    """Benchmark every (dtype, batch size) in this process; BLAS threads are fixed by the environment"""
+    import numpy as np
+    from qlknn_int8 import QLKNNInt8
+    from qlknn_numpy import QLKNNNumpy, load_weights, sample_inputs
+
+    weights = load_weights(args.weights)
+    results = []
+    for dtype in args.dtypes:
+        if dtype == 'int8':
+            engine = QLKNNInt8.load(args.int8_weights)
+        else:
+            engine = QLKNNNumpy(weights, dtype=dtype)
+        for batch_size in args.batch_sizes:
+            x = sample_inputs(batch_size, seed=batch_size, dtype=engine.dtype)
+            out = np.empty((batch_size, engine.output_dim), dtype=engine.dtype)
+            timings = np.array(time_engine(engine, x, out, args.min_time, args.min_repeats, args.max_repeats))
+            p50, p99 = np.percentile(timings, [50, 99])
+            results.append({
+                'dtype': dtype,
+                'batch_size': batch_size,
+                'blas_threads': args.threads,
+                'repeats': len(timings),
+                'rows_per_second': batch_size / p50,
+                'latency_p50_ms': p50 * 1e3,
+                'latency_p99_ms': p99 * 1e3,
+                'latency_min_ms': timings.min() * 1e3,
+            })
+            print(f"  {dtype:>7}  threads={args.threads:<3} batch={batch_size:>9,}  "
+                  f"{batch_size / p50:>14,.0f} rows/s  p50={p50 * 1e3:9.3f} ms  p99={p99 * 1e3:9.3f} ms",
+                  file=sys.stderr)
+    return results
+
+
+def run_all(args) -> dict:
+    """Spawn one worker per BLAS thread count (thread pools are sized at numpy import)"""
+    import numpy as np
+
+    results = []
+    for threads in args.thread_counts:
+        env = dict(os.environ, **{name: str(threads) for name in BLAS_THREAD_VARIABLES})
+        command = [sys.executable, __file__, '--worker', '--threads', str(threads),
+                   '--weights', str(args.weights),
+                   '--batch-sizes', *map(str, args.batch_sizes), '--dtypes', *args.dtypes,
+                   '--min-time', str(args.min_time), '--min-repeats', str(args.min_repeats),
+                   '--max-repeats', str(args.max_repeats)]
+        if args.int8_weights:
+            command += ['--int8-weights', str(args.int8_weights)]
+        completed = subprocess.run(command, env=env, stdout=subprocess.PIPE, check=True, text=True)
+        results.extend(json.loads(completed.stdout))
+
+    return {
+        'benchmark': 'qlknn_numpy',
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'host': {
+            'node': platform.node(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'system': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+        },
+        'weights': str(args.weights),
+        'results': results,
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    from qlknn_numpy import DEFAULT_WEIGHTS
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--weights', default=str(DEFAULT_WEIGHTS))
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=DEFAULT_BATCH_SIZES)
+    parser.add_argument('--dtypes', nargs='+', default=['float32', 'float64'],
+                        choices=['float32', 'float64', 'int8'])
+    parser.add_argument('--int8-weights', help='<model>_weights_int8.safetensors for the int8 engine')
+    parser.add_argument('--thread-counts', type=int, nargs='+', default=[1, os.cpu_count()],
+                        help='BLAS thread counts to compare (default: single-threaded and all cores)')
+    parser.add_argument('--min-time', type=float, default=0.5, help='minimum measuring time per case [s]')
+    parser.add_argument('--min-repeats', type=int, default=5)
+    parser.add_argument('--max-repeats', type=int, default=10_000)
+    parser.add_argument('-o', '--output', help='write the JSON report here (default: stdout)')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--threads', type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        json.dump(run_worker(args), sys.stdout)
+        sys.exit(0)
+
+    if 'int8' in args.dtypes and not args.int8_weights:
+        parser.error("--dtypes int8 requires --int8-weights")
+    args.thread_counts = sorted(set(args.thread_counts))
+    report = run_all(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Saved benchmark report to {args.output}", file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=2)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for ONNX -> SafeTensors conversion
+Unchanged models are resolved from a stat index without parsing the ONNX protobuf
+"""
+
+from pathlib import Path
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+DEFAULT_CACHE_DIR = Path(os.environ.get('QLKNN_CONVERT_CACHE', Path.home() / '.cache' / 'qlknn-convert'))
+INDEX_NAME = 'index.json'
+INDEX_LOCK_NAME = 'index.lock'
+
+# Any edit to the conversion scripts changes the produced files, so it must change the cache key
+_CONVERTER_SOURCES = ['convert_onnx_to_safetensors.py', 'conversion_cache.py', 'qlknn_numpy.py',
+                      'qlknn_int8.py', 'qlknn_lowrank.py', 'qlknn_metadata.py', 'qlknn_ood.py']
+
+
+def _converter_fingerprint() -> str:
+    digest = hashlib.sha256()
+    for name in _CONVERTER_SOURCES:
+        digest.update((Path(__file__).resolve().parent / name).read_bytes())
+    return digest.hexdigest()
+
+
+def graph_hash(model, model_dir: Path) -> str:
+    """
+    SHA-256 over initializer bytes and graph topology
+
+    Covers initializer names, dtypes, shapes and payloads (raw, typed or
+    external data) plus every node's op, wiring and attributes and the graph
+    inputs/outputs. Doc strings and producer info are ignored.
+    """
+    import onnx
+
+    digest = hashlib.sha256()
+    graph = model.graph
+
+    for initializer in graph.initializer:
+        digest.update(f"init:{initializer.name}:{initializer.data_type}:{list(initializer.dims)}".encode())
+        if initializer.data_location == onnx.TensorProto.EXTERNAL:
+            info = {entry.key: entry.value for entry in initializer.external_data}
+            with open(model_dir / info['location'], 'rb') as f:
+                f.seek(int(info.get('offset', 0)))
+                digest.update(f.read(int(info['length'])) if 'length' in info else f.read())
+        elif initializer.raw_data:
+            digest.update(initializer.raw_data)
+        else:
+            digest.update(onnx.numpy_helper.to_array(initializer).tobytes())
+
+    for node in graph.node:
+        digest.update(f"node:{node.domain}:{node.op_type}:{list(node.input)}:{list(node.output)}".encode())
+        for attribute in sorted(node.attribute, key=lambda a: a.name):
+            digest.update(attribute.SerializeToString(deterministic=True))
+
+    for value in graph.input:
+        digest.update(f"input:{value.name}".encode())
+    for value in graph.output:
+        digest.update(f"output:{value.name}".encode())
+
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """
+    Cache of converted outputs keyed by (graph hash, model name, options, converter version)
+
+    Layout under `root`:
+      index.json               resolved source path -> {size, mtime_ns, graph_hash}
+      index.lock               flock guarding read-merge-write updates of index.json
+      objects/<key>/<files>    converted weights and metadata
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR):
+        self.root = Path(root)
+        self.objects = self.root / 'objects'
+        self._fingerprint = _converter_fingerprint()
+        self._index = self._load_index()
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self.root / INDEX_NAME) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _update_index(self, entries: dict):
+        """
+        Merge `entries` into index.json under an exclusive lock
+
+        Parallel workers each hold their own copy of the index, so the file is
+        re-read under the lock and only their entries are merged in; the write
+        itself is an atomic replace so readers never see a partial file.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / INDEX_LOCK_NAME, 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            index = self._load_index()
+            index.update(entries)
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(index, f, indent=2)
+            os.replace(tmp_path, self.root / INDEX_NAME)
+        self._index = index
+
+    def object_key(self, graph_digest: str, model_name: str, options: dict) -> str:
+        payload = json.dumps([graph_digest, model_name, options, self._fingerprint], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def lookup_graph_hash(self, onnx_path) -> str:
+        """Graph hash from the stat index, or None when the source changed or is unknown"""
+        path = Path(onnx_path).resolve()
+        entry = self._index.get(str(path))
+        if entry is None:
+            return None
+        stat = path.stat()
+        if entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+            return None
+        return entry['graph_hash']
+
+    def record_graph_hash(self, onnx_path, graph_digest: str):
+        path = Path(onnx_path).resolve()
+        stat = path.stat()
+        self._update_index({str(path): {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                        'graph_hash': graph_digest}})
+
+    @staticmethod
+    def _same_file_state(a: Path, b: Path) -> bool:
+        try:
+            sa, sb = a.stat(), b.stat()
+        except FileNotFoundError:
+            return False
+        return sa.st_size == sb.st_size and sa.st_mtime_ns == sb.st_mtime_ns
+
+    def materialize(self, key: str, output_dir) -> list:
+        """
+        Copy a cached object's files into `output_dir`
+
+        Returns the output paths, or None when the key is not cached (also
+        when a concurrent clear() removes the object mid-copy).
+        Files already matching the cached copy (size and mtime, preserved by
+        copy2) are left untouched, making the common case a few stat calls.
+        """
+        object_dir = self.objects / key
+        if not object_dir.is_dir():
+            return None
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        outputs = []
+        try:
+            for cached in sorted(object_dir.iterdir()):
+                target = output_dir / cached.name
+                if not self._same_file_state(cached, target):
+                    shutil.copy2(cached, target)
+                outputs.append(target)
+        except FileNotFoundError:
+            return None
+        return outputs
+
+    def store(self, key: str, files: list):
+        """Add converted files to the cache under `key` (atomic per object)"""
+        self.objects.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=self.objects, prefix='.staging-'))
+        for path in files:
+            shutil.copy2(path, staging / Path(path).name)
+        try:
+            os.rename(staging, self.objects / key)
+        except OSError:
+            # Another process stored the same key first
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        self._index = {}
@@ -6,77 +6,747 @@ SafeTensors is a safe, fast format supported by MLX natively
 
 import onnx
 import numpy as np
-from safetensors.numpy import save_file
 from pathlib import Path
 import json
+import struct
+import contextlib
+import functools
+import glob
+import hashlib
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def convert_onnx_to_safetensors(onnx_path: str, output_dir: str):
-    """Convert ONNX model to SafeTensors format"""
+from conversion_cache import ConversionCache, graph_hash
+from qlknn_int8 import calibrate, quantize
+from qlknn_lowrank import factorize
+from qlknn_metadata import write_metadata
+from qlknn_numpy import OUTPUT_NAMES, bfloat16_bits, sample_inputs
+from qlknn_ood import DEFAULT_QUANTILE, UNIFORM_BOX_SOURCE, fit as fit_ood
 
-    model = onnx.load(onnx_path)
+# Copy size for streaming tensors out of external-data files
+STREAM_CHUNK_BYTES = 16 * 1024 * 1024
 
-    # Extract all weights
-    weights = {}
-    for initializer in model.graph.initializer:
-        name = initializer.name
-        # Convert ONNX tensor to numpy
-        data = onnx.numpy_helper.to_array(initializer)
 
-        # Convert to float32
-        weights[name] = data.astype(np.float32)
-        print(f"{name}: {data.shape} ({data.dtype} -> float32)")
+# MARK: - Architecture extraction
+
+# Linear layer count QLKNNNetwork.load(weightsPath:) can load (hidden widths may differ per layer)
+SWIFT_LAYER_COUNT = 6
+
+
+def extract_architecture(model) -> list:
+    """
+    Derive the Linear layer stack from `model.graph.node`
+
+    Recognizes Gemm and MatMul(+Add) nodes whose weight operand is an
+    initializer, and marks a layer ReLU when its output feeds a Relu node.
+    Other ops (Split, Identity, ...) are ignored. Each layer records its
+    shape, activation, the source initializer names and whether the source
+    weight is [in, out] and must be transposed to the Linear [out, in] layout.
+    Canonical names follow the PyTorch Sequential indices, `_network.model.{2k}`.
+    """
+    initializers = {initializer.name: initializer for initializer in model.graph.initializer}
+    layers = []
+    producers = {}  # tensor name -> layer whose (pre-activation) output it is
+
+    for node in model.graph.node:
+        if node.op_type == 'Gemm':
+            attributes = {a.name: onnx.helper.get_attribute_value(a) for a in node.attribute}
+            if attributes.get('transA', 0) or attributes.get('alpha', 1.0) != 1.0 or attributes.get('beta', 1.0) != 1.0:
+                raise ValueError(f"Unsupported Gemm attributes on node '{node.name}': {attributes}")
+            weight = initializers.get(node.input[1])
+            if weight is None:
+                raise ValueError(f"Gemm node '{node.name}' weight '{node.input[1]}' is not an initializer")
+            transpose = not attributes.get('transB', 0)
+            rows, cols = weight.dims
+            bias = node.input[2] if len(node.input) > 2 and node.input[2] else None
+            layer = {'in': rows if transpose else cols, 'out': cols if transpose else rows,
+                     'activation': None, 'source_weight': weight.name, 'source_bias': bias, 'transpose': transpose}
+        elif node.op_type == 'MatMul' and node.input[1] in initializers:
+            rows, cols = initializers[node.input[1]].dims
+            layer = {'in': rows, 'out': cols, 'activation': None,
+                     'source_weight': node.input[1], 'source_bias': None, 'transpose': True}
+        elif node.op_type == 'Add':
+            operands = [name for name in node.input if name in producers]
+            constants = [name for name in node.input if name in initializers]
+            if len(operands) == 1 and len(constants) == 1 and producers[operands[0]]['source_bias'] is None:
+                producers[operands[0]]['source_bias'] = constants[0]
+                producers[node.output[0]] = producers[operands[0]]
+            continue
+        elif node.op_type == 'Relu' and node.input[0] in producers:
+            producers[node.input[0]]['activation'] = 'ReLU'
+            continue
+        else:
+            continue
+
+        if layers and layers[-1]['out'] != layer['in']:
+            raise ValueError(f"Layer {len(layers)} input {layer['in']} does not match previous output {layers[-1]['out']}")
+        layer['weight'] = f"_network.model.{2 * len(layers)}.weight"
+        layer['bias'] = f"_network.model.{2 * len(layers)}.bias"
+        layers.append(layer)
+        producers[node.output[0]] = layer
+
+    if not layers:
+        raise ValueError("No Gemm/MatMul layers found in the ONNX graph")
+
+    if len(layers) != SWIFT_LAYER_COUNT:
+        print(f"⚠️  {len(layers)} layers: QLKNNNetwork.load expects {SWIFT_LAYER_COUNT}")
+    return layers
+
+
+def graph_output_names(model, layers: list) -> list:
+    """
+    Output names in network column order
+
+    QLKNN graphs expose one output per flux, so their order is the column
+    order. Other layouts fall back to QLKNN.outputParameterNames.
+    """
+    names = [output.name for output in model.graph.output]
+    if len(names) == layers[-1]['out']:
+        return names
+    if layers[-1]['out'] == len(OUTPUT_NAMES):
+        return list(OUTPUT_NAMES)
+    return [f"output_{i}" for i in range(layers[-1]['out'])]
+
+
+def layer_arrays(model, layers: list) -> dict:
+    """Canonical float32 [out, in] weights and biases for the extracted layers"""
+    initializers = {initializer.name: initializer for initializer in model.graph.initializer}
+    arrays = {}
+    for layer in layers:
+        weight = onnx.numpy_helper.to_array(initializers[layer['source_weight']]).astype(np.float32)
+        arrays[layer['weight']] = np.ascontiguousarray(weight.T if layer['transpose'] else weight)
+        if layer['source_bias'] is None:
+            arrays[layer['bias']] = np.zeros(layer['out'], dtype=np.float32)
+        else:
+            bias = onnx.numpy_helper.to_array(initializers[layer['source_bias']]).astype(np.float32)
+            arrays[layer['bias']] = bias.reshape(layer['out'])
+    return arrays
+
+
+def print_model_info(metadata: dict, parameter_count: int):
+    """Display model info"""
+    print("\n=== Model Architecture ===")
+    print(f"Input: {metadata['input_names']}")
+    print(f"Output: {metadata['output_names']}")
+    print(f"Layers: {len(metadata['architecture']['layers'])}")
+    for layer in metadata['architecture']['layers']:
+        print(f"  Linear({layer['in']} → {layer['out']}){' + ReLU' if layer['activation'] else ''}")
+    print(f"Parameters: {parameter_count:,}")
+
+
+def convert_onnx_to_safetensors(onnx_path: str, output_dir: str, model_name: str = None, model=None,
+                                variants: dict = None):
+    """Convert ONNX model to SafeTensors format (plus any requested export variants)"""
+    from safetensors.numpy import save_file
+
+    model_name = model_name or Path(onnx_path).stem
+
+    if model is None:
+        model = onnx.load(onnx_path)
+    else:
+        onnx.external_data_helper.load_external_data_for_model(model, str(Path(onnx_path).resolve().parent))
+
+    # Extract layer weights under canonical names
+    layers = extract_architecture(model)
+    weights = layer_arrays(model, layers)
+    for layer in layers:
+        for kind in ('weight', 'bias'):
+            source = layer[f'source_{kind}'] or '(zeros)'
+            print(f"{source} -> {layer[kind]}: {weights[layer[kind]].shape}")
 
     # Save as SafeTensors
-    output_path = Path(output_dir) / "qlknn_7_11_weights.safetensors"
+    output_path = Path(output_dir) / f"{model_name}_weights.safetensors"
     save_file(weights, output_path)
     print(f"\n✅ Saved SafeTensors to {output_path}")
     print(f"   Total size: {output_path.stat().st_size / 1024:.2f} KB")
 
-    # Save metadata
-    metadata = {
-        'model_name': 'qlknn_7_11',
-        'architecture': {
-            'layers': [
-                {'type': 'Linear', 'in': 10, 'out': 133, 'activation': 'ReLU'},
-                {'type': 'Linear', 'in': 133, 'out': 133, 'activation': 'ReLU'},
-                {'type': 'Linear', 'in': 133, 'out': 133, 'activation': 'ReLU'},
-                {'type': 'Linear', 'in': 133, 'out': 133, 'activation': 'ReLU'},
-                {'type': 'Linear', 'in': 133, 'out': 133, 'activation': 'ReLU'},
-                {'type': 'Linear', 'in': 133, 'out': 8, 'activation': None}
-            ]
-        },
-        'input_names': ['Ati', 'Ate', 'Ane', 'Ani', 'q', 'smag', 'x', 'Ti_Te', 'LogNuStar', 'normni'],
-        'output_names': ['efiITG', 'efeITG', 'pfeITG', 'efeTEM', 'efiTEM', 'pfeTEM', 'efeETG', 'gamma_max'],
-        'weight_names': list(weights.keys()),
-        'precision': 'float32'
+    variant_paths, extra = export_variants(weights, layers, output_dir, model_name, variants)
+    metadata, metadata_path = write_metadata(output_dir, layers, weights.keys(), model_name, extra,
+                                             graph_output_names(model, layers))
+    print_model_info(metadata, sum(w.size for w in weights.values()))
+    return [output_path, metadata_path, *variant_paths]
+
+
+# MARK: - Streaming conversion
+
+def _external_data_info(initializer, model_dir: Path):
+    """(path, offset, length) of an initializer stored in an external-data file"""
+    info = {entry.key: entry.value for entry in initializer.external_data}
+    offset = int(info.get('offset', 0))
+    length = int(info['length']) if 'length' in info else None
+    return model_dir / info['location'], offset, length
+
+
+def _stream_file_range(path: Path, offset: int, length: int):
+    """Yield `length` bytes of `path` starting at `offset` in bounded chunks"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(STREAM_CHUNK_BYTES, remaining))
+            if not chunk:
+                raise IOError(f"Unexpected end of external data in {path}")
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _tensor_chunks(initializer, model_dir: Path, nbytes: int, transpose: bool = False):
+    """
+    Yield float32 little-endian bytes for one initializer
+
+    float32 tensors in the target layout are copied straight from `raw_data`
+    or the external-data file; anything else (other dtypes, [in, out] MatMul
+    weights) falls back to a numpy conversion of that single tensor.
+    """
+    is_float32 = initializer.data_type == onnx.TensorProto.FLOAT
+    is_external = initializer.data_location == onnx.TensorProto.EXTERNAL
+
+    if is_float32 and is_external and not transpose:
+        path, offset, length = _external_data_info(initializer, model_dir)
+        if length is not None and length != nbytes:
+            raise ValueError(f"{initializer.name}: external length {length} != expected {nbytes}")
+        yield from _stream_file_range(path, offset, nbytes)
+    elif is_float32 and initializer.raw_data and not transpose:
+        yield memoryview(initializer.raw_data)
+    else:
+        if is_external:
+            onnx.external_data_helper.load_external_data_for_tensor(initializer, str(model_dir))
+        data = onnx.numpy_helper.to_array(initializer)
+        if transpose:
+            data = data.T
+        yield np.ascontiguousarray(data, dtype='<f4').tobytes()
+
+
+def write_safetensors_header(f, entries: list):
+    """
+    Write the SafeTensors header for (name, dtype, shape, nbytes) entries
+
+    Tensor payloads must then be written in the same order, back to back.
+    """
+    header = {}
+    offset = 0
+    for name, dtype, shape, nbytes in entries:
+        header[name] = {'dtype': dtype, 'shape': list(shape), 'data_offsets': [offset, offset + nbytes]}
+        offset += nbytes
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    # Pad with spaces so the payload starts 8-byte aligned
+    header_bytes += b' ' * (-len(header_bytes) % 8)
+    f.write(struct.pack('<Q', len(header_bytes)))
+    f.write(header_bytes)
+
+
+def convert_onnx_to_safetensors_streaming(onnx_path: str, output_dir: str, model_name: str = None, model=None,
+                                          variants: dict = None):
+    """
+    Convert ONNX model to SafeTensors without materializing the weights
+
+    The header is written first from initializer shapes, then each tensor is
+    copied directly from its ONNX buffer, so peak memory is the protobuf itself
+    (or a single chunk when weights live in external-data files).
+    Export variants, if requested, are built from one float32 copy afterwards.
+    """
+    model_name = model_name or Path(onnx_path).stem
+    model_dir = Path(onnx_path).resolve().parent
+    if model is None:
+        model = onnx.load(onnx_path, load_external_data=False)
+    initializers = {initializer.name: initializer for initializer in model.graph.initializer}
+    layers = extract_architecture(model)
+
+    # (canonical name, shape, source initializer or None for a zero bias, transpose)
+    tensors = []
+    for layer in layers:
+        tensors.append((layer['weight'], (layer['out'], layer['in']),
+                        initializers[layer['source_weight']], layer['transpose']))
+        tensors.append((layer['bias'], (layer['out'],), initializers.get(layer['source_bias']), False))
+    entries = [(name, 'F32', shape, int(np.prod(shape)) * 4) for name, shape, _, _ in tensors]
+    for (name, shape, initializer, _) in tensors:
+        source = initializer.name if initializer is not None else '(zeros)'
+        print(f"{source} -> {name}: {shape}")
+
+    output_path = Path(output_dir) / f"{model_name}_weights.safetensors"
+    with open(output_path, 'wb') as f:
+        write_safetensors_header(f, entries)
+        for (name, _, initializer, transpose), (_, _, _, nbytes) in zip(tensors, entries):
+            if initializer is None:
+                f.write(bytes(nbytes))
+                continue
+            written = 0
+            for chunk in _tensor_chunks(initializer, model_dir, nbytes, transpose):
+                f.write(chunk)
+                written += len(chunk)
+            if written != nbytes:
+                raise ValueError(f"{name}: wrote {written} bytes, expected {nbytes}")
+
+    print(f"\n✅ Streamed SafeTensors to {output_path}")
+    print(f"   Total size: {output_path.stat().st_size / 1024:.2f} KB")
+
+    variant_paths, extra = [], {}
+    if variants:
+        onnx.external_data_helper.load_external_data_for_model(model, str(model_dir))
+        variant_paths, extra = export_variants(layer_arrays(model, layers), layers, output_dir, model_name, variants)
+
+    metadata, metadata_path = write_metadata(output_dir, layers, [name for name, _, _, _ in entries], model_name,
+                                             extra, graph_output_names(model, layers))
+    print_model_info(metadata, sum(nbytes // 4 for _, _, _, nbytes in entries))
+    return [output_path, metadata_path, *variant_paths]
+
+
+# MARK: - Export variants
+
+PACKED_ALIGNMENT = 64
+
+
+def _aligned(offset: int, alignment: int = PACKED_ALIGNMENT) -> int:
+    return -(-offset // alignment) * alignment
+
+
+def write_packed(weights: dict, layers: list, output_dir: str, model_name: str):
+    """
+    Pack all weights and biases into one contiguous float32 blob
+
+    Every tensor starts on a 64-byte boundary; the byte offsets and shapes are
+    returned for the metadata so loaders can mmap `<model>_packed.bin` once and
+    slice zero-copy views instead of parsing a container format.
+    """
+    tensors = {}
+    offset = 0
+    for layer in layers:
+        for name in (layer['weight'], layer['bias']):
+            offset = _aligned(offset)
+            tensors[name] = {'offset': offset, 'shape': list(weights[name].shape)}
+            offset += weights[name].nbytes
+    size = _aligned(offset)
+
+    packed_path = Path(output_dir) / f"{model_name}_packed.bin"
+    with open(packed_path, 'wb') as f:
+        for name, entry in tensors.items():
+            f.seek(entry['offset'])
+            f.write(np.ascontiguousarray(weights[name], dtype='<f4').tobytes())
+        f.truncate(size)
+    print(f"✅ Saved packed weights to {packed_path} ({size / 1024:.2f} KB)")
+
+    layout = {'file': packed_path.name, 'alignment': PACKED_ALIGNMENT, 'dtype': 'float32',
+              'size': size, 'tensors': tensors}
+    return [packed_path], {'packed': layout}
+
+
+# precision -> SafeTensors dtype tag
+HALF_PRECISIONS = {'float16': 'F16', 'bfloat16': 'BF16'}
+
+
+def _half_precision_bytes(array: np.ndarray, precision: str) -> bytes:
+    if precision == 'float16':
+        return np.ascontiguousarray(array, dtype='<f2').tobytes()
+    return bfloat16_bits(array).tobytes()
+
+
+def write_half_precision(weights: dict, layers: list, output_dir: str, model_name: str, precision: str = 'float16'):
+    """
+    Write `<model>_weights_<precision>.safetensors` with 16-bit weights
+
+    Same tensor names and shapes as the float32 file, so loaders only see a
+    different dtype tag. float16 rounds to nearest; bfloat16 keeps the float32
+    exponent and rounds the mantissa to nearest even.
+    """
+    if precision not in HALF_PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}'. Available: {sorted(HALF_PRECISIONS)}")
+
+    names = [name for layer in layers for name in (layer['weight'], layer['bias'])]
+    payloads = [_half_precision_bytes(weights[name], precision) for name in names]
+    entries = [(name, HALF_PRECISIONS[precision], weights[name].shape, len(payload))
+               for name, payload in zip(names, payloads)]
+
+    output_path = Path(output_dir) / f"{model_name}_weights_{precision}.safetensors"
+    with open(output_path, 'wb') as f:
+        write_safetensors_header(f, entries)
+        for payload in payloads:
+            f.write(payload)
+    print(f"✅ Saved {precision} weights to {output_path} ({output_path.stat().st_size / 1024:.2f} KB)")
+
+    return [output_path], {precision: {'file': output_path.name, 'dtype': HALF_PRECISIONS[precision]}}
+
+
+def write_int8(weights: dict, layers: list, output_dir: str, model_name: str, samples: int = 65536,
+               seed: int = 0):
+    """
+    Write `<model>_weights_int8.safetensors`: int8 weights, float32 biases
+
+    Weights use symmetric per-output-channel scales; the activation scales
+    (per feature for the network inputs, per tensor for hidden layers, see
+    qlknn_int8.quantize) come from pushing `samples` points from the documented
+    input ranges through the float32 network. All scales go into the metadata under `int8`.
+    """
+    bounds = calibrate(weights, samples, seed)
+    quantized, scales = quantize(weights, bounds)
+
+    payloads = {}
+    for layer in layers:
+        payloads[layer['weight']] = ('I8', np.ascontiguousarray(quantized[layer['weight']], dtype='i1'))
+        payloads[layer['bias']] = ('F32', np.ascontiguousarray(quantized[layer['bias']], dtype='<f4'))
+    entries = [(name, tag, array.shape, array.nbytes) for name, (tag, array) in payloads.items()]
+
+    output_path = Path(output_dir) / f"{model_name}_weights_int8.safetensors"
+    with open(output_path, 'wb') as f:
+        write_safetensors_header(f, entries)
+        for _, array in payloads.values():
+            f.write(array.tobytes())
+    print(f"✅ Saved int8 weights to {output_path} ({output_path.stat().st_size / 1024:.2f} KB)")
+
+    entry = {
+        'file': output_path.name,
+        'scheme': 'symmetric per-output-channel int8 weights; per-feature int8 inputs folded into layer 0, '
+                  'per-tensor uint8 hidden activations',
+        'calibration': {'samples': samples, 'seed': seed},
+        'scales': scales,
     }
+    return [output_path], {'int8': entry}
 
-    metadata_path = Path(output_dir) / "qlknn_7_11_metadata.json"
-    with open(metadata_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
-    print(f"✅ Saved metadata to {metadata_path}")
 
-    # Display model info
-    print("\n=== Model Architecture ===")
-    print(f"Input: {metadata['input_names']}")
-    print(f"Output: {metadata['output_names']}")
-    print(f"Layers: {len(metadata['architecture']['layers'])}")
-    print(f"Parameters: {sum(w.size for w in weights.values()):,}")
+def write_low_rank(weights: dict, layers: list, output_dir: str, model_name: str, budget: float = 0.01,
+                   samples: int = 16384, seed: int = 0):
+    """
+    Write `<model>_weights_lowrank.safetensors` with SVD-factorized hidden layers
 
-if __name__ == '__main__':
-    import sys
+    Factorized layers store `.weight_down` [r, in] and `.weight_up` [out, r]
+    in place of `.weight`; r is chosen per layer against `budget` (see
+    qlknn_lowrank.factorize). Ranks and the measured error go into the metadata.
+    Loadable by qlknn_numpy.QLKNNNumpy; QLKNNNetwork expects dense layers.
+    """
+    from safetensors.numpy import save_file
 
-    # Default paths
-    onnx_path = '/Library/Frameworks/Python.framework/Versions/3.12/lib/python3.12/site-packages/fusion_surrogates/qlknn/models/qlknn_7_11.onnx'
-    output_dir = 'Resources'
+    factorized, report = factorize(weights, budget, samples, seed)
+    output_path = Path(output_dir) / f"{model_name}_weights_lowrank.safetensors"
+    save_file({name: np.ascontiguousarray(array) for name, array in factorized.items()}, output_path)
+
+    dense = sum(layer['in'] * layer['out'] for layer in layers)
+    saved = sum(entry['dense_params'] - entry['params'] for entry in report['layers'].values())
+    print(f"✅ Saved low-rank weights to {output_path} "
+          f"({100 * saved / dense:.1f}% fewer weight FLOPs, error {report['error']:.2e})")
+    return [output_path], {'low_rank': {'file': output_path.name, **report}}
+
+
+# TORAX transport output -> QLKNN outputs it sums (TORAXIntegration.combineFluxes)
+TORAX_HEAD = {
+    'chi_ion': ['efiITG', 'efiTEM'],
+    'chi_electron': ['efeITG', 'efeTEM', 'efeETG'],
+    'particle_flux': ['pfeITG', 'pfeTEM'],
+    'growth_rate': ['gamma_max'],
+}
+
+
+def torax_head_matrix(output_names: list = OUTPUT_NAMES) -> np.ndarray:
+    """0/1 combination matrix [len(TORAX_HEAD), len(output_names)]"""
+    matrix = np.zeros((len(TORAX_HEAD), len(output_names)))
+    for row, sources in enumerate(TORAX_HEAD.values()):
+        for name in sources:
+            if name not in output_names:
+                raise ValueError(f"TORAX head needs output '{name}', model outputs are {list(output_names)}")
+            matrix[row, list(output_names).index(name)] = 1.0
+    return matrix
+
+
+def write_torax_head(weights: dict, layers: list, output_dir: str, model_name: str):
+    """
+    Write `<model>_weights_torax.safetensors` whose outputs are TORAX's transport terms
+
+    The sums in TORAXIntegration.combineFluxes are linear, so they fold into the
+    output layer: W' = C @ W, b' = C @ b with the TORAX_HEAD matrix C (computed
+    in float64, rounded once). Hidden layers are unchanged; the output layer
+    shrinks to [4, hidden] and the network returns chi_ion, chi_electron,
+    particle_flux and growth_rate directly.
+    """
+    from safetensors.numpy import save_file
+
+    matrix = torax_head_matrix()
+    last = layers[-1]
+    if last['out'] != matrix.shape[1]:
+        raise ValueError(f"Output layer has {last['out']} outputs, TORAX head expects {matrix.shape[1]}")
+
+    folded = {name: weights[name] for layer in layers for name in (layer['weight'], layer['bias'])}
+    folded[last['weight']] = (matrix @ weights[last['weight']].astype(np.float64)).astype(np.float32)
+    folded[last['bias']] = (matrix @ weights[last['bias']].astype(np.float64)).astype(np.float32)
+
+    output_path = Path(output_dir) / f"{model_name}_weights_torax.safetensors"
+    save_file({name: np.ascontiguousarray(array) for name, array in folded.items()}, output_path)
+    print(f"✅ Saved TORAX-head weights to {output_path} ({output_path.stat().st_size / 1024:.2f} KB)")
+
+    entry = {'file': output_path.name, 'output_names': list(TORAX_HEAD), 'combination': TORAX_HEAD}
+    return [output_path], {'torax_head': entry}
+
+
+def write_ood(weights: dict, layers: list, output_dir: str, model_name: str, reference: str = None,
+              reference_sha256: str = None, samples: int = 65536, seed: int = 0,
+              quantile: float = DEFAULT_QUANTILE):
+    """
+    Fit the out-of-distribution scorer (qlknn_ood.fit) into the metadata under `ood`
+
+    `reference` is an [m, 10] .npy of training-domain inputs in INPUT_NAMES
+    order. Without one the fit uses `samples` uniform draws from the input
+    ranges, which only penalizes the corners of the range box; its
+    `reference.source` is UNIFORM_BOX_SOURCE so loaders can refuse it. Writes no file.
+    """
+    if reference is None:
+        inputs = sample_inputs(samples, seed)
+        source = {'source': UNIFORM_BOX_SOURCE, 'samples': samples, 'seed': seed}
+    else:
+        inputs = np.load(reference, mmap_mode='r')
+        source = {'source': Path(reference).name, 'sha256': reference_sha256}
+
+    entry = fit_ood(inputs, quantile)
+    entry['reference'] = source
+    print(f"✅ Fitted OOD scorer on {entry['samples']:,} {source['source']} rows "
+          f"(threshold {entry['threshold']:.2f} at the {quantile:g} quantile)")
+    return [], {'ood': entry}
+
+
+# name -> writer(weights, layers, output_dir, model_name, **params) -> (paths, metadata entries)
+VARIANT_WRITERS = {
+    'packed': write_packed,
+    'float16': functools.partial(write_half_precision, precision='float16'),
+    'bfloat16': functools.partial(write_half_precision, precision='bfloat16'),
+    'int8': write_int8,
+    'low_rank': write_low_rank,
+    'torax_head': write_torax_head,
+    'ood': write_ood,
+}
+
+
+def export_variants(weights: dict, layers: list, output_dir: str, model_name: str, variants: dict = None):
+    """Write each requested variant; returns (paths, merged metadata entries)"""
+    paths, extra = [], {}
+    for name, params in (variants or {}).items():
+        if name not in VARIANT_WRITERS:
+            raise ValueError(f"Unknown export variant '{name}'. Available: {sorted(VARIANT_WRITERS)}")
+        variant_paths, entries = VARIANT_WRITERS[name](weights, layers, output_dir, model_name, **(params or {}))
+        paths.extend(variant_paths)
+        extra.update(entries)
+    return paths, extra
+
+
+# MARK: - Cached conversion
+
+def convert_with_cache(onnx_path: str, output_dir: str, stream: bool = False,
+                       model_name: str = None, cache: ConversionCache = None, variants: dict = None):
+    """
+    Convert through the content-addressed cache
+
+    A source whose size and mtime match the stat index is served without
+    parsing the protobuf (a no-op when the outputs are already in place).
+    Otherwise the graph hash is computed once and, if an identical graph was
+    converted before, its files are copied instead of reconverted.
+    """
+    cache = cache or ConversionCache()
+    model_name = model_name or Path(onnx_path).stem
+    options = {'stream': stream, 'variants': variants or {}}
+
+    digest = cache.lookup_graph_hash(onnx_path)
+    if digest is not None:
+        outputs = cache.materialize(cache.object_key(digest, model_name, options), output_dir)
+        if outputs:
+            print(f"✅ {onnx_path} unchanged (cache hit)")
+            return _ordered_outputs(outputs, model_name)
+
+    model = onnx.load(onnx_path, load_external_data=False)
+    digest = graph_hash(model, Path(onnx_path).resolve().parent)
+    cache.record_graph_hash(onnx_path, digest)
+    key = cache.object_key(digest, model_name, options)
+    outputs = cache.materialize(key, output_dir)
+    if outputs:
+        print(f"✅ {onnx_path} matches cached graph {digest[:12]}")
+        return _ordered_outputs(outputs, model_name)
+
+    convert = convert_onnx_to_safetensors_streaming if stream else convert_onnx_to_safetensors
+    # Outputs come from the staged files, not the cache, which a concurrent clear() may empty
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory() as staging:
+        files = convert(onnx_path, staging, model_name, model=model, variants=variants)
+        cache.store(key, files)
+        return [Path(shutil.copy2(path, output_dir / Path(path).name)) for path in files]
+
+
+def _ordered_outputs(paths: list, model_name: str) -> list:
+    """Weights and metadata first, matching the converters' return order"""
+    first = [f"{model_name}_weights.safetensors", f"{model_name}_metadata.json"]
+    return sorted(paths, key=lambda path: first.index(path.name) if path.name in first else len(first))
 
-    if len(sys.argv) > 1:
-        onnx_path = sys.argv[1]
-    if len(sys.argv) > 2:
-        output_dir = sys.argv[2]
 
-    print(f"Converting {onnx_path}")
-    print(f"       to {output_dir}/\n")
+# MARK: - Batch conversion
+
+MANIFEST_NAME = 'conversion_manifest.json'
+
+
+def file_sha256(path) -> str:
+    """SHA-256 of a file, read in bounded chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(STREAM_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def collect_onnx_files(sources: list) -> list:
+    """Expand directories and glob patterns into a sorted list of .onnx files"""
+    paths = set()
+    for source in sources:
+        if any(char in source for char in '*?['):
+            paths.update(Path(match) for match in glob.glob(source, recursive=True))
+        elif Path(source).is_dir():
+            paths.update(Path(source).glob('*.onnx'))
+        else:
+            paths.add(Path(source))
+    return sorted(path for path in paths if path.suffix == '.onnx')
+
+
+def load_manifest(output_dir: str) -> dict:
+    manifest_path = Path(output_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def save_manifest(output_dir: str, manifest: dict):
+    """Write the manifest atomically so an interrupted run never leaves it truncated"""
+    manifest_path = Path(output_dir) / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(dict(sorted(manifest.items())), f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def is_up_to_date(entry: dict, source_sha256: str, output_dir: str) -> bool:
+    """True when the manifest entry was produced from this exact source and its outputs are intact"""
+    if not entry or entry.get('source_sha256') != source_sha256:
+        return False
+    weights_path = Path(output_dir) / entry['weights']
+    names = [entry['metadata'], *entry.get('variants', [])]
+    if not weights_path.exists() or not all((Path(output_dir) / name).exists() for name in names):
+        return False
+    return file_sha256(weights_path) == entry.get('weights_sha256')
+
+
+def _convert_worker(onnx_path: str, output_dir: str, stream: bool, previous: dict, force: bool, use_cache: bool,
+                    variants: dict):
+    """Convert one model in a worker process; returns (status, manifest entry)"""
+    source_sha256 = file_sha256(onnx_path)
+    if not force and is_up_to_date(previous, source_sha256, output_dir) \
+            and previous.get('variant_options', {}) == (variants or {}):
+        return 'skipped', previous
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if use_cache:
+            paths = convert_with_cache(onnx_path, output_dir, stream, variants=variants)
+        elif stream:
+            paths = convert_onnx_to_safetensors_streaming(onnx_path, output_dir, variants=variants)
+        else:
+            paths = convert_onnx_to_safetensors(onnx_path, output_dir, variants=variants)
+    weights_path, metadata_path, *variant_paths = paths
+
+    return 'converted', {
+        'source': str(onnx_path),
+        'source_sha256': source_sha256,
+        'weights': weights_path.name,
+        'weights_sha256': file_sha256(weights_path),
+        'metadata': metadata_path.name,
+        'variants': [path.name for path in variant_paths],
+        'variant_options': variants or {},
+    }
+
+
+def convert_many(sources: list, output_dir: str, jobs: int = None, stream: bool = False, force: bool = False,
+                 use_cache: bool = True, variants: dict = None) -> dict:
+    """
+    Convert many ONNX models in parallel across a process pool
+
+    Models whose source hash and emitted weights still match
+    `conversion_manifest.json` are skipped, so reruns only redo changed files.
+    The manifest is rewritten after every completed model.
+    """
+    onnx_paths = collect_onnx_files(sources)
+    stems = [path.stem for path in onnx_paths]
+    duplicates = sorted({stem for stem in stems if stems.count(stem) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate model names would overwrite each other: {duplicates}")
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    counts = {'converted': 0, 'skipped': 0, 'failed': 0}
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(_convert_worker, str(path), output_dir, stream, manifest.get(path.stem), force,
+                        use_cache, variants): path
+            for path in onnx_paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                status, entry = future.result()
+            except Exception as error:
+                counts['failed'] += 1
+                print(f"❌ {path}: {error}")
+                continue
+            counts[status] += 1
+            manifest[path.stem] = entry
+            save_manifest(output_dir, manifest)
+            print(f"{'✅' if status == 'converted' else '⏭ '} {path.name} ({status})")
+
+    print(f"\nConverted {counts['converted']}, skipped {counts['skipped']}, failed {counts['failed']}")
+    return counts
+
+
+def add_conversion_arguments(parser):
+    """Options shared by the single-model and batch CLIs"""
+    parser.add_argument('--stream', action='store_true',
+                        help='write tensors directly from ONNX buffers (bounded memory)')
+    parser.add_argument('--no-cache', action='store_true', help='bypass the content-addressed conversion cache')
+    parser.add_argument('--packed', action='store_true',
+                        help='also write <model>_packed.bin: one 64-byte-aligned float32 blob + offset table')
+    parser.add_argument('--precision', action='append', choices=sorted(HALF_PRECISIONS), default=[],
+                        help='also write <model>_weights_<precision>.safetensors (repeatable)')
+    parser.add_argument('--int8', action='store_true',
+                        help='also write <model>_weights_int8.safetensors, calibrated on the input ranges')
+    parser.add_argument('--calibration-samples', type=int, default=65536)
+    parser.add_argument('--low-rank', type=float, metavar='BUDGET',
+                        help='also write <model>_weights_lowrank.safetensors, SVD-factorizing hidden layers '
+                             'within BUDGET (max RMS output error / output std)')
+    parser.add_argument('--torax-head', action='store_true',
+                        help='also write <model>_weights_torax.safetensors with the TORAX flux sums '
+                             'folded into the output layer')
+    parser.add_argument('--ood', action='store_true',
+                        help='fit the out-of-distribution scorer into the metadata on uniform input-range samples '
+                             '(flags only corners of the range box; loaders refuse it by default)')
+    parser.add_argument('--ood-reference', metavar='NPY',
+                        help='fit the out-of-distribution scorer on this [m, 10] .npy of training-domain inputs')
+
+
+def variants_from_args(args) -> dict:
+    variants = {}
+    if args.packed:
+        variants['packed'] = {}
+    for precision in args.precision:
+        variants[precision] = {}
+    if args.int8:
+        variants['int8'] = {'samples': args.calibration_samples}
+    if args.low_rank is not None:
+        variants['low_rank'] = {'budget': args.low_rank}
+    if args.torax_head:
+        variants['torax_head'] = {}
+    if args.ood_reference:
+        # The file hash keys the conversion cache on the reference's contents, not just its path
+        variants['ood'] = {'reference': args.ood_reference, 'reference_sha256': file_sha256(args.ood_reference)}
+    elif args.ood:
+        variants['ood'] = {}
+    return variants
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
 
     # Install safetensors if needed
     try:
@@ -85,6 +755,37 @@ if __name__ == '__main__':
         print("Installing safetensors...")
         import subprocess
         subprocess.check_call([sys.executable, "-m", "pip", "install", "safetensors", "--quiet"])
-        from safetensors.numpy import save_file
 
-    convert_onnx_to_safetensors(onnx_path, output_dir)
+    if len(sys.argv) > 1 and sys.argv[1] == 'convert':
+        parser = argparse.ArgumentParser(prog=f"{sys.argv[0]} convert",
+                                         description='Convert many ONNX models in parallel')
+        parser.add_argument('sources', nargs='+', help='.onnx files, directories or glob patterns')
+        parser.add_argument('-o', '--output-dir', default='Resources')
+        parser.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+        parser.add_argument('--force', action='store_true', help='reconvert even if the manifest is up to date')
+        add_conversion_arguments(parser)
+        args = parser.parse_args(sys.argv[2:])
+
+        counts = convert_many(args.sources, args.output_dir, args.jobs, args.stream, args.force,
+                              not args.no_cache, variants_from_args(args))
+        sys.exit(1 if counts['failed'] else 0)
+
+    # Default paths
+    default_onnx = '/Library/Frameworks/Python.framework/Versions/3.12/lib/python3.12/site-packages/fusion_surrogates/qlknn/models/qlknn_7_11.onnx'
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('onnx_path', nargs='?', default=default_onnx)
+    parser.add_argument('output_dir', nargs='?', default='Resources')
+    add_conversion_arguments(parser)
+    args = parser.parse_args()
+    variants = variants_from_args(args)
+
+    print(f"Converting {args.onnx_path}")
+    print(f"       to {args.output_dir}/\n")
+
+    if not args.no_cache:
+        convert_with_cache(args.onnx_path, args.output_dir, args.stream, variants=variants)
+    elif args.stream:
+        convert_onnx_to_safetensors_streaming(args.onnx_path, args.output_dir, variants=variants)
+    else:
+        convert_onnx_to_safetensors(args.onnx_path, args.output_dir, variants=variants)
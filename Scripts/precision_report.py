@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Per-output accuracy cost of reduced-precision weight files
+Runs the float32 weights and each float16/bfloat16 export over the same sampled inputs
+"""
+
+from pathlib import Path
+import sys
+
+import numpy as np
+
+from qlknn_numpy import DEFAULT_WEIGHTS, OUTPUT_NAMES, QLKNNNumpy, sample_inputs
+from verify_parity import ErrorStats, print_error_table
+
+
+def precision_report(variant_paths: list, reference_path=DEFAULT_WEIGHTS, samples: int = 1_000_000,
+                     batch_size: int = 65536, seed: int = 0, atol: float = 1e-3, rtol: float = 1e-2) -> dict:
+    """
+    Error of each variant relative to the float32 reference, per output flux
+
+    Variants are upcast to float32 on load and evaluated in float32, so the
+    report isolates the cost of storing the weights in 16 bits.
+    Returns {variant file name: {output name: stats}}.
+    """
+    reference = QLKNNNumpy.load(reference_path)
+    variants = {Path(path).name: QLKNNNumpy.load(path) for path in variant_paths}
+    stats = {name: ErrorStats(len(OUTPUT_NAMES), atol, rtol) for name in variants}
+
+    expected = np.empty((batch_size, reference.output_dim), dtype=np.float32)
+    actual = np.empty_like(expected)
+    for start in range(0, samples, batch_size):
+        n = min(batch_size, samples - start)
+        x = sample_inputs(n, seed=seed + start)
+        reference(x, expected[:n])
+        for name, engine in variants.items():
+            stats[name].update(expected[:n], engine(x, actual[:n]))
+
+    return {name: stats[name].report(OUTPUT_NAMES) for name in variants}
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    import time
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('variants', nargs='+', help='<model>_weights_<precision>.safetensors files')
+    parser.add_argument('--reference', default=str(DEFAULT_WEIGHTS), help='float32 weights')
+    parser.add_argument('-n', '--samples', type=int, default=1_000_000)
+    parser.add_argument('--batch-size', type=int, default=65536)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--atol', type=float, default=1e-3)
+    parser.add_argument('--rtol', type=float, default=1e-2)
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = precision_report(args.variants, args.reference, args.samples, args.batch_size,
+                              args.seed, args.atol, args.rtol)
+    elapsed = time.perf_counter() - start
+
+    print(f"=== Precision cost vs {Path(args.reference).name}: {args.samples:,} samples in {elapsed:.1f} s ===")
+    for name, outputs in report.items():
+        print(f"\n{name}")
+        print_error_table(outputs)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    failed = sum(stats['violations'] for outputs in report.values() for stats in outputs.values())
+    if failed:
+        print(f"\n⚠️  {failed:,} values outside atol={args.atol} + rtol={args.rtol}·|float32|")
+        sys.exit(1)
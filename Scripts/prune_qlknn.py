@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Dead-neuron pruning for exported QLKNN weights
+Removes hidden units that are constant (usually always zero) over the valid input box,
+folds their contribution into the next layer's bias and writes a slimmer network
+"""
+
+from pathlib import Path
+import itertools
+import json
+
+import numpy as np
+
+from qlknn_numpy import (DEFAULT_WEIGHTS, INPUT_NAMES, INPUT_RANGES, OUTPUT_NAMES, QLKNNNumpy, layer_indices,
+                         load_weights, sample_inputs)
+
+
+def _layers(weights: dict) -> list:
+    return [(f'_network.model.{index}',
+             np.asarray(weights[f'_network.model.{index}.weight'], dtype=np.float32),
+             np.asarray(weights[f'_network.model.{index}.bias'], dtype=np.float32))
+            for index in layer_indices(weights)]
+
+
+def box_corners() -> np.ndarray:
+    """All 2**10 vertices of the INPUT_RANGES box, [1024, 10]"""
+    return np.array(list(itertools.product(*(INPUT_RANGES[name] for name in INPUT_NAMES))), dtype=np.float32)
+
+
+def activation_ranges(weights: dict, samples: int = 1_000_000, seed: int = 0, batch_size: int = 65536) -> list:
+    """
+    Observed (min, max) of every hidden unit after ReLU
+
+    Evaluated over `samples` uniform points of the input box plus its corners.
+    Returns one (min, max) pair of arrays per hidden layer.
+    """
+    layers = _layers(weights)[:-1]
+    lower = [np.full(weight.shape[0], np.inf, dtype=np.float32) for _, weight, _ in layers]
+    upper = [np.full(weight.shape[0], -np.inf, dtype=np.float32) for _, weight, _ in layers]
+
+    batches = [box_corners()]
+    batches += [(start, min(batch_size, samples - start)) for start in range(0, samples, batch_size)]
+    for batch in batches:
+        h = batch if isinstance(batch, np.ndarray) else sample_inputs(batch[1], seed=seed + batch[0])
+        for i, (_, weight, bias) in enumerate(layers):
+            h = np.maximum(h @ weight.T + bias, 0)
+            np.minimum(lower[i], h.min(axis=0), out=lower[i])
+            np.maximum(upper[i], h.max(axis=0), out=upper[i])
+    return list(zip(lower, upper))
+
+
+def interval_bounds(weights: dict) -> list:
+    """
+    Guaranteed (min, max) of every hidden unit after ReLU over the whole input box
+
+    Interval bound propagation: conservative, but a unit whose bounds coincide
+    is provably constant for every valid input, not just the sampled ones.
+    """
+    low, high = np.array([INPUT_RANGES[name] for name in INPUT_NAMES], dtype=np.float64).T
+    bounds = []
+    for _, weight, bias in _layers(weights)[:-1]:
+        center, radius = (high + low) / 2, (high - low) / 2
+        mid = weight.astype(np.float64) @ center + bias
+        spread = np.abs(weight.astype(np.float64)) @ radius
+        low, high = np.maximum(mid - spread, 0), np.maximum(mid + spread, 0)
+        bounds.append((low, high))
+    return bounds
+
+
+def prune(weights: dict, ranges: list, tolerance: float = 0.0) -> tuple:
+    """
+    Drop hidden units whose activation range is at most `tolerance` wide
+
+    A removed unit's constant output c (0 for dead units) is folded into the
+    next layer: b_next += W_next[:, unit] * c. Hidden layers keep their own
+    widths; QLKNNNetwork.load and QLKNNNumpy both infer them from the weights.
+    Returns (pruned weights, kept unit indices per hidden layer).
+    """
+    layers = [[name, weight.copy(), bias.astype(np.float64)] for name, weight, bias in _layers(weights)]
+    kept = []
+    for i, (low, high) in enumerate(ranges):
+        constant = (high - low) <= tolerance
+        value = np.where(constant, (high + low) / 2, 0.0)
+        keep = np.flatnonzero(~constant)
+
+        name, weight, bias = layers[i]
+        layers[i] = [name, weight[keep], bias[keep]]
+        next_name, next_weight, next_bias = layers[i + 1]
+        layers[i + 1] = [next_name, next_weight[:, keep], next_bias + next_weight.astype(np.float64) @ value]
+        kept.append(keep)
+
+    pruned = {}
+    for name, weight, bias in layers:
+        pruned[f'{name}.weight'] = np.ascontiguousarray(weight, dtype=np.float32)
+        pruned[f'{name}.bias'] = bias.astype(np.float32)
+    return pruned, kept
+
+
+def prune_model(weights_path=DEFAULT_WEIGHTS, output_dir: str = '.', model_name: str = None,
+                samples: int = 1_000_000, seed: int = 0, tolerance: float = 0.0, proven_only: bool = False,
+                check_samples: int = 100_000) -> dict:
+    """
+    Prune a weights file and write `<model_name>_weights.safetensors` plus metadata
+
+    By default units constant over the sampled box are removed (exact on every
+    sample, not proven). `proven_only` restricts pruning to interval-bound proofs,
+    which are too loose to prove any QLKNN 7_11 unit constant: it removes nothing
+    for the bundled model and only serves as a check on other networks.
+    Returns the pruning report that is also stored under `pruning` in the metadata.
+    """
+    from safetensors.numpy import save_file
+    from qlknn_metadata import write_metadata
+
+    weights_path = Path(weights_path)
+    weights = load_weights(weights_path)
+    source_name = weights_path.name.removesuffix('_weights.safetensors')
+    model_name = model_name or f"{source_name.removesuffix(weights_path.suffix)}_pruned"
+
+    observed = activation_ranges(weights, samples, seed)
+    proven = interval_bounds(weights)
+    pruned, kept = prune(weights, proven if proven_only else observed, tolerance)
+
+    # Equivalence check on points not used for the statistics
+    x = sample_inputs(check_samples, seed=seed + samples + 1)
+    max_error = float(np.abs(QLKNNNumpy(pruned)(x) - QLKNNNumpy(weights)(x)).max())
+
+    layer_reports = []
+    for (name, weight, _), keep, (low, high) in zip(_layers(weights), kept, proven):
+        layer_reports.append({
+            'layer': name,
+            'units': weight.shape[0],
+            'kept': len(keep),
+            'removed': weight.shape[0] - len(keep),
+            'provably_constant': int(((high - low) <= tolerance).sum()),
+        })
+    report = {
+        'source': weights_path.name,
+        'samples': samples,
+        'seed': seed,
+        'tolerance': tolerance,
+        'proven_only': proven_only,
+        'hidden_widths': [weight.shape[0] for _, weight, _ in _layers(pruned)[:-1]],
+        'max_abs_error': max_error,
+        'check_samples': check_samples,
+        'layers': layer_reports,
+    }
+
+    output_path = Path(output_dir) / f"{model_name}_weights.safetensors"
+    save_file(pruned, output_path)
+    print(f"✅ Saved pruned weights to {output_path} ({output_path.stat().st_size / 1024:.2f} KB)")
+
+    architecture = []
+    for i, (name, weight, _) in enumerate(_layers(pruned)):
+        architecture.append({
+            'in': weight.shape[1], 'out': weight.shape[0],
+            'activation': 'ReLU' if i < len(kept) else None,
+            'weight': f'{name}.weight', 'bias': f'{name}.bias',
+            'source_weight': f'{name}.weight', 'source_bias': f'{name}.bias',
+        })
+    output_names = OUTPUT_NAMES
+    source_metadata = weights_path.with_name(f"{source_name}_metadata.json")
+    if source_metadata.is_file():
+        with open(source_metadata) as f:
+            output_names = json.load(f).get('output_names', OUTPUT_NAMES)
+    write_metadata(output_dir, architecture, pruned.keys(), model_name, {'pruning': report}, output_names)
+    return report
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('weights', nargs='?', default=str(DEFAULT_WEIGHTS))
+    parser.add_argument('-o', '--output-dir', default='.')
+    parser.add_argument('--model-name', help='output name (default: <source>_pruned)')
+    parser.add_argument('-n', '--samples', type=int, default=1_000_000,
+                        help='uniform samples of the input box (its 1024 corners are always included)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tolerance', type=float, default=0.0,
+                        help='treat units whose activation range is at most this wide as constant')
+    parser.add_argument('--proven-only', action='store_true',
+                        help='only remove units proven constant by interval bounds '
+                             '(removes none for QLKNN 7_11; the bounds are too loose)')
+    args = parser.parse_args()
+
+    report = prune_model(args.weights, args.output_dir, args.model_name, args.samples, args.seed,
+                         args.tolerance, args.proven_only)
+
+    print(f"\n{'layer':<20} {'units':>6} {'kept':>6} {'removed':>8} {'provably constant':>18}")
+    for layer in report['layers']:
+        print(f"{layer['layer']:<20} {layer['units']:>6} {layer['kept']:>6} {layer['removed']:>8} "
+              f"{layer['provably_constant']:>18}")
+    print(f"\nHidden widths: {report['hidden_widths']}")
+    print(f"Max |pruned - original| over {report['check_samples']:,} fresh samples: {report['max_abs_error']:.3e}")
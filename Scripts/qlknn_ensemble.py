@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Stacked QLKNN ensembles: pack N checkpoints into one SafeTensors file and evaluate
+all members with one batched matmul per layer, reporting mean and std per output
+"""
+
+from pathlib import Path
+import json
+
+import numpy as np
+
+from qlknn_numpy import INPUT_NAMES, OUTPUT_NAMES, layer_indices, load_weights
+
+
+def stack_weights(members: list) -> dict:
+    """
+    Stack member weight dicts: [out, in] -> [N, out, in], [out] -> [N, out]
+
+    Every member must have the same layers and shapes (dense weights only).
+    """
+    names = sorted(members[0])
+    for i, weights in enumerate(members[1:], start=1):
+        if sorted(weights) != names:
+            raise ValueError(f"Member {i} has tensors {sorted(weights)}, expected {names}")
+        for name in names:
+            if weights[name].shape != members[0][name].shape:
+                raise ValueError(f"Member {i} {name} has shape {weights[name].shape}, "
+                                 f"expected {members[0][name].shape}")
+    if any(name.endswith(('.weight_down', '.weight_up')) for name in names):
+        raise ValueError("Ensemble members must have dense weights (low-rank layers are not stacked)")
+    return {name: np.stack([np.asarray(weights[name], dtype=np.float32) for weights in members]) for name in names}
+
+
+def pack_ensemble(weight_paths: list, output_dir: str = '.', model_name: str = 'qlknn_ensemble') -> dict:
+    """
+    Write `<model_name>_weights.safetensors` with stacked members plus metadata
+
+    Returns the `ensemble` metadata entry (member files and count).
+    """
+    from safetensors.numpy import save_file
+    from qlknn_metadata import write_metadata
+
+    weight_paths = [Path(path) for path in weight_paths]
+    stacked = stack_weights([load_weights(path) for path in weight_paths])
+
+    output_path = Path(output_dir) / f"{model_name}_weights.safetensors"
+    save_file(stacked, output_path)
+    print(f"✅ Saved {len(weight_paths)}-member ensemble to {output_path} "
+          f"({output_path.stat().st_size / 1024:.2f} KB)")
+
+    indices = layer_indices(stacked)
+    architecture = []
+    for i, index in enumerate(indices):
+        name = f'_network.model.{index}'
+        _, out_dim, in_dim = stacked[f'{name}.weight'].shape
+        architecture.append({
+            'in': in_dim, 'out': out_dim,
+            'activation': 'ReLU' if i < len(indices) - 1 else None,
+            'weight': f'{name}.weight', 'bias': f'{name}.bias',
+            'source_weight': f'{name}.weight', 'source_bias': f'{name}.bias',
+        })
+    entry = {'members': [path.name for path in weight_paths], 'size': len(weight_paths)}
+    write_metadata(output_dir, architecture, stacked.keys(), model_name, {'ensemble': entry})
+    return entry
+
+
+class QLKNNEnsemble:
+    """
+    All members of a stacked ensemble in one pass
+
+    Layer 0 is shared input, so it is a single GEMM against the members'
+    weights concatenated to [N * out, in]. Later layers are one batched
+    matmul over the member axis ([N, n, in] @ [N, in, out]). Rows are
+    processed in chunks of `chunk_size` to bound the [N, chunk, width] activations.
+    """
+
+    def __init__(self, weights: dict, dtype=np.float32, chunk_size: int = 4096):
+        self.dtype = np.dtype(dtype)
+        self.chunk_size = chunk_size
+
+        # (W.T as [N, in, out], bias as [N, 1, out]); transposed views, no copy when dtypes match
+        self.layers = []
+        for index in layer_indices(weights):
+            name = f'_network.model.{index}'
+            weight = np.asarray(weights[f'{name}.weight']).astype(self.dtype, copy=False)
+            bias = np.asarray(weights[f'{name}.bias']).astype(self.dtype, copy=False)
+            if weight.ndim != 3:
+                raise ValueError(f"{name}.weight has shape {weight.shape}; expected stacked [N, out, in]")
+            self.layers.append((weight.transpose(0, 2, 1), bias[:, None, :]))
+
+        self.size, self.input_dim, _ = self.layers[0][0].shape
+        self.output_dim = self.layers[-1][0].shape[2]
+        # Layer 0 as one [in, N * out] matrix (small: 10 x N * 133)
+        self._first = np.ascontiguousarray(self.layers[0][0].transpose(1, 0, 2).reshape(self.input_dim, -1))
+
+    @classmethod
+    def load(cls, path, **kwargs) -> 'QLKNNEnsemble':
+        """Build an evaluator from a stacked weights file"""
+        return cls(load_weights(path), **kwargs)
+
+    def members(self, x: np.ndarray) -> np.ndarray:
+        """Every member's outputs: [n, 10] -> [N, n, 8]"""
+        x = np.asarray(x, dtype=self.dtype)
+        if x.ndim != 2 or x.shape[1] != self.input_dim:
+            raise ValueError(f"Expected input of shape [n, {self.input_dim}], got {x.shape}")
+
+        out = np.empty((self.size, x.shape[0], self.output_dim), dtype=self.dtype)
+        for start in range(0, x.shape[0], self.chunk_size):
+            stop = min(start + self.chunk_size, x.shape[0])
+            out[:, start:stop] = self._forward(x[start:stop])
+        return out
+
+    def _forward(self, x: np.ndarray) -> np.ndarray:
+        n = x.shape[0]
+        h = (x @ self._first).reshape(n, self.size, -1).transpose(1, 0, 2)
+        h += self.layers[0][1]
+        np.maximum(h, 0, out=h)
+        for i, (weight_t, bias) in enumerate(self.layers[1:], start=1):
+            h = np.matmul(h, weight_t)
+            h += bias
+            if i != len(self.layers) - 1:
+                np.maximum(h, 0, out=h)
+        return h
+
+    def __call__(self, x: np.ndarray) -> tuple:
+        """(mean, std) over members, each [n, 8]; std is the population std (ddof=0)"""
+        outputs = self.members(x)
+        return outputs.mean(axis=0), outputs.std(axis=0)
+
+    def predict(self, inputs: dict) -> tuple:
+        """Dictionary API: ({name: mean}, {name: std})"""
+        x = np.column_stack([np.asarray(inputs[name], dtype=self.dtype).reshape(-1) for name in INPUT_NAMES])
+        mean, std = self(x)
+        return ({name: mean[:, idx] for idx, name in enumerate(OUTPUT_NAMES)},
+                {name: std[:, idx] for idx, name in enumerate(OUTPUT_NAMES)})
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from qlknn_numpy import QLKNNNumpy, sample_inputs
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('weights', nargs='+', help='member weight files (same architecture)')
+    parser.add_argument('-o', '--output-dir', default='.')
+    parser.add_argument('--model-name', default='qlknn_ensemble')
+    parser.add_argument('-n', '--samples', type=int, default=65536, help='rows for the speed comparison')
+    args = parser.parse_args()
+
+    pack_ensemble(args.weights, args.output_dir, args.model_name)
+    ensemble = QLKNNEnsemble.load(Path(args.output_dir) / f"{args.model_name}_weights.safetensors")
+    singles = [QLKNNNumpy.load(path) for path in args.weights]
+
+    x = sample_inputs(args.samples)
+    start = time.perf_counter()
+    mean, std = ensemble(x)
+    batched = time.perf_counter() - start
+    start = time.perf_counter()
+    outputs = np.stack([engine(x) for engine in singles])
+    sequential = time.perf_counter() - start
+
+    scale = np.abs(outputs).max()
+    error = max(float(np.abs(mean - outputs.mean(axis=0)).max()), float(np.abs(std - outputs.std(axis=0)).max()))
+    print(f"\n{len(singles)} members x {args.samples:,} rows: batched {batched * 1e3:.1f} ms, "
+          f"sequential {sequential * 1e3:.1f} ms, max |diff| {error:.2e} (output scale {scale:.2e})")
+    print(json.dumps({name: float(std[:, idx].mean()) for idx, name in enumerate(OUTPUT_NAMES)}, indent=2))
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Int8 post-training quantization for the QLKNN 7_11 network
+Symmetric per-output-channel int8 weights; per-feature int8 network inputs and
+per-tensor uint8 hidden activations, calibrated on samples from the documented
+input ranges
+"""
+
+from pathlib import Path
+import json
+
+import numpy as np
+
+from qlknn_numpy import INPUT_NAMES, OUTPUT_NAMES, QLKNNNumpy, layer_indices, load_safetensors_mmap, sample_inputs
+
+QMAX = 127
+
+# Integer levels of each layer input: the network inputs are signed, hidden activations are
+# post-ReLU and use the full unsigned byte
+INPUT_LEVELS = (-QMAX, QMAX)
+HIDDEN_LEVELS = (0, 255)
+
+# Largest |accumulator| that stays exactly representable in float32
+_EXACT_FLOAT32_LIMIT = 1 << 24
+
+
+def calibrate(weights: dict, samples: int = 65536, seed: int = 0, batch_size: int = 8192) -> list:
+    """
+    Per-feature activation range of every layer input, from the float32 network
+
+    Inputs are drawn uniformly from INPUT_RANGES. Returns one array per layer
+    holding max |activation| of each input feature over all samples.
+    """
+    layers = [(np.asarray(weights[f'_network.model.{i}.weight'], dtype=np.float32),
+               np.asarray(weights[f'_network.model.{i}.bias'], dtype=np.float32))
+              for i in layer_indices(weights)]
+
+    bounds = [np.zeros(weight.shape[1], dtype=np.float32) for weight, _ in layers]
+    for start in range(0, samples, batch_size):
+        h = sample_inputs(min(batch_size, samples - start), seed=seed + start)
+        for i, (weight, bias) in enumerate(layers):
+            np.maximum(bounds[i], np.abs(h).max(axis=0), out=bounds[i])
+            h = h @ weight.T + bias
+            if i != len(layers) - 1:
+                np.maximum(h, 0, out=h)
+    return bounds
+
+
+def quantize(weights: dict, input_bounds: list) -> tuple:
+    """
+    (int8 weights + float32 biases, scales) for the calibrated bounds
+
+    The network inputs span very different ranges (Ati up to 150, x below 1),
+    so layer 0 quantizes them per feature, s_in[j] = bound[j] / 127, and folds
+    s_in into its weights (10 columns; the cost is a coarser layer-0 weight
+    grid). Hidden layers share one scale per tensor, s_in = max(bound) / 255
+    over unsigned post-ReLU activations, which leaves their weights unscaled:
+    each output row gets s_w[o] = max|W'[o]| / 127 and is stored as
+    round(W'[o] / s_w[o]), W' = W * s_in. The layer output is (q_in @ Wq.T) * s_w + b.
+    """
+    indices = layer_indices(weights)
+    quantized, scales = {}, {}
+    for position, (index, bound) in enumerate(zip(indices, input_bounds)):
+        name = f'_network.model.{index}'
+        levels = INPUT_LEVELS if position == 0 else HIDDEN_LEVELS
+        bound = bound if position == 0 else np.full_like(bound, bound.max())
+        input_scale = np.where(bound > 0, bound / levels[1], 1.0).astype(np.float32)
+        weight = np.asarray(weights[f'{name}.weight'], dtype=np.float32) * input_scale
+        row_max = np.abs(weight).max(axis=1)
+        weight_scale = np.where(row_max > 0, row_max / QMAX, 1.0).astype(np.float32)
+
+        quantized[f'{name}.weight'] = np.clip(np.rint(weight / weight_scale[:, None]), -QMAX, QMAX).astype(np.int8)
+        quantized[f'{name}.bias'] = np.asarray(weights[f'{name}.bias'], dtype=np.float32)
+        scales[f'{name}.weight'] = {'weight': weight_scale.tolist(), 'input': input_scale.tolist(),
+                                    'input_levels': list(levels)}
+    return quantized, scales
+
+
+class QLKNNInt8:
+    """
+    Reference int8 inference: quantize the input, integer GEMMs, requantize between layers
+
+    NumPy has no int8 GEMM, so the integer products are computed by float32
+    BLAS on integer-valued arrays. Every partial sum is an integer below 2**24,
+    so the result is bit-identical to an int32 accumulator. Between layers the
+    rescale, bias, ReLU and requantization to the next layer's levels are one
+    multiply, add, clip and round. Chunked and allocation-free like QLKNNNumpy.
+
+    The quantized network is piecewise constant, so `value_and_jacobian`
+    returns the int8 outputs with the Jacobian of `dequantized`, a QLKNNNumpy
+    over the dequantized weights Wq * s_w / s_in (a straight-through estimate).
+    """
+
+    def __init__(self, weights: dict, scales: dict, chunk_size: int = 8192):
+        self.dtype = np.dtype(np.float32)  # input/output dtype
+        self.chunk_size = chunk_size
+
+        # Per layer: (Wq.T, output multiplier, bias multiplier, levels of the layer's input)
+        self.layers = []
+        dequantized = {}
+        input_scales = []
+        for index in layer_indices(weights):
+            name = f'_network.model.{index}'
+            if f'{name}.weight' not in weights:
+                raise ValueError(f"Layer {index} is low-rank; int8 quantization needs dense weights")
+            entry = scales[f'{name}.weight']
+            weight = np.asarray(weights[f'{name}.weight'], dtype=np.float32)
+            bias = np.asarray(weights[f'{name}.bias'], dtype=np.float32)
+            weight_scale = np.asarray(entry['weight'], dtype=np.float32)
+            input_scale = np.asarray(entry['input'], dtype=np.float32)
+            levels = tuple(entry.get('input_levels', INPUT_LEVELS))
+            if weight.shape[1] * max(abs(levels[0]), levels[1]) * QMAX >= _EXACT_FLOAT32_LIMIT:
+                raise ValueError(f"Layer {index} input width {weight.shape[1]} exceeds the exact "
+                                 f"float32 accumulation limit for levels {levels}")
+
+            self.layers.append([weight.T, weight_scale, bias, levels])
+            input_scales.append(input_scale)
+            dequantized[f'{name}.weight'] = weight * weight_scale[:, None] / input_scale
+            dequantized[f'{name}.bias'] = bias
+
+        # Fold the next layer's input scale into each hidden layer's rescale:
+        # q_next = round(clip((acc * s_w + b) / s_next)), so no separate quantize pass
+        for layer, next_scale in zip(self.layers[:-1], input_scales[1:]):
+            layer[1] = layer[1] / next_scale
+            layer[2] = layer[2] / next_scale
+        self._inverse_input_scale = 1 / input_scales[0]
+
+        self.dequantized = QLKNNNumpy(dequantized, chunk_size=chunk_size)
+        self.input_dim = self.dequantized.input_dim
+        self.output_dim = self.dequantized.output_dim
+
+        width = max(bias.shape[0] for _, _, bias, _ in self.layers[:-1])
+        self._input = np.empty((chunk_size, self.input_dim), dtype=np.float32)
+        self._buffers = [np.empty(chunk_size * width, dtype=np.float32) for _ in range(2)]
+
+    @classmethod
+    def load(cls, path, metadata_path=None, **kwargs) -> 'QLKNNInt8':
+        """Engine for a `<model>_weights_int8.safetensors` file and its metadata"""
+        path = Path(path)
+        if metadata_path is None:
+            metadata_path = path.with_name(path.name.replace('_weights_int8.safetensors', '_metadata.json'))
+        with open(metadata_path) as f:
+            scales = json.load(f)['int8']['scales']
+        return cls(load_safetensors_mmap(path), scales, **kwargs)
+
+    def __call__(self, x: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """Forward pass: [n, 10] -> [n, 8], written into `out` when given"""
+        x = np.asarray(x)
+        if x.ndim != 2 or x.shape[1] != self.input_dim:
+            raise ValueError(f"Expected input of shape [n, {self.input_dim}], got {x.shape}")
+
+        n = x.shape[0]
+        if out is None:
+            out = np.empty((n, self.output_dim), dtype=np.float32)
+        elif out.shape != (n, self.output_dim):
+            raise ValueError(f"Expected output of shape {(n, self.output_dim)}, got {out.shape}")
+
+        for start in range(0, n, self.chunk_size):
+            stop = min(start + self.chunk_size, n)
+            self._forward(x[start:stop], out[start:stop])
+        return out
+
+    def _forward(self, x: np.ndarray, out: np.ndarray):
+        n = x.shape[0]
+        h = self._input[:n]
+        low, high = self.layers[0][3]
+        np.multiply(x, self._inverse_input_scale, out=h)
+        np.rint(h, out=h)
+        np.clip(h, low, high, out=h)
+
+        last = len(self.layers) - 1
+        for i, (weight_t, output_scale, bias, _) in enumerate(self.layers):
+            if i == last:
+                dst = out
+            else:
+                width = weight_t.shape[1]
+                dst = self._buffers[i % 2][:n * width].reshape(n, width)
+            np.matmul(h, weight_t, out=dst)
+            np.multiply(dst, output_scale, out=dst)
+            np.add(dst, bias, out=dst)
+            if i != last:
+                # ReLU and saturation in one clip, then round onto the next layer's integer grid
+                low, high = self.layers[i + 1][3]
+                np.clip(dst, max(low, 0), high, out=dst)
+                np.rint(dst, out=dst)
+            h = dst
+
+    def value_and_jacobian(self, x: np.ndarray, chunk_size: int = 256) -> tuple:
+        """Int8 outputs [n, 8] and the dequantized network's Jacobian [n, 8, 10]"""
+        return self(x), self.dequantized.value_and_jacobian(x, chunk_size)[1]
+
+    def jacobian(self, x: np.ndarray) -> np.ndarray:
+        """d(output)/d(input) of the dequantized network, [n, 8, 10]"""
+        return self.dequantized.jacobian(x)
+
+    def predict(self, inputs: dict) -> dict:
+        """Dictionary API matching QLKNNNetwork.predict"""
+        x = np.column_stack([np.asarray(inputs[name], dtype=np.float32).reshape(-1) for name in INPUT_NAMES])
+        outputs = self(x)
+        return {name: outputs[:, idx] for idx, name in enumerate(OUTPUT_NAMES)}
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from qlknn_numpy import DEFAULT_WEIGHTS, load_weights
+    from verify_parity import ErrorStats, print_error_table
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('int8_weights', help='<model>_weights_int8.safetensors written by the converter')
+    parser.add_argument('--reference', default=str(DEFAULT_WEIGHTS), help='float32 weights')
+    parser.add_argument('-n', '--samples', type=int, default=1_000_000)
+    parser.add_argument('--batch-size', type=int, default=65536)
+    parser.add_argument('--seed', type=int, default=1, help='evaluation seed (keep distinct from calibration)')
+    args = parser.parse_args()
+
+    reference = QLKNNNumpy(load_weights(args.reference))
+    engine = QLKNNInt8.load(args.int8_weights)
+    stats = ErrorStats(len(OUTPUT_NAMES), atol=1e-2, rtol=5e-2)
+    timings = {'float32': 0.0, 'int8': 0.0}
+    squared_error = np.zeros(len(OUTPUT_NAMES))
+    moments = np.zeros((2, len(OUTPUT_NAMES)))
+
+    expected = np.empty((args.batch_size, len(OUTPUT_NAMES)), dtype=np.float32)
+    actual = np.empty_like(expected)
+    for start in range(0, args.samples, args.batch_size):
+        n = min(args.batch_size, args.samples - start)
+        x = sample_inputs(n, seed=args.seed + start)
+        t0 = time.perf_counter()
+        reference(x, expected[:n])
+        t1 = time.perf_counter()
+        engine(x, actual[:n])
+        timings['float32'] += t1 - t0
+        timings['int8'] += time.perf_counter() - t1
+        stats.update(expected[:n], actual[:n])
+        squared_error += np.square(actual[:n] - expected[:n], dtype=np.float64).sum(axis=0)
+        moments += [expected[:n].sum(axis=0, dtype=np.float64), np.square(expected[:n], dtype=np.float64).sum(axis=0)]
+
+    print(f"=== Int8 vs float32: {args.samples:,} samples over {len(INPUT_NAMES)} inputs ===\n")
+    print_error_table(stats.report(OUTPUT_NAMES))
+    mean, mean_square = moments / args.samples
+    relative_rms = np.sqrt(squared_error / args.samples) / np.sqrt(mean_square - mean ** 2)
+    print("\nRMS error / output std: " + ", ".join(f"{name} {100 * value:.1f}%"
+                                                  for name, value in zip(OUTPUT_NAMES, relative_rms)))
+    print()
+    for name, elapsed in timings.items():
+        print(f"{name:>8}: {args.samples / elapsed:14,.0f} rows/s")
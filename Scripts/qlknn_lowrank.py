@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+SVD low-rank factorization of the QLKNN hidden layers
+Each hidden-to-hidden W [out, in] becomes up [out, r] @ down [r, in], with r chosen
+per layer against an output error budget measured on sampled inputs
+"""
+
+import numpy as np
+
+from qlknn_numpy import QLKNNNumpy, layer_indices, sample_inputs
+
+
+def _factors(u: np.ndarray, s: np.ndarray, vt: np.ndarray, rank: int) -> tuple:
+    """(down [r, in], up [out, r]) splitting the singular values evenly between the factors"""
+    root = np.sqrt(s[:rank])
+    return ((root[:, None] * vt[:rank]).astype(np.float32), (u[:, :rank] * root).astype(np.float32))
+
+
+def factorize(weights: dict, budget: float = 0.01, samples: int = 16384, seed: int = 0) -> tuple:
+    """
+    Replace hidden-to-hidden layers by rank-r factor pairs within an error budget
+
+    The error of a candidate network is max over outputs of
+    RMS(candidate - dense) / std(dense) on `samples` inputs from INPUT_RANGES.
+    Only ranks below break-even (r * (in + out) < in * out) are considered. The
+    budget is split evenly across the largest set of layers that each meet
+    their share at break-even; the rest stay dense. Each gets the smallest
+    rank whose error on its own stays within its share (binary search; the
+    returned rank is always one that was measured within the share). If the
+    combined network still exceeds the budget, the shares are halved and the
+    search repeated. Returns (weights with `.weight_down` / `.weight_up` pairs,
+    report with per-layer ranks and the combined error).
+    """
+    x = sample_inputs(samples, seed=seed)
+    reference = QLKNNNumpy(weights)(x).astype(np.float64)
+    scale = reference.std(axis=0)
+    scale[scale == 0] = 1.0
+
+    def error(candidate: dict) -> float:
+        outputs = QLKNNNumpy(candidate)(x).astype(np.float64)
+        return float((np.sqrt(np.mean(np.square(outputs - reference), axis=0)) / scale).max())
+
+    def replaced(base: dict, name: str, rank: int) -> dict:
+        candidate = dict(base)
+        del candidate[f'{name}.weight']
+        candidate[f'{name}.weight_down'], candidate[f'{name}.weight_up'] = _factors(*svds[name], rank)
+        return candidate
+
+    def smallest_rank(name: str, share: float):
+        low, high = 1, break_even[name]
+        if floor[name] > share:
+            return None
+        while low < high:
+            middle = (low + high) // 2
+            if error(replaced(weights, name, middle)) <= share:
+                high = middle
+            else:
+                low = middle + 1
+        return high
+
+    names = [f'_network.model.{index}' for index in layer_indices(weights)[1:-1]]
+    svds = {name: np.linalg.svd(np.asarray(weights[f'{name}.weight'], dtype=np.float64), full_matrices=False)
+            for name in names}
+    # Largest rank that still saves parameters
+    break_even = {name: (svds[name][0].shape[0] * svds[name][2].shape[1] - 1)
+                  // (svds[name][0].shape[0] + svds[name][2].shape[1]) for name in names}
+
+    # Factorize the largest set of layers whose break-even errors all fit an even share
+    floor = {name: error(replaced(weights, name, break_even[name])) if break_even[name] >= 1 else np.inf
+             for name in names}
+    eligible = sorted(names, key=floor.get)
+    while eligible and floor[eligible[-1]] > budget / len(eligible):
+        eligible.pop()
+    share = budget / max(len(eligible), 1)
+    ranks = {name: rank for name in eligible if (rank := smallest_rank(name, share)) is not None}
+
+    while True:
+        factorized = dict(weights)
+        for name, rank in ranks.items():
+            factorized = replaced(factorized, name, rank)
+        combined = error(factorized)
+        if combined <= budget or not ranks:
+            break
+        share /= 2
+        ranks = {name: rank for name in eligible if (rank := smallest_rank(name, share)) is not None}
+
+    report = {
+        'budget': budget,
+        'samples': samples,
+        'seed': seed,
+        'error': combined,
+        'layers': {},
+    }
+    for name in names:
+        rows, cols = svds[name][0].shape[0], svds[name][2].shape[1]
+        rank = ranks.get(name)
+        report['layers'][name] = {
+            'rank': rank,
+            'full_rank': min(rows, cols),
+            'params': rank * (rows + cols) if rank else rows * cols,
+            'dense_params': rows * cols,
+        }
+    return factorized, report
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from qlknn_numpy import DEFAULT_WEIGHTS, load_weights
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('weights', nargs='?', default=str(DEFAULT_WEIGHTS))
+    parser.add_argument('--budget', type=float, nargs='+', default=[0.001, 0.01, 0.05],
+                        help='error budgets to tabulate (max normalized RMS error over outputs)')
+    parser.add_argument('-n', '--samples', type=int, default=16384)
+    args = parser.parse_args()
+
+    weights = load_weights(args.weights)
+    for budget in args.budget:
+        _, report = factorize(weights, budget, args.samples)
+        ranks = {name.rsplit('.', 1)[-1]: layer['rank'] for name, layer in report['layers'].items()}
+        params = sum(layer['params'] for layer in report['layers'].values())
+        dense = sum(layer['dense_params'] for layer in report['layers'].values())
+        print(f"budget {budget:8.4f}: ranks {ranks}  hidden params {params:,}/{dense:,}  error {report['error']:.4e}")
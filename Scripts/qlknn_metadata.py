@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+`<model_name>_metadata.json` writer shared by the converter and the weight tools
+Kept free of onnx so pruning and ensemble packing only need NumPy and safetensors
+"""
+
+from pathlib import Path
+import json
+
+from qlknn_numpy import INPUT_NAMES, OUTPUT_NAMES
+
+
+def write_metadata(output_dir: str, layers: list, weight_names: list, model_name: str = 'qlknn_7_11',
+                   extra: dict = None, output_names: list = OUTPUT_NAMES):
+    """Write <model_name>_metadata.json next to the weights"""
+    metadata = {
+        'model_name': model_name,
+        'architecture': {
+            'layers': [
+                {'type': 'Linear', 'in': layer['in'], 'out': layer['out'], 'activation': layer['activation']}
+                for layer in layers
+            ]
+        },
+        'input_names': list(INPUT_NAMES),
+        'output_names': list(output_names),
+        'weight_names': list(weight_names),
+        'weight_map': {
+            layer[kind]: layer[f'source_{kind}']
+            for layer in layers for kind in ('weight', 'bias') if layer[f'source_{kind}']
+        },
+        'precision': 'float32'
+    }
+    metadata.update(extra or {})
+
+    metadata_path = Path(output_dir) / f"{model_name}_metadata.json"
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    print(f"✅ Saved metadata to {metadata_path}")
+    return metadata, metadata_path
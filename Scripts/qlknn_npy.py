@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Resumable QLKNN sweep over memory-mapped .npy files
+Evaluates an [n, 10] float32 input file into a pre-sized [n, 8] output file
+tile by tile across threads, checkpointing completed tiles so a crashed or
+interrupted sweep resumes where it stopped
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+import json
+import threading
+import time
+
+import numpy as np
+
+from qlknn_numpy import DEFAULT_WEIGHTS, INPUT_NAMES, OUTPUT_NAMES, QLKNNNumpy, load_weights
+
+
+def progress_path(output_path) -> Path:
+    """Sidecar holding one byte per tile (1 = written and flushed)"""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + '.progress.npy')
+
+
+def layout_path(output_path) -> Path:
+    """JSON next to the sidecar recording the tiling its bytes refer to"""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + '.progress.json')
+
+
+def open_arrays(input_path, output_path, tile_rows: int, restart: bool = False) -> tuple:
+    """
+    (inputs, outputs, done) memory maps for a new or resumed sweep
+
+    A sweep resumes when the output file and its progress sidecar exist and
+    the sidecar's layout (tile_rows and input shape) matches this sweep; a
+    different tiling can give the same tile count while covering other rows,
+    so anything else is refused. Without a sidecar (or with `restart`) the
+    output, sidecar and layout are created afresh.
+    """
+    inputs = np.load(input_path, mmap_mode='r')
+    if inputs.ndim != 2 or inputs.shape[1] != len(INPUT_NAMES):
+        raise ValueError(f"{input_path} has shape {inputs.shape}, expected [n, {len(INPUT_NAMES)}]")
+
+    n = inputs.shape[0]
+    tiles = -(-n // tile_rows)
+    sidecar = progress_path(output_path)
+    layout = {'tile_rows': tile_rows, 'input_shape': list(inputs.shape)}
+    if not restart and Path(output_path).exists() and sidecar.exists():
+        header = layout_path(output_path)
+        recorded = json.loads(header.read_text()) if header.exists() else None
+        if recorded != layout:
+            raise ValueError(f"{sidecar} was written for {recorded or 'an unrecorded layout'}, this sweep has "
+                             f"{layout}; resume with the original input and --tile-rows or pass --restart")
+        outputs = np.load(output_path, mmap_mode='r+')
+        done = np.load(sidecar, mmap_mode='r+')
+        if outputs.shape != (n, len(OUTPUT_NAMES)) or outputs.dtype != np.float32:
+            raise ValueError(f"{output_path} has shape {outputs.shape} {outputs.dtype}, expected "
+                             f"({n}, {len(OUTPUT_NAMES)}) float32; pass --restart to overwrite it")
+        if done.shape != (tiles,):
+            raise ValueError(f"{sidecar} tracks {done.shape[0]} tiles, expected {tiles}; pass --restart")
+    else:
+        outputs = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float32,
+                                            shape=(n, len(OUTPUT_NAMES)))
+        # Layout first: a sidecar never exists without the layout it was written for
+        layout_path(output_path).write_text(json.dumps(layout))
+        done = np.lib.format.open_memmap(sidecar, mode='w+', dtype=np.uint8, shape=(tiles,))
+    return inputs, outputs, done
+
+
+def run_sweep(input_path, output_path, weights_path=DEFAULT_WEIGHTS, tile_rows: int = 65536, threads: int = 1,
+              checkpoint_seconds: float = 10.0, restart: bool = False, report=None) -> dict:
+    """
+    Evaluate every pending tile; returns counts and timing
+
+    Each thread owns a QLKNNNumpy engine (engines are not thread-safe) over
+    the same mmapped weights; NumPy releases the GIL inside matmul. Every
+    `checkpoint_seconds` the output map is flushed and only then are the
+    finished tiles marked in the sidecar, so a marked tile is always on disk.
+    The sidecar and its layout are removed once the whole sweep is complete.
+    """
+    inputs, outputs, done = open_arrays(input_path, output_path, tile_rows, restart)
+    n = inputs.shape[0]
+    pending = np.flatnonzero(done == 0)
+    stats = {'rows': n, 'tiles': len(done), 'resumed_tiles': len(done) - len(pending), 'computed_rows': 0}
+
+    weights = load_weights(weights_path)
+    local = threading.local()
+
+    def evaluate(tile: int) -> int:
+        engine = getattr(local, 'engine', None)
+        if engine is None:
+            engine = local.engine = QLKNNNumpy(weights)
+        start, stop = tile * tile_rows, min((tile + 1) * tile_rows, n)
+        engine(inputs[start:stop], outputs[start:stop])
+        return tile
+
+    def checkpoint(finished: list):
+        if finished:
+            outputs.flush()
+            done[finished] = 1
+            done.flush()
+            finished.clear()
+
+    started = last_checkpoint = time.perf_counter()
+    finished = []
+    in_flight = set()
+    tiles = iter(pending)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        try:
+            while True:
+                # A few tiles in flight per thread keeps every worker busy without queueing the whole file
+                while len(in_flight) < 2 * threads:
+                    tile = next(tiles, None)
+                    if tile is None:
+                        break
+                    in_flight.add(executor.submit(evaluate, int(tile)))
+                if not in_flight:
+                    break
+
+                completed, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                # Record every finished tile before re-raising a failure from the same batch
+                failed = [future for future in completed if future.exception() is not None]
+                for future in completed:
+                    if future not in failed:
+                        tile = future.result()
+                        finished.append(tile)
+                        stats['computed_rows'] += min((tile + 1) * tile_rows, n) - tile * tile_rows
+                if failed:
+                    failed[0].result()
+
+                now = time.perf_counter()
+                if now - last_checkpoint >= checkpoint_seconds:
+                    checkpoint(finished)
+                    last_checkpoint = now
+                    if report:
+                        report(stats, now - started)
+        finally:
+            # Keep whatever completed before an error or Ctrl-C
+            for future in in_flight:
+                future.cancel()
+            for future in wait(in_flight).done:
+                if not future.cancelled() and future.exception() is None:
+                    finished.append(future.result())
+            checkpoint(finished)
+
+    stats['seconds'] = time.perf_counter() - started
+    if done.all():
+        del done
+        progress_path(output_path).unlink()
+        layout_path(output_path).unlink()
+        stats['complete'] = True
+    else:
+        stats['complete'] = False
+    return stats
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('input', help='[n, 10] .npy file, columns in INPUT_NAMES order')
+    parser.add_argument('output', help='[n, 8] .npy file (created, or resumed if its progress sidecar exists)')
+    parser.add_argument('--weights', default=str(DEFAULT_WEIGHTS))
+    parser.add_argument('--tile-rows', type=int, default=65536)
+    parser.add_argument('-j', '--threads', type=int, default=1,
+                        help='worker threads (set OMP/OPENBLAS_NUM_THREADS=1 when using several)')
+    parser.add_argument('--checkpoint-seconds', type=float, default=10.0)
+    parser.add_argument('--restart', action='store_true', help='ignore existing progress and start over')
+    args = parser.parse_args()
+
+    def report(stats: dict, elapsed: float):
+        print(f"  {stats['computed_rows']:,} rows computed, {stats['computed_rows'] / elapsed:,.0f} rows/s",
+              flush=True)
+
+    try:
+        stats = run_sweep(args.input, args.output, args.weights, args.tile_rows, args.threads,
+                          args.checkpoint_seconds, args.restart, report)
+    except KeyboardInterrupt:
+        print(f"Interrupted; rerun the same command to resume from {progress_path(args.output)}")
+        sys.exit(130)
+
+    print(f"{'✅' if stats['complete'] else '⏸ '} {stats['computed_rows']:,} rows in {stats['seconds']:.1f}s "
+          f"({stats['computed_rows'] / max(stats['seconds'], 1e-9):,.0f} rows/s); "
+          f"{stats['resumed_tiles']} of {stats['tiles']} tiles were already done")
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Pure NumPy reference inference for the QLKNN 7_11 network
+Mirrors QLKNNNetwork.callAsFunction so the surrogate can run on hosts without Metal
+"""
+
+from pathlib import Path
+import json
+import re
+import struct
+
+import numpy as np
+
+# Same order as QLKNN.inputParameterNames / QLKNN.outputParameterNames
+INPUT_NAMES = ['Ati', 'Ate', 'Ane', 'Ani', 'q', 'smag', 'x', 'Ti_Te', 'LogNuStar', 'normni']
+OUTPUT_NAMES = ['efeITG', 'efiITG', 'pfeITG', 'efeTEM', 'efiTEM', 'pfeTEM', 'efeETG', 'gamma_max']
+
+# Valid input ranges from the QLKNN 7_11_v1 `config.stats_data` (see README)
+INPUT_RANGES = {
+    'Ati': (0.0, 150.0),
+    'Ate': (0.0, 150.0),
+    'Ane': (-5.0, 110.0),
+    'Ani': (-15.0, 110.0),
+    'q': (0.66, 30.0),
+    'smag': (-1.0, 40.0),
+    'x': (0.1, 0.95),
+    'Ti_Te': (0.25, 2.5),
+    'LogNuStar': (-5.0, 0.48),
+    'normni': (0.5, 1.0),
+}
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_WEIGHTS = REPO_ROOT / 'Sources' / 'FusionSurrogates' / 'Resources' / 'qlknn_7_11_weights.safetensors'
+
+# Dense layers store `.weight`; low-rank layers store `.weight_down` [r, in] and `.weight_up` [out, r]
+_WEIGHT_PATTERN = re.compile(r'^_network\.model\.(\d+)\.weight(?:_down)?$')
+
+# SafeTensors dtype tags -> little-endian numpy dtypes
+SAFETENSORS_DTYPES = {
+    'F64': '<f8', 'F32': '<f4', 'F16': '<f2',
+    'I64': '<i8', 'I32': '<i4', 'I16': '<i2', 'I8': 'i1', 'U8': 'u1', 'BOOL': '?',
+    'BF16': '<u2',  # raw bit patterns; upcast with bfloat16_to_float32
+}
+
+
+def bfloat16_bits(array) -> np.ndarray:
+    """
+    float32 -> bfloat16 bit patterns (uint16), rounded to nearest even
+
+    NaN is truncated with the quiet bit set instead: rounding its payload could
+    carry into the exponent (giving Inf) or wrap past the sign bit.
+    """
+    values = np.ascontiguousarray(array, dtype='<f4')
+    bits = values.view('<u4')
+    rounding = ((bits >> 16) & 1) + 0x7FFF
+    rounded = (bits + rounding) >> 16
+    return np.where(np.isnan(values), (bits >> 16) | 0x0040, rounded).astype('<u2')
+
+
+def bfloat16_to_float32(bits) -> np.ndarray:
+    """bfloat16 bit patterns -> float32 (exact)"""
+    return (np.asarray(bits, dtype='<u2').astype('<u4') << 16).view('<f4')
+
+
+def read_safetensors_header(path) -> tuple:
+    """(header dict, payload offset) — reads only the JSON header, never tensor data"""
+    with open(path, 'rb') as f:
+        (header_size,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_size))
+    return header, 8 + header_size
+
+
+def load_safetensors_mmap(path) -> dict:
+    """
+    Memory-map a .safetensors file and return read-only views of each tensor
+
+    Nothing is copied: every array is a view on one shared read-only mapping,
+    so any number of processes loading the same file share a single
+    page-cache copy of the weights. BF16 tensors are the exception: NumPy has
+    no bfloat16 type, so they are upcast to float32 copies.
+    """
+    header, data_start = read_safetensors_header(path)
+    header.pop('__metadata__', None)
+    blob = np.memmap(path, dtype=np.uint8, mode='r')
+
+    arrays = {}
+    for name, entry in header.items():
+        if entry['dtype'] not in SAFETENSORS_DTYPES:
+            raise ValueError(f"Unsupported SafeTensors dtype {entry['dtype']} for '{name}'")
+        dtype = np.dtype(SAFETENSORS_DTYPES[entry['dtype']])
+        begin, end = entry['data_offsets']
+        array = np.frombuffer(
+            blob, dtype=dtype, count=(end - begin) // dtype.itemsize, offset=data_start + begin
+        ).reshape(entry['shape'])
+        arrays[name] = bfloat16_to_float32(array) if entry['dtype'] == 'BF16' else array
+    return arrays
+
+
+def load_packed(path, metadata_path=None) -> dict:
+    """
+    Views into a `<model>_packed.bin` blob written by the converter's --packed mode
+
+    The blob is memory-mapped once; each tensor is a read-only view at the
+    offset recorded in the metadata's `packed` table (no copies).
+    """
+    path = Path(path)
+    if metadata_path is None:
+        metadata_path = path.with_name(path.name.replace('_packed.bin', '_metadata.json'))
+    with open(metadata_path) as f:
+        layout = json.load(f)['packed']
+
+    blob = np.memmap(path, dtype=np.uint8, mode='r')
+    return {
+        name: np.frombuffer(blob, dtype='<f4', count=int(np.prod(entry['shape'])), offset=entry['offset'])
+        .reshape(entry['shape'])
+        for name, entry in layout['tensors'].items()
+    }
+
+
+def load_weights(path=DEFAULT_WEIGHTS) -> dict:
+    """Load `_network.model.N.{weight,bias}` arrays from .safetensors, .npz or a packed .bin"""
+    path = Path(path)
+    if path.suffix == '.bin':
+        return load_packed(path)
+    if path.suffix == '.npz':
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    if path.suffix == '.safetensors':
+        return load_safetensors_mmap(path)
+    raise ValueError(f"Unsupported weights format: {path.suffix}. Use .safetensors, .npz or _packed.bin")
+
+
+def layer_indices(weights: dict) -> list:
+    """Sorted ONNX layer indices (0, 2, ..., 10 for QLKNN 7_11)"""
+    indices = sorted({
+        int(match.group(1))
+        for match in (_WEIGHT_PATTERN.match(name) for name in weights)
+        if match
+    })
+    if not indices:
+        raise ValueError("No '_network.model.N.weight' tensors found")
+    return indices
+
+
+def sample_inputs(n: int, seed: int = 0, dtype=np.float32) -> np.ndarray:
+    """Uniform samples from the INPUT_RANGES box, shape [n, 10] in INPUT_NAMES order"""
+    rng = np.random.default_rng(seed)
+    low, high = np.array([INPUT_RANGES[name] for name in INPUT_NAMES]).T
+    return (low + (high - low) * rng.random((n, len(INPUT_NAMES)))).astype(dtype)
+
+
+class QLKNNNumpy:
+    """
+    Batched ReLU MLP forward pass with zero per-call allocation
+
+    Rows are processed in chunks of `chunk_size` through two preallocated
+    ping-pong activation buffers; every layer is one in-place
+    `np.matmul(out=...)`, bias add and `np.maximum(out=...)`.
+    Low-rank layers (W = up @ down) take two thin matmuls through a rank-r buffer.
+    The final layer writes straight into the caller's output array.
+    Instances are not thread-safe (buffers are shared between calls).
+    """
+
+    def __init__(self, weights: dict, dtype=np.float32, chunk_size: int = 8192):
+        self.dtype = np.dtype(dtype)
+        self.chunk_size = chunk_size
+
+        # Keep W as [out, in] like MLX Linear and multiply by the transposed view;
+        # BLAS handles the transpose, so no weight copy is made when dtypes match.
+        # Each layer is (W.T, bias, None), or (down.T, bias, up.T) when factorized.
+        self.layers = []
+        for index in layer_indices(weights):
+            name = f'_network.model.{index}'
+            bias = np.asarray(weights[f'{name}.bias']).astype(self.dtype, copy=False)
+            if f'{name}.weight' in weights:
+                weight = np.asarray(weights[f'{name}.weight']).astype(self.dtype, copy=False)
+                self.layers.append((weight.T, bias, None))
+            else:
+                down = np.asarray(weights[f'{name}.weight_down']).astype(self.dtype, copy=False)
+                up = np.asarray(weights[f'{name}.weight_up']).astype(self.dtype, copy=False)
+                self.layers.append((down.T, bias, up.T))
+
+        self.input_dim = self.layers[0][0].shape[0]
+        self.output_dim = self.layers[-1][1].shape[0]
+
+        width = max(bias.shape[0] for _, bias, _ in self.layers[:-1])
+        rank = max((weight_t.shape[1] for weight_t, _, up_t in self.layers if up_t is not None), default=0)
+        self._input = np.empty((chunk_size, self.input_dim), dtype=self.dtype)
+        self._buffers = [np.empty(chunk_size * width, dtype=self.dtype) for _ in range(2)]
+        self._rank_buffer = np.empty(chunk_size * rank, dtype=self.dtype)
+
+    @classmethod
+    def load(cls, path=DEFAULT_WEIGHTS, **kwargs) -> 'QLKNNNumpy':
+        """Build an engine from a weights file"""
+        return cls(load_weights(path), **kwargs)
+
+    def __call__(self, x: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """Forward pass: [n, 10] -> [n, 8], written into `out` when given"""
+        x = np.asarray(x)
+        if x.ndim != 2 or x.shape[1] != self.input_dim:
+            raise ValueError(f"Expected input of shape [n, {self.input_dim}], got {x.shape}")
+
+        n = x.shape[0]
+        if out is None:
+            out = np.empty((n, self.output_dim), dtype=self.dtype)
+        elif out.shape != (n, self.output_dim):
+            raise ValueError(f"Expected output of shape {(n, self.output_dim)}, got {out.shape}")
+
+        for start in range(0, n, self.chunk_size):
+            stop = min(start + self.chunk_size, n)
+            self._forward(x[start:stop], out[start:stop])
+        return out
+
+    def _forward(self, x: np.ndarray, out: np.ndarray):
+        n = x.shape[0]
+        if x.dtype != self.dtype:
+            self._input[:n] = x
+            x = self._input[:n]
+
+        h = x
+        last = len(self.layers) - 1
+        for i, (weight_t, bias, up_t) in enumerate(self.layers):
+            if i == last:
+                dst = out
+            else:
+                width = bias.shape[0]
+                dst = self._buffers[i % 2][:n * width].reshape(n, width)
+            if up_t is None:
+                np.matmul(h, weight_t, out=dst)
+            else:
+                rank = weight_t.shape[1]
+                low = self._rank_buffer[:n * rank].reshape(n, rank)
+                np.matmul(h, weight_t, out=low)
+                np.matmul(low, up_t, out=dst)
+            np.add(dst, bias, out=dst)
+            if i != last:
+                np.maximum(dst, 0, out=dst)
+            h = dst
+
+    def value_and_jacobian(self, x: np.ndarray, chunk_size: int = 256) -> tuple:
+        """
+        Outputs [n, 8] and Jacobian d(output)/d(input) [n, 8, 10] in one sweep
+
+        The forward pass records each hidden layer's ReLU mask; the Jacobian is
+        then built in reverse mode, W_last ⊙ mask → @ W → ⊙ mask → ... → @ W_0,
+        carrying 8 adjoint rows per sample (cheaper than 10 input tangents).
+        Each layer is one GEMM over the chunk's rows * 8 adjoints; chunks are
+        kept small so the [rows, 8, width] adjoints stay in cache.
+        """
+        x = np.asarray(x, dtype=self.dtype)
+        if x.ndim != 2 or x.shape[1] != self.input_dim:
+            raise ValueError(f"Expected input of shape [n, {self.input_dim}], got {x.shape}")
+        n = x.shape[0]
+        outputs = np.empty((n, self.output_dim), dtype=self.dtype)
+        jacobian = np.empty((n, self.output_dim, self.input_dim), dtype=self.dtype)
+
+        # adjoint @ W for W = weight_t.T, or up_t.T @ weight_t.T for low-rank layers
+        def pull_back(adjoint, weight_t, up_t):
+            return adjoint @ weight_t.T if up_t is None else (adjoint @ up_t.T) @ weight_t.T
+
+        # The last layer's W [8, width] seeds the adjoints of every sample
+        last_weight_t, last_bias, last_up_t = self.layers[-1]
+        seed = pull_back(np.eye(self.output_dim, dtype=self.dtype), last_weight_t, last_up_t)
+
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            h = x[start:stop]
+            masks = []
+            for weight_t, bias, up_t in self.layers[:-1]:
+                h = h @ weight_t if up_t is None else (h @ weight_t) @ up_t
+                h += bias
+                masks.append(h > 0)
+                np.maximum(h, 0, out=h)
+            h = h @ last_weight_t if last_up_t is None else (h @ last_weight_t) @ last_up_t
+            np.add(h, last_bias, out=outputs[start:stop])
+
+            rows = stop - start
+            adjoint = seed * masks[-1][:, None, :]
+            for i in range(len(masks) - 1, 0, -1):
+                weight_t, _, up_t = self.layers[i]
+                adjoint = pull_back(adjoint.reshape(rows * self.output_dim, -1), weight_t, up_t)
+                adjoint = adjoint.reshape(rows, self.output_dim, -1)
+                adjoint *= masks[i - 1][:, None, :]
+            weight_t, _, up_t = self.layers[0]
+            jacobian[start:stop] = pull_back(adjoint.reshape(rows * self.output_dim, -1), weight_t,
+                                             up_t).reshape(rows, self.output_dim, -1)
+        return outputs, jacobian
+
+    def jacobian(self, x: np.ndarray) -> np.ndarray:
+        """d(output)/d(input), [n, 8, 10]"""
+        return self.value_and_jacobian(x)[1]
+
+    def predict(self, inputs: dict) -> dict:
+        """Dictionary API matching QLKNNNetwork.predict"""
+        x = np.column_stack([np.asarray(inputs[name], dtype=self.dtype).reshape(-1) for name in INPUT_NAMES])
+        outputs = self(x)
+        return {name: outputs[:, idx] for idx, name in enumerate(OUTPUT_NAMES)}
+
+
+if __name__ == '__main__':
+    import sys
+
+    weights_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_WEIGHTS
+    engine = QLKNNNumpy.load(weights_path)
+    print(f"Loaded {weights_path} ({len(engine.layers)} layers)")
+
+    test_input = np.array([[5.0, 5.0, 1.0, 1.0, 2.0, 1.0, 0.3, 1.0, -10.0, 1.0]], dtype=np.float32)
+    outputs = engine(test_input)
+    for idx, name in enumerate(OUTPUT_NAMES):
+        print(f"  {name}: {outputs[0, idx]:.6f}")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Mahalanobis out-of-distribution scorer for QLKNN inputs
+Fitted once on a reference sample of the training domain and stored in the
+model metadata under `ood`. Fitted on correlated reference inputs, it flags
+combinations that break the correlation (e.g. high Ati with low q when the two
+rise together) even though the range box of qlknn_validation lets them through.
+The bundled entry is fitted on independent uniform samples of INPUT_RANGES, so
+its covariance is diagonal and it only flags rows near corners of the box;
+fit on real operating points (converter --ood-reference) to catch correlations
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from qlknn_numpy import DEFAULT_WEIGHTS, INPUT_NAMES, INPUT_RANGES, sample_inputs
+
+DEFAULT_QUANTILE = 0.999
+# `reference.source` of an entry fitted on uniform INPUT_RANGES samples (converter --ood)
+UNIFORM_BOX_SOURCE = 'uniform_box'
+DEFAULT_METADATA = DEFAULT_WEIGHTS.with_name(DEFAULT_WEIGHTS.name.replace('_weights.safetensors', '_metadata.json'))
+
+
+def fit(reference: np.ndarray, quantile: float = DEFAULT_QUANTILE, ridge: float = 1e-6) -> dict:
+    """
+    Metadata entry for a scorer fitted on [m, 10] reference inputs
+
+    Mean and covariance are computed in float64. The whitening matrix W is the
+    inverse Cholesky factor of the covariance (with `ridge` times its diagonal
+    added so a degenerate reference still factorizes), so the score is
+    d^2 = |W (x - mean)|^2. `threshold` is the `quantile` of the reference's
+    own scores.
+    """
+    reference = np.asarray(reference, dtype=np.float64)
+    if reference.ndim != 2 or reference.shape[1] != len(INPUT_NAMES):
+        raise ValueError(f"Expected reference of shape [m, {len(INPUT_NAMES)}], got {reference.shape}")
+    if len(reference) <= len(INPUT_NAMES):
+        raise ValueError(f"Need more than {len(INPUT_NAMES)} reference rows, got {len(reference)}")
+    if not np.isfinite(reference).all():
+        raise ValueError("Reference sample contains NaN or Inf")
+
+    mean = reference.mean(axis=0)
+    covariance = np.cov(reference, rowvar=False)
+    covariance += ridge * np.diag(np.diag(covariance))
+    whitening = np.linalg.inv(np.linalg.cholesky(covariance))
+
+    scores = np.square((reference - mean) @ whitening.T).sum(axis=1)
+    return {
+        'metric': 'mahalanobis_squared',
+        'mean': mean.tolist(),
+        'whitening': whitening.tolist(),
+        'threshold': float(np.quantile(scores, quantile)),
+        'quantile': quantile,
+        'samples': len(reference),
+    }
+
+
+def correlated_inputs(n: int, seed: int = 0, names: tuple = ('Ati', 'q'), shared: float = 0.7) -> np.ndarray:
+    """
+    INPUT_RANGES samples in which `names` rise together (demo and test reference)
+
+    Each named input is `shared` parts a common uniform draw and the rest its
+    own, scaled to its range: correlation ~0.84 at 0.7, every row inside the box.
+    """
+    rng = np.random.default_rng(seed)
+    x = sample_inputs(n, seed=seed)
+    common = rng.random(n)
+    for name in names:
+        low, high = INPUT_RANGES[name]
+        x[:, INPUT_NAMES.index(name)] = low + (high - low) * (shared * common + (1 - shared) * rng.random(n))
+    return x
+
+
+class OODScorer:
+    """
+    Squared Mahalanobis distance of [n, 10] inputs from the reference sample
+
+    The mean is folded into an offset, W @ mean, so scoring is one [10, 10]
+    matmul, a subtraction and a row-wise dot product: about 1/700 of the
+    MLP's FLOPs. Rows scoring above `threshold` are out of distribution.
+    """
+
+    def __init__(self, entry: dict, chunk_size: int = 65536):
+        whitening = np.asarray(entry['whitening'], dtype=np.float64)
+        mean = np.asarray(entry['mean'], dtype=np.float64)
+        if whitening.shape != (len(INPUT_NAMES), len(INPUT_NAMES)) or mean.shape != (len(INPUT_NAMES),):
+            raise ValueError(f"OOD entry has mean {mean.shape} and whitening {whitening.shape}, "
+                             f"expected ({len(INPUT_NAMES)},) and {(len(INPUT_NAMES),) * 2}")
+        self.whitening_t = np.ascontiguousarray(whitening.T, dtype=np.float32)
+        self.offset = (whitening @ mean).astype(np.float32)
+        self.threshold = float(entry['threshold'])
+        self.chunk_size = chunk_size
+        self._z = np.empty((chunk_size, len(INPUT_NAMES)), dtype=np.float32)
+
+    @classmethod
+    def load(cls, metadata_path=DEFAULT_METADATA, allow_uniform_box: bool = False, **kwargs) -> 'OODScorer':
+        """
+        Scorer from the `ood` entry of a `<model>_metadata.json`
+
+        Entries fitted on uniform INPUT_RANGES samples (the bundled one) are
+        refused unless `allow_uniform_box`: they only flag the corners of the
+        range box, not correlated extrapolation.
+        """
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+        if 'ood' not in metadata:
+            raise ValueError(f"{metadata_path} has no 'ood' entry; convert with --ood or --ood-reference")
+        entry = metadata['ood']
+        if entry.get('reference', {}).get('source') == UNIFORM_BOX_SOURCE and not allow_uniform_box:
+            raise ValueError(f"{metadata_path} has an 'ood' entry fitted on uniform input-range samples, which "
+                             f"only flags corners of the range box; refit with --ood-reference on real operating "
+                             f"points, or pass allow_uniform_box=True to use it as a corner check")
+        return cls(entry, **kwargs)
+
+    def __call__(self, x: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """[n, 10] -> [n] float32 scores"""
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim != 2 or x.shape[1] != len(INPUT_NAMES):
+            raise ValueError(f"Expected input of shape [n, {len(INPUT_NAMES)}], got {x.shape}")
+        if out is None:
+            out = np.empty(len(x), dtype=np.float32)
+
+        for start in range(0, len(x), self.chunk_size):
+            chunk = x[start:start + self.chunk_size]
+            z = np.matmul(chunk, self.whitening_t, out=self._z[:len(chunk)])
+            z -= self.offset
+            np.einsum('ij,ij->i', z, z, out=out[start:start + len(chunk)])
+        return out
+
+    def flag(self, x: np.ndarray) -> np.ndarray:
+        """[n] bool, True where a row is out of distribution"""
+        return self(x) > self.threshold
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from qlknn_numpy import QLKNNNumpy
+    from qlknn_validation import validate_batch
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--metadata', default=str(DEFAULT_METADATA), help='metadata JSON with an `ood` entry')
+    parser.add_argument('--reference', help='[m, 10] .npy to fit on instead of reading --metadata')
+    parser.add_argument('-n', '--samples', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if args.reference:
+        scorer = OODScorer(fit(np.load(args.reference)))
+    elif 'ood' in json.loads(Path(args.metadata).read_text()):
+        scorer = OODScorer.load(args.metadata, allow_uniform_box=True)
+    else:
+        print(f"{args.metadata} has no 'ood' entry; fitting on {args.samples:,} INPUT_RANGES samples")
+        scorer = OODScorer(fit(sample_inputs(args.samples, seed=1)))
+
+    x = sample_inputs(args.samples)
+    start = time.perf_counter()
+    scores = scorer(x)
+    scoring = time.perf_counter() - start
+
+    engine = QLKNNNumpy.load()
+    start = time.perf_counter()
+    engine(x)
+    forward = time.perf_counter() - start
+
+    print(f"{args.samples:,} rows scored in {scoring * 1e3:.1f} ms ({args.samples / scoring:,.0f} rows/s, "
+          f"{100 * scoring / forward:.1f}% of a forward pass); threshold {scorer.threshold:.2f}, "
+          f"flagged {100 * np.mean(scores > scorer.threshold):.2f}% of uniform samples")
+
+    # Correlated extrapolation: Ati and q rise together in the reference, then rows put Ati at its
+    # maximum with q at its minimum. Every input stays inside its range, so the box check passes them.
+    correlated = OODScorer(fit(correlated_inputs(args.samples, seed=1)))
+    typical = correlated_inputs(args.samples, seed=2)
+    opposed = typical.copy()
+    opposed[:, INPUT_NAMES.index('Ati')] = INPUT_RANGES['Ati'][1]
+    opposed[:, INPUT_NAMES.index('q')] = INPUT_RANGES['q'][0]
+    print(f"Ati and q correlated {np.corrcoef(typical[:, 0], typical[:, 4])[0, 1]:.2f} in the reference; "
+          f"max Ati + min q rows pass the range box: {100 * np.mean(validate_batch(opposed) == 0):.0f}%")
+    print(f"  flagged by a fit on the correlated reference: typical rows "
+          f"{100 * np.mean(correlated.flag(typical)):.2f}%, max Ati + min q {100 * np.mean(correlated.flag(opposed)):.2f}%")
+    print(f"  flagged by the scorer above:                  typical rows "
+          f"{100 * np.mean(scorer.flag(typical)):.2f}%, max Ati + min q {100 * np.mean(scorer.flag(opposed)):.2f}%")
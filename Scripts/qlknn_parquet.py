@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Streaming QLKNN evaluation of columnar datasets (Parquet or Arrow IPC)
+Record batches are read lazily, evaluated, and written out with the eight
+output columns appended, so memory stays bounded by the batch size
+
+Requires pyarrow (pip install pyarrow).
+"""
+
+from pathlib import Path
+import time
+
+import numpy as np
+
+from qlknn_numpy import DEFAULT_WEIGHTS, INPUT_NAMES, OUTPUT_NAMES, QLKNNNumpy
+
+ARROW_SUFFIXES = {'.arrow', '.feather', '.ipc'}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError("qlknn_parquet needs pyarrow: pip install pyarrow") from error
+    return pyarrow
+
+
+def iter_batches(path, batch_rows: int = 65536, columns: list = None):
+    """Record batches of at most `batch_rows` rows from a Parquet or Arrow IPC file"""
+    pa = _pyarrow()
+    path = Path(path)
+    if path.suffix in ARROW_SUFFIXES:
+        # Memory-mapped IPC file: batches are zero-copy views, re-sliced to batch_rows
+        reader = pa.ipc.open_file(pa.memory_map(str(path)))
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, batch_rows):
+                yield batch.slice(start, batch_rows)
+    else:
+        # pre_buffer caches every row group read so far; without it memory stays at one batch
+        parquet_file = pa.parquet.ParquetFile(path, pre_buffer=False)
+        yield from parquet_file.iter_batches(batch_size=batch_rows, columns=columns)
+
+
+def batch_to_inputs(batch, out: np.ndarray = None) -> np.ndarray:
+    """[n, 10] float32 matrix from a record batch's INPUT_NAMES columns, filled column by column"""
+    n = batch.num_rows
+    if out is None:
+        out = np.empty((n, len(INPUT_NAMES)), dtype=np.float32)
+    for j, name in enumerate(INPUT_NAMES):
+        column = batch.column(name)
+        if column.null_count:
+            raise ValueError(f"Column '{name}' has {column.null_count} null values")
+        out[:n, j] = column.to_numpy(zero_copy_only=False)
+    return out[:n]
+
+
+class _Writer:
+    """Parquet or Arrow IPC writer chosen by suffix, opened on the first batch"""
+
+    def __init__(self, path, compression: str = 'zstd'):
+        self.path = Path(path)
+        self.compression = compression
+        self._writer = None
+
+    def write(self, batch):
+        pa = _pyarrow()
+        if self._writer is None:
+            if self.path.suffix in ARROW_SUFFIXES:
+                self._writer = pa.ipc.new_file(str(self.path), batch.schema)
+            else:
+                self._writer = pa.parquet.ParquetWriter(self.path, batch.schema, compression=self.compression)
+        self._writer.write_batch(batch)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def evaluate_file(input_path, output_path, weights_path=DEFAULT_WEIGHTS, batch_rows: int = 65536,
+                  keep_columns: bool = True, prefix: str = '', compression: str = 'zstd', engine=None) -> dict:
+    """
+    Evaluate every row of `input_path` and write `output_path`
+
+    The output holds the input columns (only the ten INPUT_NAMES columns
+    without `keep_columns`) followed by `prefix + name` for each of
+    OUTPUT_NAMES, as float32. Returns row/batch counts and timings.
+    """
+    pa = _pyarrow()
+    input_path, output_path = Path(input_path), Path(output_path)
+    if input_path.resolve() == output_path.resolve():
+        raise ValueError("Output path must differ from the input path")
+
+    engine = engine or QLKNNNumpy.load(weights_path)
+    output_names = [prefix + name for name in OUTPUT_NAMES]
+    inputs = np.empty((batch_rows, len(INPUT_NAMES)), dtype=np.float32)
+    # Outputs are computed [n, 8] then transposed once, so each Arrow column is contiguous
+    outputs = np.empty((batch_rows, len(OUTPUT_NAMES)), dtype=np.float32)
+
+    stats = {'rows': 0, 'batches': 0, 'read_s': 0.0, 'evaluate_s': 0.0, 'write_s': 0.0}
+    writer = _Writer(output_path, compression)
+    batches = iter_batches(input_path, batch_rows, None if keep_columns else list(INPUT_NAMES))
+    try:
+        while True:
+            t0 = time.perf_counter()
+            batch = next(batches, None)
+            if batch is None:
+                break
+            missing = [name for name in INPUT_NAMES if name not in batch.schema.names]
+            if missing:
+                raise ValueError(f"{input_path} is missing input columns {missing}")
+            clashing = [name for name in output_names if name in batch.schema.names]
+            if clashing:
+                raise ValueError(f"{input_path} already has columns {clashing}; pass a prefix")
+            x = batch_to_inputs(batch, inputs)
+
+            t1 = time.perf_counter()
+            y = engine(x, outputs[:batch.num_rows])
+            columns = np.ascontiguousarray(y.T)
+
+            t2 = time.perf_counter()
+            result = pa.RecordBatch.from_arrays(
+                batch.columns + [pa.array(column) for column in columns],
+                names=batch.schema.names + output_names,
+            )
+            writer.write(result)
+
+            stats['read_s'] += t1 - t0
+            stats['evaluate_s'] += t2 - t1
+            stats['write_s'] += time.perf_counter() - t2
+            stats['rows'] += batch.num_rows
+            stats['batches'] += 1
+    finally:
+        writer.close()
+    return stats
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='.parquet, or .arrow/.feather/.ipc (Arrow IPC file)')
+    parser.add_argument('output', help='output file; format chosen by suffix like the input')
+    parser.add_argument('--weights', default=str(DEFAULT_WEIGHTS))
+    parser.add_argument('--batch-rows', type=int, default=65536, help='rows per record batch (bounds memory)')
+    parser.add_argument('--inputs-only', action='store_true', help='drop input columns other than the ten inputs')
+    parser.add_argument('--prefix', default='', help='prefix for the output column names')
+    parser.add_argument('--compression', default='zstd', help='Parquet compression codec')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = evaluate_file(args.input, args.output, args.weights, args.batch_rows, not args.inputs_only,
+                          args.prefix, args.compression)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {stats['rows']:,} rows in {stats['batches']} batches -> {args.output} "
+          f"({stats['rows'] / elapsed:,.0f} rows/s: read {stats['read_s']:.2f}s, "
+          f"evaluate {stats['evaluate_s']:.2f}s, write {stats['write_s']:.2f}s)")
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Shared-memory process pool for large offline QLKNN sweeps
+Workers memory-map the weights and evaluate slices of shared input/output
+arenas in place; only (start, stop) descriptors cross process boundaries
+"""
+
+from multiprocessing import shared_memory
+import multiprocessing
+import queue
+
+import numpy as np
+
+from qlknn_numpy import DEFAULT_WEIGHTS, INPUT_NAMES, OUTPUT_NAMES
+
+# Seconds between worker liveness checks while waiting for results
+POLL_SECONDS = 0.5
+
+
+def _attach(name: str, shape: tuple) -> tuple:
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=np.float32, buffer=block.buf)
+
+
+def _worker(weights_path: str, input_name: str, output_name: str, capacity: int, tasks, done):
+    from qlknn_numpy import QLKNNNumpy
+
+    # .safetensors and packed weights are mmapped read-only: one page-cache copy for all workers
+    engine = QLKNNNumpy.load(weights_path)
+    input_block, inputs = _attach(input_name, (capacity, len(INPUT_NAMES)))
+    output_block, outputs = _attach(output_name, (capacity, len(OUTPUT_NAMES)))
+    try:
+        while (task := tasks.get()) is not None:
+            start, stop = task
+            try:
+                engine(inputs[start:stop], outputs[start:stop])
+                done.put((start, None))
+            except Exception as error:
+                done.put((start, f"{type(error).__name__}: {error}"))
+    finally:
+        del inputs, outputs
+        input_block.close()
+        output_block.close()
+
+
+class QLKNNPool:
+    """
+    Worker processes evaluating slices of shared [capacity, 10] -> [capacity, 8] arenas
+
+    Write inputs into `inputs[:n]` and call `run(n)` to evaluate in place, or
+    call the pool with an array (copied into the arena in `capacity`-row
+    windows). Each window is split into `slice_rows`-row (start, stop) tasks;
+    no array data is pickled. Use as a context manager, or call `close()`, to
+    stop the workers and free the shared memory.
+
+    If a worker process dies (killed, out of memory, crash in native code),
+    `run` raises RuntimeError, within `POLL_SECONDS` if it happens mid-run,
+    instead of waiting for its results forever, and the pool is closed: a
+    worker killed while holding the task queue lock would block the others.
+    """
+
+    def __init__(self, weights_path=DEFAULT_WEIGHTS, processes: int = None, capacity: int = 1 << 20,
+                 slice_rows: int = 65536, context: str = None):
+        self.capacity = capacity
+        self.slice_rows = slice_rows
+        self.processes = processes or multiprocessing.cpu_count()
+
+        self._input_block = shared_memory.SharedMemory(create=True, size=capacity * len(INPUT_NAMES) * 4)
+        self._output_block = shared_memory.SharedMemory(create=True, size=capacity * len(OUTPUT_NAMES) * 4)
+        self.inputs = np.ndarray((capacity, len(INPUT_NAMES)), dtype=np.float32, buffer=self._input_block.buf)
+        self.outputs = np.ndarray((capacity, len(OUTPUT_NAMES)), dtype=np.float32, buffer=self._output_block.buf)
+
+        ctx = multiprocessing.get_context(context)
+        self._tasks = ctx.SimpleQueue()
+        self._done = ctx.Queue()
+        self._workers = [
+            ctx.Process(target=_worker, daemon=True,
+                        args=(str(weights_path), self._input_block.name, self._output_block.name, capacity,
+                              self._tasks, self._done))
+            for _ in range(self.processes)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def run(self, n: int) -> np.ndarray:
+        """Evaluate `inputs[:n]` into `outputs[:n]` and return that view"""
+        if not 0 <= n <= self.capacity:
+            raise ValueError(f"n must be between 0 and the arena capacity {self.capacity}, got {n}")
+        if self._workers is None:
+            raise RuntimeError("Pool is closed")
+        self._check_workers()
+        starts = range(0, n, self.slice_rows)
+        for start in starts:
+            self._tasks.put((start, min(start + self.slice_rows, n)))
+
+        errors = []
+        remaining = len(starts)
+        while remaining:
+            try:
+                start, error = self._done.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            remaining -= 1
+            if error is not None:
+                errors.append(f"rows {start}+: {error}")
+        if errors:
+            raise RuntimeError("Worker failed on " + "; ".join(errors))
+        return self.outputs[:n]
+
+    def __call__(self, x: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """[n, 10] -> [n, 8], any n (processed in arena-sized windows)"""
+        x = np.asarray(x)
+        if x.ndim != 2 or x.shape[1] != len(INPUT_NAMES):
+            raise ValueError(f"Expected input of shape [n, {len(INPUT_NAMES)}], got {x.shape}")
+        if out is None:
+            out = np.empty((len(x), len(OUTPUT_NAMES)), dtype=np.float32)
+
+        for start in range(0, len(x), self.capacity):
+            stop = min(start + self.capacity, len(x))
+            self.inputs[:stop - start] = x[start:stop]
+            out[start:stop] = self.run(stop - start)
+        return out
+
+    def close(self):
+        if self._workers is None:
+            return
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = None
+        self._free()
+
+    def _check_workers(self):
+        """Raise (and close the pool) if any worker process has exited"""
+        dead = [worker for worker in self._workers if not worker.is_alive()]
+        if dead:
+            self._terminate()
+            raise RuntimeError("Worker process died: " + ", ".join(
+                f"pid {worker.pid} exit code {worker.exitcode}" for worker in dead))
+
+    def _terminate(self):
+        """Stop workers without draining the task queue (after a worker died)"""
+        for worker in self._workers:
+            worker.terminate()
+        for worker in self._workers:
+            worker.join()
+        self._workers = None
+        self._free()
+
+    def _free(self):
+        self._done.close()
+        del self.inputs, self.outputs
+        for block in (self._input_block, self._output_block):
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from qlknn_numpy import QLKNNNumpy, sample_inputs
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--weights', default=str(DEFAULT_WEIGHTS))
+    parser.add_argument('-j', '--processes', type=int, default=None, help='workers (default: CPU count)')
+    parser.add_argument('-n', '--samples', type=int, default=4_000_000)
+    parser.add_argument('--capacity', type=int, default=1 << 20, help='arena rows')
+    parser.add_argument('--slice-rows', type=int, default=65536)
+    args = parser.parse_args()
+
+    x = sample_inputs(args.samples)
+    engine = QLKNNNumpy.load(args.weights)
+    start = time.perf_counter()
+    expected = engine(x)
+    single = time.perf_counter() - start
+
+    with QLKNNPool(args.weights, args.processes, args.capacity, args.slice_rows) as pool:
+        pool(x[:args.slice_rows])  # workers load and touch the weights
+        start = time.perf_counter()
+        actual = pool(x)
+        pooled = time.perf_counter() - start
+
+        print(f"{args.samples:,} rows: in-process {args.samples / single:,.0f} rows/s, "
+              f"pool of {pool.processes} {args.samples / pooled:,.0f} rows/s, "
+              f"max |diff| {np.abs(actual - expected).max():.2e}")
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Micro-batching QLKNN inference server on a Unix domain socket
+Concurrent requests arriving within a short window are coalesced into one
+batch for the reference engine and the results scattered back
+
+Wire format (little-endian):
+  request   uint32 n, then n x 10 float32 rows in INPUT_NAMES order
+  response  uint32 n, then n x 8 float32 rows in OUTPUT_NAMES order
+  n = 0     metrics request; response is uint32 0, uint32 length, JSON
+  error     uint32 0xFFFFFFFF, uint32 length, UTF-8 message
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
+import socket
+import struct
+import time
+
+import numpy as np
+
+from qlknn_numpy import INPUT_NAMES, OUTPUT_NAMES
+
+HEADER = struct.Struct('<I')
+METRICS_REQUEST = 0
+ERROR = 0xFFFFFFFF
+MAX_REQUEST_ROWS = 1 << 20
+
+
+class Metrics:
+    """Request, batch and latency counters; latency percentiles over the last `window` requests"""
+
+    def __init__(self, window: int = 10000):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.compute_seconds = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def record_batch(self, requests: int, rows: int, seconds: float):
+        self.requests += requests
+        self.rows += rows
+        self.batches += 1
+        self.compute_seconds += seconds
+
+    def snapshot(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        latencies = np.array(self.latencies) * 1e3
+        percentiles = np.percentile(latencies, [50, 95, 99]) if len(latencies) else [0.0] * 3
+        return {
+            'uptime_s': elapsed,
+            'requests': self.requests,
+            'rows': self.rows,
+            'batches': self.batches,
+            'errors': self.errors,
+            'rows_per_s': self.rows / elapsed if elapsed else 0.0,
+            'mean_batch_rows': self.rows / self.batches if self.batches else 0.0,
+            'mean_batch_requests': self.requests / self.batches if self.batches else 0.0,
+            'engine_busy': self.compute_seconds / elapsed if elapsed else 0.0,
+            'latency_ms': dict(zip(('p50', 'p95', 'p99'), map(float, percentiles))),
+        }
+
+
+class MicroBatchServer:
+    """
+    Coalesces concurrent [n, 10] requests into batches for `engine`
+
+    The batcher waits for a first request, takes everything already queued,
+    then keeps collecting for up to `window` seconds, until `max_batch`
+    rows are queued (`max_batch=1` disables coalescing) or until every
+    connected client has a request in the batch, concatenates,
+    runs the engine once and resolves every request with its slice.
+    The engine runs on one worker thread (engines are not thread-safe), so
+    the event loop keeps accepting requests for the next batch meanwhile.
+    """
+
+    def __init__(self, engine, window: float = 0.002, max_batch: int = 65536):
+        self.engine = engine
+        self.window = window
+        self.max_batch = max_batch
+        self.metrics = Metrics()
+        self._queue = None
+        self._connections = 0
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    async def evaluate(self, x: np.ndarray) -> np.ndarray:
+        """Queue one request and wait for its rows of the batched result"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((x, future, time.perf_counter()))
+        return await future
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            rows = len(pending[0][0])
+            # Requests that queued up while the previous batch ran join without waiting
+            while rows < self.max_batch and not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+                rows += len(pending[-1][0])
+            # Clients keep one request in flight, so once every connection is in the batch none can join
+            deadline = loop.time() + self.window
+            while rows < self.max_batch and len(pending) < self._connections:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                rows += len(pending[-1][0])
+
+            batch = np.concatenate([x for x, _, _ in pending]) if len(pending) > 1 else pending[0][0]
+            start = time.perf_counter()
+            try:
+                outputs = await loop.run_in_executor(self._executor, self.engine, batch)
+            except Exception as error:
+                for _, future, _ in pending:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            finished = time.perf_counter()
+            self.metrics.record_batch(len(pending), rows, finished - start)
+
+            offset = 0
+            for x, future, queued in pending:
+                if not future.done():
+                    future.set_result(outputs[offset:offset + len(x)])
+                self.metrics.latencies.append(finished - queued)
+                offset += len(x)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections += 1
+        try:
+            while True:
+                try:
+                    (n,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+                except asyncio.IncompleteReadError:
+                    break
+
+                if n == METRICS_REQUEST:
+                    payload = json.dumps(self.metrics.snapshot()).encode()
+                    writer.write(HEADER.pack(0) + HEADER.pack(len(payload)) + payload)
+                elif n > MAX_REQUEST_ROWS:
+                    self._write_error(writer, f"Request of {n} rows exceeds the limit of {MAX_REQUEST_ROWS}")
+                    await writer.drain()
+                    break
+                else:
+                    data = await reader.readexactly(n * len(INPUT_NAMES) * 4)
+                    x = np.frombuffer(data, dtype='<f4').reshape(n, len(INPUT_NAMES))
+                    try:
+                        outputs = await self.evaluate(x)
+                    except Exception as error:
+                        self._write_error(writer, str(error))
+                    else:
+                        writer.write(HEADER.pack(n) + np.ascontiguousarray(outputs, dtype='<f4').tobytes())
+                await writer.drain()
+        except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections -= 1
+            writer.close()
+
+    def _write_error(self, writer: asyncio.StreamWriter, message: str):
+        self.metrics.errors += 1
+        payload = message.encode()
+        writer.write(HEADER.pack(ERROR) + HEADER.pack(len(payload)) + payload)
+
+    async def serve(self, path: str):
+        """Serve on the Unix socket `path` until cancelled"""
+        self._queue = asyncio.Queue()
+        batcher = asyncio.create_task(self._batcher())
+        server = await asyncio.start_unix_server(self._handle, path=path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self._executor.shutdown(wait=False)
+
+
+def _read_exactly(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    while view:
+        received = sock.recv_into(view)
+        if not received:
+            raise ConnectionError("Server closed the connection")
+        view = view[received:]
+    return bytes(buffer)
+
+
+class QLKNNClient:
+    """Blocking client for one simulation process; one request in flight at a time"""
+
+    def __init__(self, path: str):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+
+    def _read_message(self) -> bytes:
+        (length,) = HEADER.unpack(_read_exactly(self.sock, HEADER.size))
+        return _read_exactly(self.sock, length)
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        """[n, 10] -> [n, 8] float32"""
+        x = np.ascontiguousarray(x, dtype='<f4')
+        if x.ndim != 2 or x.shape[1] != len(INPUT_NAMES) or len(x) == 0:
+            raise ValueError(f"Expected input of shape [n > 0, {len(INPUT_NAMES)}], got {x.shape}")
+        self.sock.sendall(HEADER.pack(len(x)) + x.tobytes())
+
+        (n,) = HEADER.unpack(_read_exactly(self.sock, HEADER.size))
+        if n == ERROR:
+            raise RuntimeError(self._read_message().decode())
+        data = _read_exactly(self.sock, n * len(OUTPUT_NAMES) * 4)
+        return np.frombuffer(data, dtype='<f4').reshape(n, len(OUTPUT_NAMES))
+
+    def metrics(self) -> dict:
+        self.sock.sendall(HEADER.pack(METRICS_REQUEST))
+        (n,) = HEADER.unpack(_read_exactly(self.sock, HEADER.size))
+        message = self._read_message().decode()
+        if n == ERROR:
+            raise RuntimeError(message)
+        return json.loads(message)
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _demo_client(path: str, seed: int, steps: int, cells: int, barrier):
+    from qlknn_numpy import sample_inputs
+
+    requests = [sample_inputs(cells, seed=seed * steps + step) for step in range(steps)]
+    with QLKNNClient(path) as client:
+        barrier.wait()
+        for x in requests:
+            client(x)
+
+
+if __name__ == '__main__':
+    import argparse
+    import multiprocessing
+    import os
+
+    from qlknn_numpy import DEFAULT_WEIGHTS, QLKNNNumpy
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--socket', default='/tmp/qlknn.sock')
+    parser.add_argument('--weights', default=str(DEFAULT_WEIGHTS))
+    parser.add_argument('--window-ms', type=float, default=2.0, help='coalescing window')
+    parser.add_argument('--max-batch', type=int, default=65536, help='dispatch early once this many rows queue up')
+    parser.add_argument('--metrics-interval', type=float, default=0, help='print metrics every N seconds (0: off)')
+    parser.add_argument('--demo-clients', type=int, default=0,
+                        help='instead of serving forever, run N client processes of --demo-steps requests, '
+                             'with and without coalescing')
+    parser.add_argument('--demo-steps', type=int, default=100)
+    parser.add_argument('--demo-cells', type=int, default=100)
+    args = parser.parse_args()
+
+    engine = QLKNNNumpy.load(args.weights)
+
+    async def report_metrics(server: MicroBatchServer):
+        while True:
+            await asyncio.sleep(args.metrics_interval)
+            print(json.dumps(server.metrics.snapshot()), flush=True)
+
+    async def run(server: MicroBatchServer) -> float:
+        """Serve forever, or for one demo run returning its wall time"""
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+        if args.metrics_interval > 0:
+            asyncio.create_task(report_metrics(server))
+        serving = asyncio.create_task(server.serve(args.socket))
+        if not args.demo_clients:
+            print(f"Serving {args.weights} on {args.socket}", flush=True)
+            await serving
+            return 0.0
+
+        while not os.path.exists(args.socket):
+            await asyncio.sleep(0.01)
+        # Time from when every client is connected with its requests prepared
+        barrier = multiprocessing.Barrier(args.demo_clients + 1)
+        clients = [multiprocessing.Process(target=_demo_client,
+                                           args=(args.socket, i, args.demo_steps, args.demo_cells, barrier))
+                   for i in range(args.demo_clients)]
+        for process in clients:
+            process.start()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, barrier.wait)
+        start = time.perf_counter()
+        server.metrics = Metrics()
+        await loop.run_in_executor(None, lambda: [process.join() for process in clients])
+        elapsed = time.perf_counter() - start
+        serving.cancel()
+        return elapsed
+
+    try:
+        server = MicroBatchServer(engine, args.window_ms / 1000, args.max_batch)
+        elapsed = asyncio.run(run(server))
+        if args.demo_clients:
+            baseline = MicroBatchServer(engine, 0.0, 1)
+            baseline_elapsed = asyncio.run(run(baseline))
+
+            total = args.demo_clients * args.demo_steps * args.demo_cells
+            print(json.dumps(server.metrics.snapshot(), indent=2))
+            print(f"{args.demo_clients} clients x {args.demo_steps} requests x {args.demo_cells} cells: "
+                  f"coalesced {total / elapsed:,.0f} rows/s, one dispatch per request "
+                  f"{total / baseline_elapsed:,.0f} rows/s (p50 latency "
+                  f"{server.metrics.snapshot()['latency_ms']['p50']:.2f} vs "
+                  f"{baseline.metrics.snapshot()['latency_ms']['p50']:.2f} ms)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
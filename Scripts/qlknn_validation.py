@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Single-pass validation of [n, 10] QLKNN input batches
+Flags non-finite and out-of-range inputs as a per-row bitmask instead of raising,
+mirroring QLKNN.validateBatch in Swift
+"""
+
+import numpy as np
+
+from qlknn_numpy import INPUT_NAMES, INPUT_RANGES
+
+# Bit j: input j is outside INPUT_RANGES (non-finite values included)
+# Bit NONFINITE_SHIFT + j: input j is NaN or +-Inf
+NONFINITE_SHIFT = 16
+
+# Kept in float64 and rounded to each batch's dtype, so a bound stored at the
+# input's own precision compares equal to itself
+_LOW, _HIGH = np.array([INPUT_RANGES[name] for name in INPUT_NAMES], dtype=np.float64).T
+
+
+def validate_batch(x: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    """
+    Per-row uint32 validation mask for an [n, 10] batch; 0 means the row is valid
+
+    Comparisons with NaN are false, so `low <= x <= high` also rejects NaN
+    (and +-Inf by range) and one pass over the batch covers both checks.
+    Rows are processed in chunks so temporaries stay small.
+    """
+    x = np.asarray(x)
+    if x.ndim != 2 or x.shape[1] != len(INPUT_NAMES):
+        raise ValueError(f"Expected input of shape [n, {len(INPUT_NAMES)}], got {x.shape}")
+
+    dtype = x.dtype if np.issubdtype(x.dtype, np.floating) else np.float64
+    low, high = _LOW.astype(dtype), _HIGH.astype(dtype)
+    masks = np.empty(x.shape[0], dtype=np.uint32)
+    for start in range(0, x.shape[0], chunk_size):
+        chunk = x[start:start + chunk_size]
+        outside = ~((chunk >= low) & (chunk <= high))
+        nonfinite = ~np.isfinite(chunk)
+        # 10 flags per row -> 2 bytes -> one little-endian uint16 per row
+        # (packbits keeps a Fortran-ordered input's layout, so make rows contiguous first)
+        range_bits = np.ascontiguousarray(np.packbits(outside, axis=1, bitorder='little')).view('<u2')[:, 0]
+        nonfinite_bits = np.ascontiguousarray(np.packbits(nonfinite, axis=1, bitorder='little')).view('<u2')[:, 0]
+        masks[start:start + len(chunk)] = range_bits | (nonfinite_bits.astype(np.uint32) << NONFINITE_SHIFT)
+    return masks
+
+
+def describe(mask: int) -> list:
+    """Human-readable problems for one row's mask"""
+    problems = []
+    for j, name in enumerate(INPUT_NAMES):
+        if mask & (1 << (NONFINITE_SHIFT + j)):
+            problems.append(f"{name} is not finite")
+        elif mask & (1 << j):
+            low, high = INPUT_RANGES[name]
+            problems.append(f"{name} outside [{low:g}, {high:g}]")
+    return problems
+
+
+def summarize(masks: np.ndarray) -> dict:
+    """Per-input counts of out-of-range and non-finite rows"""
+    masks = np.asarray(masks, dtype=np.uint32)
+    return {
+        name: {
+            'out_of_range': int(np.count_nonzero(masks & (1 << j))),
+            'nonfinite': int(np.count_nonzero(masks & (1 << (NONFINITE_SHIFT + j)))),
+        }
+        for j, name in enumerate(INPUT_NAMES)
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('inputs', nargs='?', help='[n, 10] .npy file (default: synthetic samples)')
+    parser.add_argument('-n', '--samples', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if args.inputs:
+        x = np.load(args.inputs, mmap_mode='r')
+    else:
+        from qlknn_numpy import sample_inputs
+        # Widen the sampled box by 10% on each side so some rows fall outside
+        x = sample_inputs(args.samples)
+        center = (_LOW + _HIGH) / 2
+        x = center + (x - center) * np.float32(1.2)
+
+    start = time.perf_counter()
+    masks = validate_batch(x)
+    elapsed = time.perf_counter() - start
+
+    invalid = np.count_nonzero(masks)
+    print(f"{len(x):,} rows validated in {elapsed * 1e3:.1f} ms ({len(x) / elapsed:,.0f} rows/s); "
+          f"{invalid:,} invalid ({100 * invalid / max(len(x), 1):.2f}%)")
+    for name, counts in summarize(masks).items():
+        print(f"  {name:<10} out of range {counts['out_of_range']:>10,}   non-finite {counts['nonfinite']:>8,}")
+    if invalid:
+        first = int(np.flatnonzero(masks)[0])
+        print(f"First invalid row {first}: {', '.join(describe(int(masks[first])))}")
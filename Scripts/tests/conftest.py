@@ -0,0 +1,70 @@
+"""
+Shared fixtures for the Scripts test suite
+Run from the repository root: python3 -m pytest Scripts/tests
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+# The conversion cache root is read at import time; keep tests out of ~/.cache
+os.environ['QLKNN_CONVERT_CACHE'] = tempfile.mkdtemp(prefix='qlknn-convert-test-')
+
+from qlknn_numpy import OUTPUT_NAMES, layer_indices, load_weights  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def weights() -> dict:
+    """Bundled QLKNN 7_11 weights as in-memory float32 arrays"""
+    return {name: np.array(array) for name, array in load_weights().items()}
+
+
+def build_onnx(path, weights: dict, scale: float = 1.0) -> Path:
+    """
+    Write a Gemm + ReLU QLKNN graph with one [batch, 1] output per flux
+
+    Same layout as the published qlknn_7_11.onnx; `scale` multiplies the
+    weights so tests can produce a different graph with the same topology.
+    """
+    onnx = pytest.importorskip('onnx')
+    from onnx import TensorProto, helper, numpy_helper
+
+    nodes, initializers = [], []
+    hidden = 'input'
+    indices = layer_indices(weights)
+    for index in indices:
+        weight_name, bias_name = f'_network.model.{index}.weight', f'_network.model.{index}.bias'
+        initializers.append(numpy_helper.from_array((weights[weight_name] * scale).astype(np.float32), weight_name))
+        initializers.append(numpy_helper.from_array(weights[bias_name].astype(np.float32), bias_name))
+        nodes.append(helper.make_node('Gemm', [hidden, weight_name, bias_name], [f'gemm{index}'], transB=1))
+        hidden = f'gemm{index}'
+        if index != indices[-1]:
+            nodes.append(helper.make_node('Relu', [hidden], [f'relu{index}']))
+            hidden = f'relu{index}'
+
+    initializers.append(numpy_helper.from_array(np.ones(len(OUTPUT_NAMES), dtype=np.int64), 'split'))
+    nodes.append(helper.make_node('Split', [hidden, 'split'], OUTPUT_NAMES, axis=1))
+    graph = helper.make_graph(
+        nodes, 'qlknn',
+        [helper.make_tensor_value_info('input', TensorProto.FLOAT, ['batch', 10])],
+        [helper.make_tensor_value_info(name, TensorProto.FLOAT, ['batch', 1]) for name in OUTPUT_NAMES],
+        initializers,
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid('', 13)], ir_version=9)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    onnx.save(model, path)
+    return path
+
+
+@pytest.fixture
+def onnx_path(tmp_path, weights) -> Path:
+    """`qlknn_7_11.onnx` rebuilt from the bundled weights"""
+    return build_onnx(tmp_path / 'models' / 'qlknn_7_11.onnx', weights)
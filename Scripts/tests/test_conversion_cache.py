@@ -0,0 +1,111 @@
+"""Content-addressed conversion cache: hits, invalidation and concurrent index updates"""
+
+import json
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip('onnx')
+pytest.importorskip('safetensors')
+
+import convert_onnx_to_safetensors
+from conftest import build_onnx
+from conversion_cache import INDEX_NAME, ConversionCache
+from convert_onnx_to_safetensors import convert_with_cache
+from qlknn_numpy import load_weights
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ConversionCache(tmp_path / 'cache')
+
+
+@pytest.fixture
+def conversions(monkeypatch):
+    """Count real (uncached) conversions"""
+    calls = []
+    convert = convert_onnx_to_safetensors.convert_onnx_to_safetensors
+
+    def counting(*args, **kwargs):
+        calls.append(args[0])
+        return convert(*args, **kwargs)
+
+    monkeypatch.setattr(convert_onnx_to_safetensors, 'convert_onnx_to_safetensors', counting)
+    return calls
+
+
+def test_unchanged_source_is_served_from_cache(tmp_path, onnx_path, weights, cache, conversions):
+    first = convert_with_cache(str(onnx_path), tmp_path / 'out1', cache=cache)
+    assert len(conversions) == 1
+
+    # Stat-index hit: no protobuf parse, no conversion
+    second = convert_with_cache(str(onnx_path), tmp_path / 'out2', cache=cache)
+    assert len(conversions) == 1
+    assert [path.name for path in second] == [path.name for path in first]
+    np.testing.assert_array_equal(load_weights(second[0])['_network.model.10.weight'],
+                                  weights['_network.model.10.weight'])
+
+    # Touched but identical: re-hashed, then served from the same object
+    os.utime(onnx_path, ns=(0, 0))
+    convert_with_cache(str(onnx_path), tmp_path / 'out3', cache=cache)
+    assert len(conversions) == 1
+
+
+def test_changed_graph_or_options_reconvert(tmp_path, onnx_path, weights, cache, conversions):
+    convert_with_cache(str(onnx_path), tmp_path / 'out', cache=cache)
+
+    build_onnx(onnx_path, weights, scale=2.0)
+    outputs = convert_with_cache(str(onnx_path), tmp_path / 'out', cache=cache)
+    assert len(conversions) == 2
+    np.testing.assert_array_equal(load_weights(outputs[0])['_network.model.0.weight'],
+                                  weights['_network.model.0.weight'] * np.float32(2.0))
+
+    outputs = convert_with_cache(str(onnx_path), tmp_path / 'out', cache=cache, variants={'packed': {}})
+    assert len(conversions) == 3
+    assert 'qlknn_7_11_packed.bin' in [path.name for path in outputs]
+
+
+def test_conversion_survives_concurrent_clear(tmp_path, onnx_path, weights, cache, monkeypatch):
+    store = cache.store
+
+    def store_then_clear(key, files):
+        # Another process clears the cache right after this one stores
+        store(key, files)
+        cache.clear()
+
+    monkeypatch.setattr(cache, 'store', store_then_clear)
+    outputs = convert_with_cache(str(onnx_path), tmp_path / 'out', cache=cache)
+    assert [path.name for path in outputs[:2]] == ['qlknn_7_11_weights.safetensors', 'qlknn_7_11_metadata.json']
+    np.testing.assert_array_equal(load_weights(outputs[0])['_network.model.0.weight'],
+                                  weights['_network.model.0.weight'])
+    assert cache.materialize('missing-key', tmp_path / 'elsewhere') is None
+
+
+def _record(root, path, barrier):
+    cache = ConversionCache(root)
+    barrier.wait()
+    cache.record_graph_hash(path, f'hash-of-{os.path.basename(path)}')
+
+
+def test_parallel_index_updates_are_merged(tmp_path):
+    root = tmp_path / 'cache'
+    sources = []
+    for i in range(6):
+        source = tmp_path / f'model{i}.onnx'
+        source.write_bytes(bytes([i]))
+        sources.append(str(source))
+
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(len(sources))
+    workers = [context.Process(target=_record, args=(root, source, barrier)) for source in sources]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    index = json.loads((root / INDEX_NAME).read_text())
+    assert sorted(index) == sorted(str(os.path.realpath(source)) for source in sources)
+    assert ConversionCache(root).lookup_graph_hash(sources[3]) == 'hash-of-model3.onnx'
@@ -0,0 +1,52 @@
+"""Converter output and the parallel batch `convert` command"""
+
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip('onnx')
+pytest.importorskip('safetensors')
+
+from conftest import build_onnx
+from convert_onnx_to_safetensors import (MANIFEST_NAME, convert_many, convert_onnx_to_safetensors,
+                                         convert_onnx_to_safetensors_streaming)
+from qlknn_numpy import INPUT_NAMES, OUTPUT_NAMES, load_weights
+
+
+@pytest.mark.parametrize('convert', [convert_onnx_to_safetensors, convert_onnx_to_safetensors_streaming])
+def test_converted_weights_match_bundled(tmp_path, onnx_path, weights, convert):
+    weights_path, metadata_path = convert(str(onnx_path), str(tmp_path))[:2]
+
+    converted = load_weights(weights_path)
+    assert sorted(converted) == sorted(weights)
+    for name, array in weights.items():
+        assert converted[name].dtype == np.float32
+        np.testing.assert_array_equal(converted[name], array)
+
+    metadata = json.loads(metadata_path.read_text())
+    assert metadata['input_names'] == INPUT_NAMES
+    assert metadata['output_names'] == OUTPUT_NAMES
+    assert [(layer['in'], layer['out']) for layer in metadata['architecture']['layers']] == \
+        [(10, 133)] + [(133, 133)] * 4 + [(133, 8)]
+
+
+def test_convert_many_skips_unchanged_models(tmp_path, weights):
+    sources = tmp_path / 'models'
+    build_onnx(sources / 'a.onnx', weights)
+    build_onnx(sources / 'b.onnx', weights, scale=0.5)
+    output_dir = tmp_path / 'out'
+
+    counts = convert_many([str(sources)], str(output_dir), jobs=2)
+    assert counts == {'converted': 2, 'skipped': 0, 'failed': 0}
+    manifest = json.loads((output_dir / MANIFEST_NAME).read_text())
+    assert sorted(manifest) == ['a', 'b']
+    np.testing.assert_array_equal(load_weights(output_dir / 'b_weights.safetensors')['_network.model.0.weight'],
+                                  weights['_network.model.0.weight'] * np.float32(0.5))
+
+    assert convert_many([str(sources)], str(output_dir), jobs=2) == {'converted': 0, 'skipped': 2, 'failed': 0}
+
+    # A changed source, or a deleted output, is converted again
+    build_onnx(sources / 'a.onnx', weights, scale=2.0)
+    (output_dir / 'b_metadata.json').unlink()
+    assert convert_many([str(sources)], str(output_dir), jobs=2) == {'converted': 2, 'skipped': 0, 'failed': 0}
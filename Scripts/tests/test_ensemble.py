@@ -0,0 +1,79 @@
+"""Stacked ensembles: per-member outputs, mean/std and the packed file"""
+
+import json
+
+import numpy as np
+import pytest
+
+from qlknn_ensemble import QLKNNEnsemble, pack_ensemble, stack_weights
+from qlknn_numpy import QLKNNNumpy, load_weights, sample_inputs
+
+
+def _perturbed(weights, seed):
+    """A distinct member with the bundled topology"""
+    rng = np.random.default_rng(seed)
+    return {name: (array * (1 + 0.05 * rng.standard_normal(array.shape))).astype(np.float32)
+            for name, array in weights.items()}
+
+
+@pytest.fixture(scope='module')
+def members(weights):
+    return [weights] + [_perturbed(weights, seed) for seed in range(1, 4)]
+
+
+def test_members_match_separate_passes(members):
+    ensemble = QLKNNEnsemble(stack_weights(members), chunk_size=1000)
+    x = sample_inputs(2500, seed=1)
+    separate = np.stack([QLKNNNumpy(member)(x) for member in members])
+
+    outputs = ensemble.members(x)
+    assert outputs.shape == (len(members), 2500, 8)
+    for member, expected in zip(outputs, separate):
+        np.testing.assert_allclose(member, expected, rtol=1e-5, atol=1e-5 * np.abs(expected).max())
+
+    mean, std = ensemble(x)
+    scale = np.abs(separate).max()
+    np.testing.assert_allclose(mean, separate.mean(axis=0), rtol=1e-5, atol=1e-5 * scale)
+    np.testing.assert_allclose(std, separate.std(axis=0), rtol=1e-4, atol=1e-5 * scale)
+
+
+def test_stack_rejects_mismatched_members(weights):
+    narrow = dict(weights, **{'_network.model.10.weight': weights['_network.model.10.weight'][:4],
+                              '_network.model.10.bias': weights['_network.model.10.bias'][:4]})
+    with pytest.raises(ValueError, match='shape'):
+        stack_weights([weights, narrow])
+
+    missing = {name: array for name, array in weights.items() if name != '_network.model.10.bias'}
+    with pytest.raises(ValueError, match='tensors'):
+        stack_weights([weights, missing])
+
+    low_rank = {name: array for name, array in weights.items() if name != '_network.model.4.weight'}
+    low_rank['_network.model.4.weight_down'] = np.zeros((16, 133), dtype=np.float32)
+    low_rank['_network.model.4.weight_up'] = np.zeros((133, 16), dtype=np.float32)
+    with pytest.raises(ValueError, match='dense'):
+        stack_weights([low_rank, low_rank])
+
+
+def test_packed_ensemble_round_trips(tmp_path, members):
+    pytest.importorskip('safetensors')
+    from safetensors.numpy import save_file
+
+    paths = []
+    for i, member in enumerate(members):
+        paths.append(tmp_path / f'member{i}_weights.safetensors')
+        save_file(member, paths[-1])
+
+    entry = pack_ensemble(paths, str(tmp_path), model_name='ens')
+    assert entry == {'members': [path.name for path in paths], 'size': len(members)}
+
+    packed = load_weights(tmp_path / 'ens_weights.safetensors')
+    expected = stack_weights(members)
+    assert sorted(packed) == sorted(expected)
+    for name, array in expected.items():
+        np.testing.assert_array_equal(packed[name], array)
+
+    metadata = json.loads((tmp_path / 'ens_metadata.json').read_text())
+    assert metadata['ensemble'] == entry
+    x = sample_inputs(100, seed=2)
+    np.testing.assert_array_equal(QLKNNEnsemble.load(tmp_path / 'ens_weights.safetensors').members(x),
+                                  QLKNNEnsemble(expected).members(x))
@@ -0,0 +1,84 @@
+"""float16/bfloat16 weight exports: rounding, header dtype tags and loading back"""
+
+import json
+
+import numpy as np
+import pytest
+
+from qlknn_numpy import (OUTPUT_NAMES, bfloat16_bits, bfloat16_to_float32, load_weights,
+                         read_safetensors_header)
+
+
+def _float32(bits):
+    return np.array(bits, dtype='<u4').view('<f4')
+
+
+def test_bfloat16_rounds_ties_to_even():
+    # Exactly halfway between two bfloat16 values: round to the even mantissa
+    assert bfloat16_bits(_float32([0x3F808000, 0x3F818000])).tolist() == [0x3F80, 0x3F82]
+    # Just either side of halfway
+    assert bfloat16_bits(_float32([0x3F807FFF, 0x3F808001])).tolist() == [0x3F80, 0x3F81]
+    # Negative values round the same way on the magnitude
+    assert bfloat16_bits(_float32([0xBF808000, 0xBF818000])).tolist() == [0xBF80, 0xBF82]
+    # Rounding can carry into the exponent, and past the largest finite value into Inf
+    assert bfloat16_bits(_float32([0x3FFFFFFF, 0x7F7FFFFF])).tolist() == [0x4000, 0x7F80]
+
+
+def test_bfloat16_keeps_nan_and_inf():
+    values = _float32([0x7F800000, 0xFF800000, 0x7FC00000, 0x7F800001, 0x7FFFFFFF, 0xFFFFFFFF])
+    bits = bfloat16_bits(values)
+    assert bits[:2].tolist() == [0x7F80, 0xFF80]
+    upcast = bfloat16_to_float32(bits)
+    assert np.isnan(upcast[2:]).all()
+    # Sign survives for NaN too
+    assert (np.signbit(upcast[2:]) == np.signbit(values[2:])).all()
+
+
+def test_bfloat16_is_exact_for_representable_values():
+    rng = np.random.default_rng(0)
+    exact = bfloat16_to_float32(rng.integers(0, 0x7F80, 1000).astype('<u2'))
+    np.testing.assert_array_equal(bfloat16_to_float32(bfloat16_bits(exact)), exact)
+
+
+@pytest.mark.parametrize('precision, tag', [('float16', 'F16'), ('bfloat16', 'BF16')])
+def test_export_round_trips(tmp_path, onnx_path, weights, precision, tag):
+    pytest.importorskip('onnx')
+    from convert_onnx_to_safetensors import convert_onnx_to_safetensors
+
+    convert_onnx_to_safetensors(str(onnx_path), str(tmp_path), variants={precision: {}})
+    path = tmp_path / f'qlknn_7_11_weights_{precision}.safetensors'
+    header, _ = read_safetensors_header(path)
+    header.pop('__metadata__', None)
+    assert sorted(header) == sorted(weights)
+    assert {entry['dtype'] for entry in header.values()} == {tag}
+
+    loaded = load_weights(path)
+    for name, array in weights.items():
+        assert loaded[name].shape == array.shape
+        if precision == 'float16':
+            assert loaded[name].dtype == np.float16
+            np.testing.assert_array_equal(loaded[name], array.astype(np.float16))
+        else:
+            # NumPy has no bfloat16: loaded as float32 copies of the rounded values
+            assert loaded[name].dtype == np.float32
+            np.testing.assert_array_equal(loaded[name], bfloat16_to_float32(bfloat16_bits(array)))
+
+    metadata = json.loads((tmp_path / 'qlknn_7_11_metadata.json').read_text())
+    assert metadata[precision] == {'file': path.name, 'dtype': tag}
+
+
+def test_precision_report_measures_each_variant(tmp_path, onnx_path):
+    pytest.importorskip('onnx')
+    from convert_onnx_to_safetensors import convert_onnx_to_safetensors
+    from precision_report import precision_report
+
+    convert_onnx_to_safetensors(str(onnx_path), str(tmp_path), variants={'float16': {}, 'bfloat16': {}})
+    report = precision_report([tmp_path / 'qlknn_7_11_weights_float16.safetensors',
+                               tmp_path / 'qlknn_7_11_weights_bfloat16.safetensors'],
+                              samples=5000, batch_size=2048)
+    assert sorted(report) == ['qlknn_7_11_weights_bfloat16.safetensors', 'qlknn_7_11_weights_float16.safetensors']
+    for outputs in report.values():
+        assert list(outputs) == OUTPUT_NAMES
+    # bfloat16 keeps 8 mantissa bits against float16's 11
+    assert max(stats['max_abs'] for stats in report['qlknn_7_11_weights_bfloat16.safetensors'].values()) > \
+        max(stats['max_abs'] for stats in report['qlknn_7_11_weights_float16.safetensors'].values())
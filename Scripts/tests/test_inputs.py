@@ -0,0 +1,89 @@
+"""Vectorized build_inputs against a per-profile, per-cell transliteration of QLKNN.buildInputs"""
+
+import math
+
+import numpy as np
+import pytest
+
+from qlknn_inputs import build_inputs, gradient, synthetic_profiles
+
+
+def _gradient(f, x):
+    """TORAXIntegration.gradient, one cell at a time"""
+    n = len(f)
+    if n < 2:
+        return [0.0] * n
+    if n == 2:
+        return [(f[1] - f[0]) / (x[1] - x[0])] * 2
+    return ([(f[1] - f[0]) / (x[1] - x[0])]
+            + [(f[i + 1] - f[i - 1]) / (x[i + 1] - x[i - 1]) for i in range(1, n - 1)]
+            + [(f[-1] - f[-2]) / (x[-1] - x[-2])])
+
+
+def _profile_inputs(te, ti, ne, ni, psi, r, major_radius, toroidal_field):
+    """[n_cells, 10] inputs for one profile, in float64"""
+    def normalized(profile):
+        return [-major_radius * g / max(v, 1e-10) for g, v in zip(_gradient(profile, r), profile)]
+
+    q = [ri * toroidal_field / (major_radius * max(abs(g), 1e-10) / (2 * math.pi * max(ri, 1e-6)))
+         for ri, g in zip(r, _gradient(psi, r))]
+    s_hat = [ri * g / max(abs(qi), 1e-10) for ri, g, qi in zip(r, _gradient(q, r), q)]
+    log_nu = [math.log(max(6.921e-18 * qi * major_radius * n / (t * t), 1e-10)) for qi, n, t in zip(q, ne, te)]
+    columns = [normalized(ti), normalized(te), normalized(ne), normalized(ni), q, s_hat,
+               [ri / major_radius for ri in r], [a / b for a, b in zip(ti, te)], log_nu,
+               [a / b for a, b in zip(ni, ne)]]
+    return np.array(columns, dtype=np.float64).T.reshape(len(r), 10)
+
+
+def _reference(profiles):
+    n_profiles = len(profiles['electron_temperature'])
+    radius = np.broadcast_to(profiles['radius'], profiles['electron_temperature'].shape)
+    major_radius = np.broadcast_to(profiles['major_radius'], (n_profiles,))
+    toroidal_field = np.broadcast_to(profiles['toroidal_field'], (n_profiles,))
+    return np.stack([
+        _profile_inputs(*(list(profiles[name][i]) for name in
+                          ('electron_temperature', 'ion_temperature', 'electron_density', 'ion_density',
+                           'poloidal_flux')),
+                        list(radius[i]), float(major_radius[i]), float(toroidal_field[i]))
+        for i in range(n_profiles)
+    ])
+
+
+@pytest.mark.parametrize('n_cells', [1, 2, 3, 25])
+@pytest.mark.parametrize('per_profile_geometry', [False, True])
+def test_matches_per_profile_reference(n_cells, per_profile_geometry):
+    profiles = synthetic_profiles(5, n_cells, seed=n_cells)
+    if per_profile_geometry:
+        # Radius, R and B_T given per profile instead of one shared radius grid
+        profiles['radius'] = profiles['radius'] * (1 + 0.05 * np.arange(5))[:, None]
+    else:
+        profiles['major_radius'] = 6.2
+        profiles['toroidal_field'] = 5.3
+        profiles['minor_radius'] = 2.0
+
+    expected = _reference(profiles)
+    np.testing.assert_allclose(build_inputs(**profiles, dtype=np.float64), expected, rtol=1e-12, atol=1e-12)
+
+    single = build_inputs(**profiles)
+    assert single.dtype == np.float32 and single.shape == (5, n_cells, 10)
+    if n_cells > 1:
+        # The one-cell q divides by the 1e-10 gradient floor and overflows float32
+        scale = np.abs(expected).max(axis=(0, 1))
+        np.testing.assert_allclose(single / scale, expected / scale, rtol=2e-4, atol=1e-4)
+
+
+def test_gradient_edge_cases():
+    x = np.array([0.0, 0.5, 1.5, 3.0])
+    f = x ** 2
+    np.testing.assert_array_equal(gradient(f[:1], x[:1]), [0.0])
+    np.testing.assert_array_equal(gradient(f[:2], x[:2]), [0.5, 0.5])
+    np.testing.assert_allclose(gradient(f, x), [0.5, 1.5, 3.5, 4.5])
+    # Stacked profiles share one radius grid
+    np.testing.assert_allclose(gradient(np.stack([f, 2 * f]), x), [[0.5, 1.5, 3.5, 4.5], [1.0, 3.0, 7.0, 9.0]])
+
+
+def test_rejects_unstacked_profiles():
+    profiles = {name: value[0] if name not in ('radius', 'major_radius', 'minor_radius', 'toroidal_field')
+                else value for name, value in synthetic_profiles(1, 10).items()}
+    with pytest.raises(ValueError):
+        build_inputs(**profiles)
@@ -0,0 +1,67 @@
+"""Int8 quantization: error budget, exact integer numerics and the Jacobian"""
+
+import numpy as np
+import pytest
+
+from qlknn_int8 import HIDDEN_LEVELS, QLKNNInt8, calibrate, quantize
+from qlknn_numpy import QLKNNNumpy, layer_indices, sample_inputs
+
+# RMS error / output std; the scheme measures 2.2-5.3% per output
+ERROR_BUDGET = 0.06
+
+
+@pytest.fixture(scope='module')
+def int8_engine(weights):
+    quantized, scales = quantize(weights, calibrate(weights, samples=16384))
+    return QLKNNInt8(quantized, scales, chunk_size=4096), quantized, scales
+
+
+def test_error_within_budget(weights, int8_engine):
+    engine, _, _ = int8_engine
+    x = sample_inputs(50000, seed=1)
+    expected = QLKNNNumpy(weights)(x)
+    relative_rms = np.sqrt(np.mean((engine(x) - expected) ** 2, axis=0)) / expected.std(axis=0)
+    assert relative_rms.max() < ERROR_BUDGET, relative_rms
+
+
+def test_hidden_layers_use_per_tensor_unsigned_scales(weights, int8_engine):
+    _, _, scales = int8_engine
+    for index in layer_indices(weights)[1:]:
+        entry = scales[f'_network.model.{index}.weight']
+        assert entry['input_levels'] == list(HIDDEN_LEVELS)
+        assert len(set(entry['input'])) == 1
+
+
+def test_matches_integer_reference(weights, int8_engine):
+    """Float32 accumulation must equal an exact int64 pipeline"""
+    engine, quantized, scales = int8_engine
+    x = sample_inputs(2000, seed=2)
+
+    h = None
+    indices = layer_indices(weights)
+    for position, index in enumerate(indices):
+        entry = scales[f'_network.model.{index}.weight']
+        low, high = entry['input_levels']
+        input_scale = np.asarray(entry['input'], dtype=np.float32)
+        if position == 0:
+            q = np.clip(np.rint(x * (1 / input_scale)), low, high)
+        else:
+            # Same float32 rescale as the engine, with the next layer's scale folded in
+            q = np.clip(h * (previous_scale / input_scale) + previous_bias / input_scale, max(low, 0), high)
+            q = np.rint(q)
+        accumulator = q.astype(np.int64) @ quantized[f'_network.model.{index}.weight'].astype(np.int64).T
+        h = accumulator.astype(np.float32)
+        previous_scale = np.asarray(entry['weight'], dtype=np.float32)
+        previous_bias = quantized[f'_network.model.{index}.bias']
+    expected = h * previous_scale + previous_bias
+
+    np.testing.assert_array_equal(engine(x), expected)
+
+
+def test_jacobian_is_the_dequantized_networks(int8_engine):
+    engine, _, _ = int8_engine
+    x = sample_inputs(64, seed=3)
+    outputs, jacobian = engine.value_and_jacobian(x)
+    np.testing.assert_array_equal(outputs, engine(x))
+    np.testing.assert_array_equal(jacobian, engine.dequantized.jacobian(x))
+    assert jacobian.shape == (64, 8, 10)
@@ -0,0 +1,48 @@
+"""Reverse-mode Jacobian of QLKNNNumpy against central differences"""
+
+import numpy as np
+import pytest
+
+from qlknn_lowrank import _factors
+from qlknn_numpy import INPUT_NAMES, INPUT_RANGES, QLKNNNumpy, sample_inputs
+
+# Relative to each input's range: small enough that most rows cross no ReLU kink,
+# large enough that float64 rounding of the ~100-sized outputs stays below 1e-8
+STEP = 1e-5
+
+
+def _low_rank(weights, rank=48):
+    """Bundled weights with layer 4 factorized to `rank`"""
+    u, s, vt = np.linalg.svd(weights['_network.model.4.weight'].astype(np.float64), full_matrices=False)
+    down, up = _factors(u, s, vt, rank)
+    factored = {name: array for name, array in weights.items() if name != '_network.model.4.weight'}
+    factored['_network.model.4.weight_down'] = down
+    factored['_network.model.4.weight_up'] = up
+    return factored
+
+
+@pytest.mark.parametrize('low_rank', [False, True])
+def test_matches_central_differences(weights, low_rank):
+    engine = QLKNNNumpy(_low_rank(weights) if low_rank else weights, dtype=np.float64)
+    assert any(up_t is not None for _, _, up_t in engine.layers) == low_rank
+
+    # 300 rows: one full 256-row chunk and a partial one
+    x = sample_inputs(300, seed=5, dtype=np.float64)
+    outputs, jacobian = engine.value_and_jacobian(x)
+    assert jacobian.shape == (300, 8, 10)
+    np.testing.assert_allclose(outputs, engine(x), rtol=1e-12, atol=1e-12)
+
+    steps = STEP * np.array([high - low for low, high in (INPUT_RANGES[name] for name in INPUT_NAMES)])
+    checked = 0
+    for j, step in enumerate(steps):
+        shift = np.zeros(10)
+        shift[j] = step
+        forward = (engine(x + shift) - outputs) / step
+        backward = (outputs - engine(x - shift)) / step
+        central = (engine(x + shift) - engine(x - shift)) / (2 * step)
+        # The network is piecewise linear: where the one-sided slopes agree no kink was crossed
+        smooth = np.all(np.isclose(forward, backward, rtol=1e-6, atol=1e-6), axis=1)
+        assert smooth.mean() > 0.95
+        np.testing.assert_allclose(jacobian[smooth, :, j], central[smooth], rtol=1e-6, atol=1e-6)
+        checked += smooth.sum()
+    assert checked > 0.95 * 300 * 10
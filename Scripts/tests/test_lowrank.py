@@ -0,0 +1,42 @@
+"""SVD low-rank factorization against its output error budget"""
+
+import numpy as np
+import pytest
+
+from qlknn_lowrank import factorize
+from qlknn_numpy import QLKNNNumpy, sample_inputs
+
+
+def _relative_rms(weights, candidate, x):
+    expected = QLKNNNumpy(weights)(x).astype(np.float64)
+    outputs = QLKNNNumpy(candidate)(x).astype(np.float64)
+    return (np.sqrt(np.mean((outputs - expected) ** 2, axis=0)) / expected.std(axis=0)).max()
+
+
+@pytest.mark.parametrize('budget', [0.05, 0.1])
+def test_error_within_budget(weights, budget):
+    factorized, report = factorize(weights, budget)
+    assert report['error'] <= budget
+    assert any(layer['rank'] for layer in report['layers'].values())
+
+    # Fresh inputs: the budget was met on the calibration samples, allow 10% slack
+    assert _relative_rms(weights, factorized, sample_inputs(50000, seed=11)) <= 1.1 * budget
+
+
+def test_factors_save_parameters(weights):
+    factorized, report = factorize(weights, 0.1)
+    for name, layer in report['layers'].items():
+        if layer['rank'] is None:
+            assert f'{name}.weight' in factorized
+            continue
+        down, up = factorized[f'{name}.weight_down'], factorized[f'{name}.weight_up']
+        assert down.shape == (layer['rank'], 133) and up.shape == (133, layer['rank'])
+        assert f'{name}.weight' not in factorized
+        assert layer['params'] == down.size + up.size < layer['dense_params']
+
+
+def test_tight_budget_keeps_dense_layers(weights):
+    factorized, report = factorize(weights, 0.01)
+    assert report['error'] == 0
+    assert all(layer['rank'] is None for layer in report['layers'].values())
+    assert not any(name.endswith('weight_down') for name in factorized)
@@ -0,0 +1,79 @@
+"""Resumable .npy sweep: results, interrupted runs and refused resumes"""
+
+import json
+
+import numpy as np
+import pytest
+
+import qlknn_numpy
+from qlknn_npy import layout_path, open_arrays, progress_path, run_sweep
+from qlknn_numpy import QLKNNNumpy, sample_inputs
+
+
+@pytest.fixture
+def sweep_files(tmp_path):
+    input_path, output_path = tmp_path / 'inputs.npy', tmp_path / 'outputs.npy'
+    np.save(input_path, sample_inputs(100, seed=5))
+    return input_path, output_path
+
+
+def _interrupt_after(monkeypatch, tiles: int):
+    """Make the engine fail after `tiles` successful tiles, like a crash mid-sweep"""
+    evaluate = QLKNNNumpy.__call__
+    calls = []
+
+    def failing(self, x, out=None):
+        if len(calls) == tiles:
+            raise KeyboardInterrupt
+        calls.append(len(x))
+        return evaluate(self, x, out)
+
+    monkeypatch.setattr(qlknn_numpy.QLKNNNumpy, '__call__', failing)
+
+
+def test_complete_sweep_matches_engine(weights, sweep_files):
+    input_path, output_path = sweep_files
+    stats = run_sweep(input_path, output_path, tile_rows=30, threads=2)
+    assert stats['complete'] and stats['tiles'] == 4 and stats['computed_rows'] == 100
+    np.testing.assert_array_equal(np.load(output_path), QLKNNNumpy(weights)(np.load(input_path)))
+    assert not progress_path(output_path).exists() and not layout_path(output_path).exists()
+
+
+def test_interrupted_sweep_resumes(weights, sweep_files, monkeypatch):
+    input_path, output_path = sweep_files
+    with monkeypatch.context() as patch:
+        _interrupt_after(patch, 2)
+        with pytest.raises(KeyboardInterrupt):
+            run_sweep(input_path, output_path, tile_rows=30, checkpoint_seconds=0)
+    assert list(np.load(progress_path(output_path))) == [1, 1, 0, 0]
+    assert json.loads(layout_path(output_path).read_text()) == {'tile_rows': 30, 'input_shape': [100, 10]}
+
+    stats = run_sweep(input_path, output_path, tile_rows=30)
+    assert stats['complete'] and stats['resumed_tiles'] == 2 and stats['computed_rows'] == 40
+    np.testing.assert_array_equal(np.load(output_path), QLKNNNumpy(weights)(np.load(input_path)))
+
+
+def test_resume_with_other_tile_rows_is_refused(sweep_files, monkeypatch):
+    # 60- and 70-row tiles both give two tiles over 100 rows; resuming with 70
+    # would mark rows 60-69 done without ever writing them
+    input_path, output_path = sweep_files
+    with monkeypatch.context() as patch:
+        _interrupt_after(patch, 1)
+        with pytest.raises(KeyboardInterrupt):
+            run_sweep(input_path, output_path, tile_rows=60, checkpoint_seconds=0)
+
+    with pytest.raises(ValueError, match='tile-rows'):
+        run_sweep(input_path, output_path, tile_rows=70)
+    assert run_sweep(input_path, output_path, tile_rows=60)['resumed_tiles'] == 1
+
+
+def test_resume_without_recorded_layout_is_refused(sweep_files):
+    input_path, output_path = sweep_files
+    open_arrays(input_path, output_path, 60)
+    layout_path(output_path).unlink()
+    with pytest.raises(ValueError, match='unrecorded layout'):
+        open_arrays(input_path, output_path, 60)
+
+    # --restart starts over and records the layout again
+    open_arrays(input_path, output_path, 70, restart=True)
+    assert json.loads(layout_path(output_path).read_text())['tile_rows'] == 70
@@ -0,0 +1,66 @@
+"""Mahalanobis OOD scorer: the score definition, thresholds and correlated extrapolation"""
+
+import json
+
+import numpy as np
+import pytest
+
+from qlknn_numpy import INPUT_NAMES, INPUT_RANGES, sample_inputs
+from qlknn_ood import OODScorer, correlated_inputs, fit
+from qlknn_validation import validate_batch
+
+
+def _opposed(x):
+    """Rows with Ati at its maximum and q at its minimum: each input in range"""
+    x = x.copy()
+    x[:, INPUT_NAMES.index('Ati')] = INPUT_RANGES['Ati'][1]
+    x[:, INPUT_NAMES.index('q')] = INPUT_RANGES['q'][0]
+    return x
+
+
+@pytest.fixture(scope='module')
+def correlated_entry():
+    return fit(correlated_inputs(200000, seed=1))
+
+
+def test_score_is_mahalanobis_distance(correlated_entry):
+    reference = correlated_inputs(200000, seed=1)
+    x = correlated_inputs(1000, seed=3)
+    mean = reference.mean(axis=0)
+    inverse = np.linalg.inv(np.cov(reference, rowvar=False))
+    expected = np.einsum('ij,jk,ik->i', x - mean, inverse, x - mean)
+    np.testing.assert_allclose(OODScorer(correlated_entry, chunk_size=97)(x), expected, rtol=1e-4)
+
+
+def test_threshold_flags_the_quantile(correlated_entry):
+    flagged = OODScorer(correlated_entry).flag(correlated_inputs(200000, seed=2)).mean()
+    assert 0.0005 < flagged < 0.002
+
+
+def test_correlated_fit_flags_in_range_anticorrelation(correlated_entry):
+    x = _opposed(correlated_inputs(20000, seed=2))
+    assert (validate_batch(x) == 0).all()
+    assert OODScorer(correlated_entry).flag(x).mean() > 0.99
+    # A fit on independent samples has no correlation to break
+    assert OODScorer(fit(sample_inputs(200000, seed=1))).flag(x).mean() < 0.1
+
+
+def test_bundled_uniform_box_entry_needs_opt_in():
+    with pytest.raises(ValueError, match='uniform'):
+        OODScorer.load()
+    scorer = OODScorer.load(allow_uniform_box=True)
+    assert scorer.flag(sample_inputs(100000, seed=4)).mean() < 0.01
+
+
+def test_reference_fit_loads_without_opt_in(tmp_path):
+    path = tmp_path / 'qlknn_metadata.json'
+    entry = fit(correlated_inputs(5000, seed=1))
+    entry['reference'] = {'source': 'operating_points.npy', 'sha256': '0' * 64}
+    path.write_text(json.dumps({'ood': entry}))
+    assert OODScorer.load(path).threshold == entry['threshold']
+
+
+@pytest.mark.parametrize('reference', [np.zeros((100, 9)), np.zeros((10, 10)), np.full((100, 10), np.nan)])
+def test_fit_rejects_bad_reference(reference):
+    with pytest.raises(ValueError):
+        fit(reference)
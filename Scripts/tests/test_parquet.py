@@ -0,0 +1,93 @@
+"""Streaming Parquet / Arrow IPC evaluation"""
+
+import numpy as np
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.ipc  # noqa: E402
+import pyarrow.parquet  # noqa: E402
+
+from qlknn_numpy import INPUT_NAMES, OUTPUT_NAMES, QLKNNNumpy, sample_inputs  # noqa: E402
+from qlknn_parquet import evaluate_file  # noqa: E402
+
+
+def _table(x):
+    """Inputs in reverse order between two unrelated columns"""
+    columns = {'shot': np.arange(len(x), dtype=np.int64)}
+    columns.update({name: x[:, INPUT_NAMES.index(name)].astype(np.float64) for name in INPUT_NAMES[::-1]})
+    columns['time'] = np.linspace(0.0, 1.0, len(x))
+    return pa.table(columns)
+
+
+def _write(table, path):
+    if path.suffix == '.parquet':
+        pa.parquet.write_table(table, path, row_group_size=400)
+    else:
+        with pa.ipc.new_file(str(path), table.schema) as writer:
+            writer.write_table(table, max_chunksize=400)
+    return path
+
+
+def _read(path):
+    if path.suffix == '.parquet':
+        return pa.parquet.read_table(path)
+    return pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+
+
+@pytest.fixture(scope='module')
+def engine(weights):
+    return QLKNNNumpy(weights)
+
+
+@pytest.mark.parametrize('suffix_in', ['.parquet', '.arrow'])
+@pytest.mark.parametrize('suffix_out', ['.parquet', '.arrow'])
+def test_round_trip_matches_numpy(tmp_path, engine, suffix_in, suffix_out):
+    x = sample_inputs(1000, seed=7)
+    table = _table(x)
+    source = _write(table, tmp_path / f'in{suffix_in}')
+
+    stats = evaluate_file(source, tmp_path / f'out{suffix_out}', batch_rows=300, engine=engine)
+    # IPC batches are re-sliced in place, so 400-row batches give 300 + 100 pieces
+    assert stats['rows'] == 1000 and stats['batches'] == (4 if suffix_in == '.parquet' else 5)
+
+    result = _read(tmp_path / f'out{suffix_out}')
+    assert result.column_names == table.column_names + OUTPUT_NAMES
+    assert result.slice(0, 1000).select(table.column_names).equals(table)
+    outputs = np.column_stack([result.column(name).to_numpy() for name in OUTPUT_NAMES])
+    assert outputs.dtype == np.float32
+    expected = engine(x)
+    np.testing.assert_allclose(outputs, expected, rtol=1e-5, atol=1e-5 * np.abs(expected).max())
+
+
+def test_inputs_only_with_prefix(tmp_path, engine):
+    x = sample_inputs(500, seed=8)
+    source = _write(_table(x), tmp_path / 'in.parquet')
+    evaluate_file(source, tmp_path / 'out.arrow', keep_columns=False, prefix='qlknn_', engine=engine)
+
+    result = _read(tmp_path / 'out.arrow')
+    assert result.column_names == INPUT_NAMES + ['qlknn_' + name for name in OUTPUT_NAMES]
+
+
+def test_output_name_clash_needs_prefix(tmp_path, engine):
+    x = sample_inputs(100, seed=9)
+    source = _write(_table(x).append_column('efiITG', pa.array(np.zeros(100))), tmp_path / 'in.parquet')
+    with pytest.raises(ValueError, match='efiITG'):
+        evaluate_file(source, tmp_path / 'out.parquet', engine=engine)
+    evaluate_file(source, tmp_path / 'out.parquet', prefix='pred_', engine=engine)
+    assert _read(tmp_path / 'out.parquet').column_names[-1] == 'pred_gamma_max'
+
+
+def test_rejects_null_and_missing_inputs(tmp_path, engine):
+    table = _table(sample_inputs(100, seed=10))
+    q = table.column_names.index('q')
+    nulls = table.set_column(q, 'q', pa.array([None if i == 5 else 1.0 for i in range(100)], pa.float64()))
+    with pytest.raises(ValueError, match="'q' has 1 null"):
+        evaluate_file(_write(nulls, tmp_path / 'nulls.parquet'), tmp_path / 'out.parquet', engine=engine)
+
+    missing = table.drop_columns(['smag'])
+    with pytest.raises(ValueError, match='smag'):
+        evaluate_file(_write(missing, tmp_path / 'missing.arrow'), tmp_path / 'out.arrow', engine=engine)
+
+    source = tmp_path / 'nulls.parquet'
+    with pytest.raises(ValueError, match='differ'):
+        evaluate_file(source, source, engine=engine)
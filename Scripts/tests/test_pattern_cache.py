@@ -0,0 +1,56 @@
+"""Activation-pattern cache: exactness, ball hits and the forward-pass fallback"""
+
+import numpy as np
+import pytest
+
+from qlknn_numpy import INPUT_NAMES, INPUT_RANGES, QLKNNNumpy, sample_inputs
+from qlknn_pattern_cache import PatternCachedQLKNN
+
+SPAN = np.array([high - low for low, high in (INPUT_RANGES[name] for name in INPUT_NAMES)])
+
+
+def drifting_inputs(cells: int, steps: int, drift: float, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    x = sample_inputs(cells, dtype=np.float64, seed=seed)
+    return [x := x + drift * SPAN * rng.standard_normal(x.shape) for _ in range(steps)]
+
+
+@pytest.mark.parametrize('drift, min_hit_rate', [(1e-5, 0.85), (1e-3, 0.85), (1e-4, 0.0)])
+def test_matches_forward_pass(weights, drift, min_hit_rate):
+    reference = QLKNNNumpy(weights, dtype=np.float64)
+    cached = PatternCachedQLKNN(weights, 50, min_hit_rate=min_hit_rate, probe_interval=4)
+    for x in drifting_inputs(50, 120, drift):
+        expected = reference(x)
+        np.testing.assert_allclose(cached(x), expected, rtol=1e-9, atol=1e-9 * np.abs(expected).max())
+
+
+def test_slow_drift_is_served_from_the_ball(weights):
+    cached = PatternCachedQLKNN(weights, 50)
+    for x in drifting_inputs(50, 100, 1e-5):
+        cached(x)
+    assert cached.stats['ball'] > 0.85 * 50 * 100
+    assert cached.stats['bypassed'] == 0
+    assert cached.hit_rate >= cached.min_hit_rate
+
+
+def test_fast_drift_falls_back_to_the_forward_pass(weights):
+    cached = PatternCachedQLKNN(weights, 50, probe_interval=4)
+    for x in drifting_inputs(50, 200, 1e-3):
+        cached(x)
+    assert cached.hit_rate < cached.min_hit_rate
+    # Failed probes back off, so well over the 4 / (4 + 2) of steps a fixed interval would bypass
+    assert cached.stats['bypassed'] > 0.8 * 50 * 200
+
+
+def test_reset_and_shape_check(weights):
+    cached = PatternCachedQLKNN(weights, 8)
+    x = sample_inputs(8, dtype=np.float64)
+    cached(x)
+    cached(x)
+    assert cached.valid.all()
+    cached.reset()
+    assert not cached.valid.any()
+    np.testing.assert_allclose(cached(x), QLKNNNumpy(weights, dtype=np.float64)(x), rtol=1e-9, atol=1e-9)
+
+    with pytest.raises(ValueError):
+        cached(sample_inputs(4, dtype=np.float64))
@@ -0,0 +1,56 @@
+"""Shared-memory process pool: results and worker failure"""
+
+import os
+import signal
+import time
+
+import numpy as np
+import pytest
+
+from qlknn_numpy import QLKNNNumpy, sample_inputs
+from qlknn_pool import QLKNNPool
+
+
+def assert_rows_match(actual, expected):
+    # BLAS may round short slices differently from one large batch
+    np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-5 * np.abs(expected).max())
+
+
+def test_matches_in_process_engine(weights):
+    x = sample_inputs(10000, seed=4)
+    # Small arena and slices: several windows, several tasks per window, a ragged tail
+    with QLKNNPool(processes=2, capacity=4096, slice_rows=1000) as pool:
+        assert_rows_match(pool(x), QLKNNNumpy(weights)(x))
+
+        pool.inputs[:5] = x[:5]
+        assert_rows_match(pool.run(5), QLKNNNumpy(weights)(x[:5]))
+
+
+def _kill_worker_then_die(engine, *args):
+    """Engine stand-in: every worker kills itself on its first slice"""
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def test_worker_dying_mid_run_raises_instead_of_hanging(weights, monkeypatch):
+    import qlknn_numpy
+    monkeypatch.setattr(qlknn_numpy.QLKNNNumpy, '__call__', _kill_worker_then_die)
+    pool = QLKNNPool(processes=2, capacity=4096, slice_rows=1000, context='fork')
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match="died"):
+        pool.run(4096)
+    assert time.monotonic() - start < 10
+
+    with pytest.raises(RuntimeError, match="closed"):
+        pool.run(10)
+    pool.close()
+
+
+def test_dead_idle_worker_is_reported():
+    pool = QLKNNPool(processes=2, capacity=4096, slice_rows=1000)
+    pool(sample_inputs(10))
+    os.kill(pool._workers[0].pid, signal.SIGKILL)
+    pool._workers[0].join()
+
+    with pytest.raises(RuntimeError, match=r"exit code -9"):
+        pool(sample_inputs(10))
@@ -0,0 +1,53 @@
+"""Dead-neuron pruning: exactness, per-layer widths and the onnx-free metadata path"""
+
+import json
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from conftest import SCRIPTS_DIR
+from prune_qlknn import activation_ranges, interval_bounds, prune, prune_model
+from qlknn_numpy import QLKNNNumpy, load_weights, sample_inputs
+
+
+@pytest.fixture(scope='module')
+def pruned(weights):
+    return prune(weights, activation_ranges(weights, samples=200_000))
+
+
+def test_pruning_is_exact(weights, pruned):
+    pruned_weights, _ = pruned
+    x = sample_inputs(50000, seed=7)
+    np.testing.assert_array_equal(QLKNNNumpy(pruned_weights)(x), QLKNNNumpy(weights)(x))
+
+
+def test_hidden_layers_keep_their_own_widths(pruned):
+    pruned_weights, kept = pruned
+    widths = [len(keep) for keep in kept]
+    assert widths == [133, 132, 132, 128, 128]
+    assert [pruned_weights[f'_network.model.{index}.weight'].shape[0] for index in (0, 2, 4, 6, 8)] == widths
+
+
+def test_interval_bounds_prove_no_unit_constant(weights):
+    """Why --proven-only removes nothing for QLKNN 7_11"""
+    assert all(((high - low) <= 0).sum() == 0 for low, high in interval_bounds(weights))
+
+
+def test_prune_model_writes_weights_and_metadata(tmp_path, weights):
+    pytest.importorskip('safetensors')
+    report = prune_model(output_dir=tmp_path, samples=200_000, check_samples=20000)
+    assert report['max_abs_error'] == 0
+    assert report['hidden_widths'] == [133, 132, 132, 128, 128]
+
+    written = load_weights(tmp_path / 'qlknn_7_11_pruned_weights.safetensors')
+    assert written['_network.model.8.weight'].shape == (128, 128)
+    metadata = json.loads((tmp_path / 'qlknn_7_11_pruned_metadata.json').read_text())
+    assert metadata['pruning']['hidden_widths'] == report['hidden_widths']
+    assert [layer['out'] for layer in metadata['architecture']['layers']] == [133, 132, 132, 128, 128, 8]
+
+
+def test_pruning_does_not_import_onnx():
+    code = 'import sys, prune_qlknn, qlknn_ensemble, qlknn_metadata; sys.exit("onnx" in sys.modules)'
+    assert subprocess.run([sys.executable, '-c', code], cwd=SCRIPTS_DIR).returncode == 0
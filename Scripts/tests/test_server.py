@@ -0,0 +1,115 @@
+"""Micro-batching server: results, coalescing, metrics and error frames over the Unix socket"""
+
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from qlknn_numpy import QLKNNNumpy, sample_inputs
+from qlknn_server import ERROR, HEADER, MAX_REQUEST_ROWS, MicroBatchServer, QLKNNClient
+
+
+@pytest.fixture
+def start_server():
+    """Start a MicroBatchServer on a background event loop; returns its socket path"""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    def start(engine, **kwargs) -> str:
+        # Unix socket paths are limited to ~100 bytes, so stay out of pytest's long tmp_path
+        path = os.path.join(tempfile.mkdtemp(prefix='qlknn-'), 'qlknn.sock')
+        asyncio.run_coroutine_threadsafe(MicroBatchServer(engine, **kwargs).serve(path), loop)
+        deadline = time.monotonic() + 5
+        while not os.path.exists(path):
+            assert time.monotonic() < deadline, "server did not start"
+            time.sleep(0.01)
+        return path
+
+    yield start
+
+    async def shutdown():
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+
+
+def test_concurrent_clients_get_their_own_rows(weights, start_server):
+    engine = QLKNNNumpy(weights)
+    path = start_server(engine, window=1.0)
+    requests = [sample_inputs(n, seed=seed) for seed, n in enumerate([3, 50, 1, 17])]
+    clients = [QLKNNClient(path) for _ in requests]
+    barrier = threading.Barrier(len(clients))
+    results = [None] * len(clients)
+
+    def run(i):
+        barrier.wait()
+        results[i] = clients[i](requests[i])
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(clients))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Batched float32 GEMMs may round differently from a lone request
+    for x, result in zip(requests, results):
+        expected = engine(x)
+        np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-5 * np.abs(expected).max())
+
+    # Every connection had its request queued, so the batcher dispatched before the 1 s window ran out
+    metrics = clients[0].metrics()
+    assert metrics['requests'] == 4 and metrics['rows'] == 71
+    assert metrics['batches'] < 4
+    assert metrics['latency_ms']['p99'] < 1000
+    for client in clients:
+        client.close()
+
+
+def test_metrics_frame(weights, start_server):
+    path = start_server(QLKNNNumpy(weights))
+    with QLKNNClient(path) as client:
+        for _ in range(3):
+            client(sample_inputs(10))
+        metrics = client.metrics()
+    assert metrics['requests'] == 3 and metrics['rows'] == 30 and metrics['errors'] == 0
+    assert metrics['batches'] == 3 and metrics['mean_batch_rows'] == 10
+    assert set(metrics['latency_ms']) == {'p50', 'p95', 'p99'}
+    assert 0 < metrics['engine_busy'] <= 1
+
+
+def test_engine_errors_are_returned_to_the_client(start_server):
+    def failing(x):
+        raise ValueError("engine failed")
+
+    path = start_server(failing)
+    with QLKNNClient(path) as client:
+        with pytest.raises(RuntimeError, match="engine failed"):
+            client(sample_inputs(2))
+        # The connection stays usable
+        assert client.metrics()['errors'] == 1
+
+
+def test_oversized_request_is_rejected(weights, start_server):
+    path = start_server(QLKNNNumpy(weights))
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(HEADER.pack(MAX_REQUEST_ROWS + 1))
+        reply = b''
+        while chunk := sock.recv(4096):
+            reply += chunk
+    (status,) = HEADER.unpack_from(reply)
+    (length,) = HEADER.unpack_from(reply, HEADER.size)
+    assert status == ERROR
+    assert b'exceeds the limit' in reply[2 * HEADER.size:2 * HEADER.size + length]
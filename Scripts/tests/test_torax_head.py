@@ -0,0 +1,45 @@
+"""TORAX head export: combineFluxes sums folded into the output layer"""
+
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip('onnx')
+pytest.importorskip('safetensors')
+
+from convert_onnx_to_safetensors import TORAX_HEAD, convert_onnx_to_safetensors, torax_head_matrix
+from qlknn_numpy import OUTPUT_NAMES, QLKNNNumpy, load_weights, sample_inputs
+
+
+def test_folded_outputs_match_summed_fluxes(tmp_path, onnx_path, weights):
+    convert_onnx_to_safetensors(str(onnx_path), str(tmp_path), variants={'torax_head': {}})
+    head = load_weights(tmp_path / 'qlknn_7_11_weights_torax.safetensors')
+    assert head['_network.model.10.weight'].shape == (len(TORAX_HEAD), 133)
+    for name, array in weights.items():
+        if not name.startswith('_network.model.10.'):
+            np.testing.assert_array_equal(head[name], array)
+
+    x = sample_inputs(5000, seed=6)
+    fluxes = QLKNNNumpy(weights, dtype=np.float64)(x)
+    expected = np.column_stack([sum(fluxes[:, OUTPUT_NAMES.index(name)] for name in sources)
+                                for sources in TORAX_HEAD.values()])
+    folded = QLKNNNumpy(head)(x)
+    assert folded.shape == (5000, len(TORAX_HEAD))
+    np.testing.assert_allclose(folded, expected, rtol=1e-5, atol=1e-5 * np.abs(expected).max())
+
+    metadata = json.loads((tmp_path / 'qlknn_7_11_metadata.json').read_text())
+    assert metadata['torax_head'] == {'file': 'qlknn_7_11_weights_torax.safetensors',
+                                      'output_names': list(TORAX_HEAD), 'combination': TORAX_HEAD}
+
+
+def test_matrix_follows_output_order():
+    reordered = OUTPUT_NAMES[::-1]
+    np.testing.assert_array_equal(torax_head_matrix(reordered), torax_head_matrix()[:, ::-1])
+    assert torax_head_matrix().sum(axis=1).tolist() == [len(sources) for sources in TORAX_HEAD.values()]
+
+
+def test_unknown_output_names_raise():
+    renamed = [name if name != 'efeETG' else 'efeETG_GB' for name in OUTPUT_NAMES]
+    with pytest.raises(ValueError, match="'efeETG'"):
+        torax_head_matrix(renamed)
@@ -0,0 +1,77 @@
+"""Per-row input validation bitmask"""
+
+import numpy as np
+import pytest
+
+from qlknn_numpy import INPUT_NAMES, INPUT_RANGES, sample_inputs
+from qlknn_validation import NONFINITE_SHIFT, describe, summarize, validate_batch
+
+BOUNDS = np.array([INPUT_RANGES[name] for name in INPUT_NAMES])
+LOW, HIGH = BOUNDS.astype(np.float32).T
+
+
+def _reference(x):
+    """Per-element mask, comparing against the bounds rounded to x's dtype"""
+    low, high = BOUNDS.astype(x.dtype).T
+    expected = np.zeros(len(x), dtype=np.uint32)
+    for j in range(10):
+        expected |= (~((x[:, j] >= low[j]) & (x[:, j] <= high[j]))).astype(np.uint32) << j
+        expected |= (~np.isfinite(x[:, j])).astype(np.uint32) << (NONFINITE_SHIFT + j)
+    return expected
+
+
+def test_valid_rows_and_inclusive_bounds():
+    x = np.vstack([sample_inputs(100), LOW, HIGH])
+    assert not validate_batch(x).any()
+
+
+def test_float64_bounds_are_valid():
+    # 0.66, 0.1, 0.95 and 0.48 all round across the bound in float32
+    assert list(validate_batch(BOUNDS.T)) == [0, 0]
+    assert list(validate_batch(BOUNDS.T.astype(np.float32))) == [0, 0]
+
+
+@pytest.mark.parametrize('j', range(len(INPUT_NAMES)))
+def test_each_input_sets_its_own_bits(j):
+    rows = np.tile((LOW + HIGH) / 2, (6, 1))
+    rows[0, j] = np.nextafter(LOW[j], np.float32(-np.inf))
+    rows[1, j] = np.nextafter(HIGH[j], np.float32(np.inf))
+    rows[2, j] = np.nan
+    rows[3, j] = np.inf
+    rows[4, j] = -np.inf
+
+    range_bit, nonfinite_bit = 1 << j, 1 << (NONFINITE_SHIFT + j)
+    masks = validate_batch(rows)
+    assert masks.dtype == np.uint32
+    assert list(masks) == [range_bit, range_bit] + [range_bit | nonfinite_bit] * 3 + [0]
+
+
+def test_matches_per_element_reference_across_chunks():
+    rng = np.random.default_rng(0)
+    # Widened box plus sprinkled NaN/Inf
+    x = (LOW + (HIGH - LOW) * rng.uniform(-0.1, 1.1, (1000, 10))).astype(np.float32)
+    x[rng.random(x.shape) < 0.01] = np.nan
+    x[rng.random(x.shape) < 0.01] = -np.inf
+
+    np.testing.assert_array_equal(validate_batch(x, chunk_size=97), _reference(x))
+    # float64 rows are checked against the float64 bounds, not the float32 ones
+    wide = x.astype(np.float64) + rng.uniform(-1e-7, 1e-7, x.shape)
+    wide[:2] = BOUNDS.T
+    np.testing.assert_array_equal(validate_batch(wide, chunk_size=97), _reference(wide))
+
+
+def test_describe_and_summarize():
+    mask = (1 << INPUT_NAMES.index('q')) | (1 << INPUT_NAMES.index('Ati')) \
+        | (1 << (NONFINITE_SHIFT + INPUT_NAMES.index('Ati')))
+    low, high = INPUT_RANGES['q']
+    assert describe(mask) == ['Ati is not finite', f'q outside [{low:g}, {high:g}]']
+    assert describe(0) == []
+
+    counts = summarize(np.array([mask, 0, 1 << INPUT_NAMES.index('q')]))
+    assert counts['q'] == {'out_of_range': 2, 'nonfinite': 0}
+    assert counts['Ati'] == {'out_of_range': 1, 'nonfinite': 1}
+
+
+def test_rejects_wrong_shape():
+    with pytest.raises(ValueError):
+        validate_batch(np.zeros((4, 9), dtype=np.float32))
@@ -0,0 +1,36 @@
+"""Header-only output order and name mapping verification"""
+
+import json
+
+import pytest
+
+from qlknn_numpy import INPUT_NAMES, OUTPUT_NAMES
+from verify_name_mapping import onnx_graph_io_names, swift_parameter_names, verify_name_mapping
+
+
+def test_swift_names_match_python():
+    names = swift_parameter_names()
+    assert names['inputParameterNames'] == INPUT_NAMES
+    assert names['outputParameterNames'] == OUTPUT_NAMES
+
+
+def test_wire_format_reader_matches_onnx(onnx_path):
+    onnx = pytest.importorskip('onnx')
+    graph = onnx.load(onnx_path).graph
+    names = onnx_graph_io_names(onnx_path)
+    assert names == {'inputs': [value.name for value in graph.input],
+                     'outputs': [value.name for value in graph.output]}
+
+
+def test_bundled_files_pass(onnx_path):
+    checks = verify_name_mapping(onnx_path)
+    assert checks and all(passed for _, passed, _ in checks), [c for c in checks if not c[1]]
+
+
+def test_reordered_metadata_fails(tmp_path):
+    metadata_path = tmp_path / 'qlknn_metadata.json'
+    metadata_path.write_text(json.dumps({'input_names': INPUT_NAMES, 'output_names': OUTPUT_NAMES[::-1]}))
+
+    failed = [description for description, passed, _ in verify_name_mapping(metadata_paths=[metadata_path])
+              if not passed]
+    assert failed == ['qlknn_metadata.json output_names']
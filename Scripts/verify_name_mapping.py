@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Fast output-order and name-mapping verification
+Reads only the ONNX graph outputs and the SafeTensors/JSON headers (no tensor payloads)
+and cross-checks them against QLKNN.inputParameterNames / QLKNN.outputParameterNames
+"""
+
+from pathlib import Path
+import json
+import mmap
+import re
+import sys
+
+from qlknn_numpy import INPUT_NAMES, OUTPUT_NAMES, REPO_ROOT, layer_indices, read_safetensors_header
+
+SWIFT_SOURCE = REPO_ROOT / 'Sources' / 'FusionSurrogates' / 'QLKNN+MLX.swift'
+RESOURCES = REPO_ROOT / 'Sources' / 'FusionSurrogates' / 'Resources'
+DEFAULT_SAFETENSORS = RESOURCES / 'qlknn_7_11_weights.safetensors'
+DEFAULT_METADATA = [RESOURCES / 'qlknn_7_11_metadata.json', REPO_ROOT / 'Resources' / 'qlknn_7_11_weights_metadata.json']
+
+# Protobuf field numbers (onnx.proto)
+_MODEL_GRAPH = 7
+_GRAPH_INPUT = 11
+_GRAPH_OUTPUT = 12
+_VALUE_INFO_NAME = 1
+
+
+def swift_parameter_names(source=SWIFT_SOURCE) -> dict:
+    """`inputParameterNames` and `outputParameterNames` literals parsed from the Swift source"""
+    # Drop line comments first: they contain brackets such as "[GB units]"
+    text = re.sub(r'//[^\n]*', '', Path(source).read_text())
+    names = {}
+    for key in ('inputParameterNames', 'outputParameterNames'):
+        match = re.search(rf'{key}\s*:\s*\[String\]\s*=\s*\[(.*?)\]', text, re.DOTALL)
+        if match is None:
+            raise ValueError(f"QLKNN.{key} not found in {source}")
+        names[key] = re.findall(r'"([^"]+)"', match.group(1))
+    return names
+
+
+def _read_varint(buffer, pos: int) -> tuple:
+    result = shift = 0
+    while True:
+        byte = buffer[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _fields(buffer, start: int, end: int):
+    """Yield (field number, wire type, value start, value end) without decoding payloads"""
+    pos = start
+    while pos < end:
+        key, pos = _read_varint(buffer, pos)
+        field, wire_type = key >> 3, key & 0x7
+        if wire_type == 0:
+            _, value_end = _read_varint(buffer, pos)
+        elif wire_type == 1:
+            value_end = pos + 8
+        elif wire_type == 2:
+            length, pos = _read_varint(buffer, pos)
+            value_end = pos + length
+        elif wire_type == 5:
+            value_end = pos + 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type} at byte {pos}")
+        yield field, wire_type, pos, value_end
+        pos = value_end
+
+
+def onnx_graph_io_names(onnx_path) -> dict:
+    """
+    Graph input and output names straight from the protobuf wire format
+
+    Initializers and nodes are skipped by their length prefix, so tensor
+    payloads are never read or decoded (the file is memory-mapped).
+    """
+    names = {'inputs': [], 'outputs': []}
+    with open(onnx_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        for field, wire_type, start, end in _fields(buffer, 0, len(buffer)):
+            if field != _MODEL_GRAPH or wire_type != 2:
+                continue
+            for graph_field, graph_wire, value_start, value_end in _fields(buffer, start, end):
+                if graph_wire != 2 or graph_field not in (_GRAPH_INPUT, _GRAPH_OUTPUT):
+                    continue
+                for info_field, _, name_start, name_end in _fields(buffer, value_start, value_end):
+                    if info_field == _VALUE_INFO_NAME:
+                        key = 'inputs' if graph_field == _GRAPH_INPUT else 'outputs'
+                        names[key].append(bytes(buffer[name_start:name_end]).decode('utf-8'))
+                        break
+    return names
+
+
+def verify_name_mapping(onnx_path=None, safetensors_path=DEFAULT_SAFETENSORS, metadata_paths=DEFAULT_METADATA,
+                        swift_source=SWIFT_SOURCE) -> list:
+    """Run every check; returns a list of (description, passed, detail)"""
+    swift = swift_parameter_names(swift_source)
+    swift_inputs, swift_outputs = swift['inputParameterNames'], swift['outputParameterNames']
+    checks = []
+
+    def check(description, expected, actual):
+        checks.append((description, expected == actual, f"expected {expected}, got {actual}"))
+
+    check("qlknn_numpy.INPUT_NAMES matches QLKNN.inputParameterNames", swift_inputs, INPUT_NAMES)
+    check("qlknn_numpy.OUTPUT_NAMES matches QLKNN.outputParameterNames", swift_outputs, OUTPUT_NAMES)
+
+    if onnx_path is not None:
+        graph = onnx_graph_io_names(onnx_path)
+        check("ONNX graph output order matches QLKNN.outputParameterNames", swift_outputs, graph['outputs'])
+
+    for metadata_path in metadata_paths:
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+        name = Path(metadata_path).name
+        check(f"{name} input_names", swift_inputs, metadata.get('input_names'))
+        check(f"{name} output_names", swift_outputs, metadata.get('output_names'))
+
+    if safetensors_path is not None:
+        header, _ = read_safetensors_header(safetensors_path)
+        header.pop('__metadata__', None)
+        indices = layer_indices(header)
+        first = header[f'_network.model.{indices[0]}.weight']['shape']
+        last = header[f'_network.model.{indices[-1]}.weight']['shape']
+        name = Path(safetensors_path).name
+        check(f"{name} input width", len(swift_inputs), first[1])
+        check(f"{name} output width", len(swift_outputs), last[0])
+
+    return checks
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--onnx', help='ONNX model whose graph output order to check')
+    parser.add_argument('--safetensors', default=str(DEFAULT_SAFETENSORS))
+    parser.add_argument('--metadata', nargs='*', default=[str(path) for path in DEFAULT_METADATA])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    checks = verify_name_mapping(args.onnx, args.safetensors, args.metadata)
+    elapsed = time.perf_counter() - start
+
+    for description, passed, detail in checks:
+        print(f"{'✅' if passed else '❌'} {description}")
+        if not passed:
+            print(f"   {detail}")
+
+    failures = sum(not passed for _, passed, _ in checks)
+    print(f"\n{len(checks) - failures}/{len(checks)} checks passed in {elapsed * 1e3:.1f} ms")
+    sys.exit(1 if failures else 0)
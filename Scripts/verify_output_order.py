@@ -7,23 +7,16 @@ import onnx
 import numpy as np
 from fusion_surrogates.qlknn.qlknn_model import QLKNNModel
 
+from verify_name_mapping import swift_parameter_names
+
 # Get ONNX output order
 onnx_path = '/Library/Frameworks/Python.framework/Versions/3.12/lib/python3.12/site-packages/fusion_surrogates/qlknn/models/qlknn_7_11.onnx'
 model_onnx = onnx.load(onnx_path)
 
 onnx_order = [output.name for output in model_onnx.graph.output]
 
-# Swift order (after fix)
-swift_order = [
-    "efeITG",
-    "efiITG",
-    "pfeITG",
-    "efeTEM",
-    "efiTEM",
-    "pfeTEM",
-    "efeETG",
-    "gamma_max"
-]
+# Swift order, parsed from QLKNN.outputParameterNames so it cannot drift
+swift_order = swift_parameter_names()['outputParameterNames']
 
 print("=== Output Order Verification ===\n")
 print("ONNX Model Output Order:")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Numerical parity between ONNX Runtime and the exported SafeTensors weights
+Samples the documented input box and compares every output in large vectorized batches
+"""
+
+import sys
+
+import numpy as np
+
+from qlknn_numpy import DEFAULT_WEIGHTS, INPUT_NAMES, OUTPUT_NAMES, QLKNNNumpy, sample_inputs
+
+
+class OnnxReference:
+    """
+    ONNX Runtime session fed with [n, 10] batches
+
+    Handles both graph layouts: one [batch, 10] input tensor, or one input per
+    parameter named like INPUT_NAMES. Returns a [n, k] array together with the
+    output names, taken from the graph when it has one output per flux.
+    """
+
+    def __init__(self, onnx_path: str, threads: int = 0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(onnx_path, options, providers=['CPUExecutionProvider'])
+        self.inputs = self.session.get_inputs()
+        self.outputs = [output.name for output in self.session.get_outputs()]
+
+        if len(self.inputs) == 1:
+            self.per_parameter = False
+        elif sorted(i.name for i in self.inputs) == sorted(INPUT_NAMES):
+            self.per_parameter = True
+        else:
+            raise ValueError(f"Unrecognized ONNX inputs: {[i.name for i in self.inputs]}")
+
+        self.output_names = self.outputs if len(self.outputs) > 1 else list(OUTPUT_NAMES)
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        if self.per_parameter:
+            feeds = {}
+            for i in self.inputs:
+                column = x[:, INPUT_NAMES.index(i.name)]
+                feeds[i.name] = column.reshape(-1, 1) if len(i.shape) == 2 else column
+        else:
+            feeds = {self.inputs[0].name: x}
+        results = self.session.run(self.outputs, feeds)
+        return np.column_stack([np.asarray(r).reshape(len(x), -1) for r in results])
+
+
+class ErrorStats:
+    """
+    Streaming per-output error statistics between a reference and a candidate
+
+    Accumulates max/mean absolute and relative error, RMS error and the count
+    of elements violating |a - b| <= atol + rtol * |reference| batch by batch.
+    """
+
+    def __init__(self, k: int, atol: float = 1e-4, rtol: float = 1e-4):
+        self.atol, self.rtol = atol, rtol
+        self.count = 0
+        self.max_abs = np.zeros(k)
+        self.sum_abs = np.zeros(k)
+        self.sum_sq = np.zeros(k)
+        self.max_rel = np.zeros(k)
+        self.sum_rel = np.zeros(k)
+        self.violations = np.zeros(k, dtype=np.int64)
+
+    def update(self, expected: np.ndarray, actual: np.ndarray):
+        expected = expected.astype(np.float64)
+        abs_error = np.abs(actual.astype(np.float64) - expected)
+        rel_error = abs_error / np.maximum(np.abs(expected), np.finfo(np.float32).tiny)
+        np.maximum(self.max_abs, abs_error.max(axis=0), out=self.max_abs)
+        np.maximum(self.max_rel, rel_error.max(axis=0), out=self.max_rel)
+        self.sum_abs += abs_error.sum(axis=0)
+        self.sum_sq += np.square(abs_error).sum(axis=0)
+        self.sum_rel += rel_error.sum(axis=0)
+        self.violations += (abs_error > self.atol + self.rtol * np.abs(expected)).sum(axis=0)
+        self.count += len(expected)
+
+    def report(self, names: list) -> dict:
+        return {
+            name: {
+                'max_abs': float(self.max_abs[i]),
+                'mean_abs': float(self.sum_abs[i] / self.count),
+                'rms': float(np.sqrt(self.sum_sq[i] / self.count)),
+                'max_rel': float(self.max_rel[i]),
+                'mean_rel': float(self.sum_rel[i] / self.count),
+                'violations': int(self.violations[i]),
+            }
+            for i, name in enumerate(names)
+        }
+
+
+def print_error_table(report: dict):
+    print(f"{'output':<10} {'max abs':>12} {'mean abs':>12} {'rms':>12} {'max rel':>12} {'mean rel':>12} "
+          f"{'violations':>11}")
+    for name, stats in report.items():
+        print(f"{name:<10} {stats['max_abs']:12.3e} {stats['mean_abs']:12.3e} {stats['rms']:12.3e} "
+              f"{stats['max_rel']:12.3e} {stats['mean_rel']:12.3e} {stats['violations']:11,}")
+
+
+def verify_parity(onnx_path: str, weights_path=DEFAULT_WEIGHTS, samples: int = 1_000_000,
+                  batch_size: int = 65536, seed: int = 0, atol: float = 1e-4, rtol: float = 1e-4) -> dict:
+    """
+    Compare ONNX Runtime and NumPy-engine outputs over `samples` random inputs
+
+    Returns per-output max/mean absolute and relative error, RMS error and the
+    number of elements violating |a - b| <= atol + rtol * |onnx|.
+    """
+    reference = OnnxReference(onnx_path)
+    engine = QLKNNNumpy.load(weights_path)
+
+    if sorted(reference.output_names) != sorted(OUTPUT_NAMES):
+        raise ValueError(f"ONNX outputs {reference.output_names} do not match {OUTPUT_NAMES}")
+    # Reorder engine columns into the ONNX graph's output order
+    columns = [OUTPUT_NAMES.index(name) for name in reference.output_names]
+
+    stats = ErrorStats(len(OUTPUT_NAMES), atol, rtol)
+    out = np.empty((batch_size, engine.output_dim), dtype=np.float32)
+    for start in range(0, samples, batch_size):
+        n = min(batch_size, samples - start)
+        x = sample_inputs(n, seed=seed + start)
+        stats.update(reference(x), engine(x, out[:n])[:, columns])
+
+    return stats.report(reference.output_names)
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    import time
+
+    default_onnx = '/Library/Frameworks/Python.framework/Versions/3.12/lib/python3.12/site-packages/fusion_surrogates/qlknn/models/qlknn_7_11.onnx'
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('onnx_path', nargs='?', default=default_onnx)
+    parser.add_argument('--weights', default=str(DEFAULT_WEIGHTS))
+    parser.add_argument('-n', '--samples', type=int, default=1_000_000)
+    parser.add_argument('--batch-size', type=int, default=65536)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--atol', type=float, default=1e-4)
+    parser.add_argument('--rtol', type=float, default=1e-4)
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = verify_parity(args.onnx_path, args.weights, args.samples, args.batch_size,
+                           args.seed, args.atol, args.rtol)
+    elapsed = time.perf_counter() - start
+
+    print(f"=== Parity: {args.samples:,} samples in {elapsed:.1f} s ===\n")
+    print_error_table(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    failed = sum(stats['violations'] for stats in report.values())
+    if failed:
+        print(f"\n❌ {failed:,} values outside atol={args.atol} + rtol={args.rtol}·|onnx|")
+        sys.exit(1)
+    print("\n✅ Exported weights match ONNX Runtime")
@@ -1,7 +1,7 @@
 import Foundation
 import MLX
 
-/// Model weight loader supporting SafeTensors format
+/// Model weight loader supporting SafeTensors and packed-blob formats
 public struct ModelLoader {
 
     /// Load SafeTensors file (MLX native format)
@@ -21,6 +21,84 @@ public struct ModelLoader {
         }
     }
 
+    /// Offset table written to the metadata by the converter's `--packed` mode
+    struct PackedLayout: Decodable {
+        struct Tensor: Decodable {
+            let offset: Int
+            let shape: [Int]
+        }
+
+        let alignment: Int
+        let dtype: String
+        let size: Int
+        let tensors: [String: Tensor]
+    }
+
+    private struct PackedMetadata: Decodable {
+        let packed: PackedLayout
+    }
+
+    /// Load a packed float32 blob (`<model>_packed.bin`)
+    ///
+    /// The blob is memory-mapped once and each tensor is sliced at the
+    /// 64-byte-aligned offset recorded in the metadata's `packed` table,
+    /// avoiding per-tensor file parsing on cold start. Each `MLXArray` is
+    /// created directly from the mapped bytes, a single copy: MLX owns its
+    /// array storage, so the weights are not shared with the page cache.
+    ///
+    /// - Parameters:
+    ///   - path: Packed weights file
+    ///   - metadataPath: Metadata JSON with the `packed` table
+    ///     (defaults to `<model>_metadata.json` next to `<model>_packed.bin`)
+    public static func loadPacked(path: String, metadataPath: String? = nil) throws -> [String: MLXArray] {
+        let metadataPath = metadataPath ?? Self.packedMetadataPath(for: path)
+
+        guard FileManager.default.fileExists(atPath: path) else {
+            throw QLKNNError.modelNotFound("Packed weights file not found: \(path)")
+        }
+        guard FileManager.default.fileExists(atPath: metadataPath) else {
+            throw QLKNNError.modelNotFound("Packed weights metadata not found: \(metadataPath)")
+        }
+
+        let layout: PackedLayout
+        do {
+            let metadataData = try Data(contentsOf: URL(fileURLWithPath: metadataPath))
+            layout = try JSONDecoder().decode(PackedMetadata.self, from: metadataData).packed
+        } catch {
+            throw QLKNNError.invalidWeights("Failed to read packed layout: \(error)")
+        }
+        guard layout.dtype == "float32" else {
+            throw QLKNNError.invalidWeights("Unsupported packed dtype: \(layout.dtype)")
+        }
+
+        let blob = try Data(contentsOf: URL(fileURLWithPath: path), options: .alwaysMapped)
+        guard blob.count >= layout.size else {
+            throw QLKNNError.invalidWeights("Packed blob is \(blob.count) bytes, expected \(layout.size)")
+        }
+
+        var arrays: [String: MLXArray] = [:]
+        try blob.withUnsafeBytes { (buffer: UnsafeRawBufferPointer) in
+            for (name, tensor) in layout.tensors {
+                let count = tensor.shape.reduce(1, *)
+                let end = tensor.offset + count * MemoryLayout<Float>.stride
+                guard tensor.offset % MemoryLayout<Float>.alignment == 0, end <= buffer.count else {
+                    throw QLKNNError.invalidWeights("Tensor \(name) lies outside the packed blob")
+                }
+                let bytes = UnsafeRawBufferPointer(rebasing: buffer[tensor.offset ..< end])
+                arrays[name] = MLXArray(bytes, tensor.shape, dtype: .float32)
+            }
+        }
+        return arrays
+    }
+
+    /// `<model>_packed.bin` -> `<model>_metadata.json`
+    static func packedMetadataPath(for path: String) -> String {
+        let url = URL(fileURLWithPath: path)
+        let stem = url.deletingPathExtension().lastPathComponent
+        let model = stem.hasSuffix("_packed") ? String(stem.dropLast("_packed".count)) : stem
+        return url.deletingLastPathComponent().appendingPathComponent("\(model)_metadata.json").path
+    }
+
     /// Load model weights (auto-detects format)
     public static func load(path: String) throws -> [String: MLXArray] {
         let fileExtension = (path as NSString).pathExtension.lowercased()
@@ -28,8 +106,10 @@ public struct ModelLoader {
         switch fileExtension {
         case "safetensors":
             return try loadSafeTensors(path: path)
+        case "bin":
+            return try loadPacked(path: path)
         default:
-            throw QLKNNError.invalidWeights("Unsupported format: \(fileExtension). Use .safetensors")
+            throw QLKNNError.invalidWeights("Unsupported format: \(fileExtension). Use .safetensors or _packed.bin")
         }
     }
 }
@@ -82,26 +82,29 @@ public struct QLKNN {
         let nCells = expectedShape[0]
 
         // Check all arrays have the same shape
-        for (key, array) in inputs {
-            if array.shape != expectedShape {
-                throw FusionSurrogatesError.predictionFailed(
-                    "Shape mismatch for '\(key)': expected \(expectedShape), got \(array.shape)"
-                )
-            }
-
-            // Check for NaN or Inf values
-            eval(array)
-            let values = array.asArray(Float.self)
+        for (key, array) in inputs where array.shape != expectedShape {
+            throw FusionSurrogatesError.predictionFailed(
+                "Shape mismatch for '\(key)': expected \(expectedShape), got \(array.shape)"
+            )
+        }
 
-            if values.contains(where: { $0.isNaN }) {
-                throw FusionSurrogatesError.predictionFailed(
-                    "NaN values detected in input '\(key)'"
-                )
-            }
-            if values.contains(where: { $0.isInfinite }) {
-                throw FusionSurrogatesError.predictionFailed(
-                    "Infinite values detected in input '\(key)'"
-                )
+        // Check for NaN or Inf values: one fused reduction on device (|x| < inf is false for both);
+        // arrays are only copied to the host to name the offending input
+        let allFinite = (abs(stacked(Array(inputs.values))) .< Float.infinity).all().item(Bool.self)
+        if !allFinite {
+            for (key, array) in inputs {
+                let values = array.asArray(Float.self)
+
+                if values.contains(where: { $0.isNaN }) {
+                    throw FusionSurrogatesError.predictionFailed(
+                        "NaN values detected in input '\(key)'"
+                    )
+                }
+                if values.contains(where: { $0.isInfinite }) {
+                    throw FusionSurrogatesError.predictionFailed(
+                        "Infinite values detected in input '\(key)'"
+                    )
+                }
             }
         }
 
@@ -118,6 +121,79 @@ public struct QLKNN {
             )
         }
     }
+
+    // MARK: - Batch Validation
+
+    /// Valid range of each input (QLKNN 7_11 training data bounds, `config.stats_data`)
+    public static let validRanges: [String: ClosedRange<Float>] = [
+        "Ati": 0 ... 150,
+        "Ate": 0 ... 150,
+        "Ane": -5 ... 110,
+        "Ani": -15 ... 110,
+        "q": 0.66 ... 30,
+        "smag": -1 ... 40,
+        "x": 0.1 ... 0.95,
+        "Ti_Te": 0.25 ... 2.5,
+        "LogNuStar": -5 ... 0.48,
+        "normni": 0.5 ... 1.0
+    ]
+
+    /// Bit offset of the non-finite flags in a `validateBatch` mask
+    public static let nonFiniteShift = 16
+
+    /// Validate a whole [batch_size, 10] input batch without throwing on bad values
+    ///
+    /// Bit `j` of a row's mask is set when input `j` (in `inputParameterNames` order) lies
+    /// outside `validRanges`, non-finite values included; bit `nonFiniteShift + j` is set
+    /// when it is NaN or ±Inf. Computed on device in one fused pass: comparisons with NaN
+    /// are false, so `low <= x <= high` rejects NaN and ±Inf along with out-of-range values.
+    ///
+    /// - Parameter input: Input batch [batch_size, 10]
+    /// - Returns: UInt32 mask [batch_size]; 0 means the row is valid
+    /// - Throws: FusionSurrogatesError if the batch is not [batch_size, 10]
+    public static func validateBatch(_ input: MLXArray) throws -> MLXArray {
+        let count = inputParameterNames.count
+        guard input.ndim == 2, input.dim(1) == count else {
+            throw FusionSurrogatesError.invalidInput(
+                "Expected input of shape [batch_size, \(count)], got \(input.shape)"
+            )
+        }
+
+        let bounds = inputParameterNames.map { validRanges[$0]! }
+        let low = MLXArray(bounds.map(\.lowerBound), [1, count])
+        let high = MLXArray(bounds.map(\.upperBound), [1, count])
+        let bits = MLXArray((0 ..< count).map { UInt32(1) << UInt32($0) }, [1, count])
+
+        let outside = logicalNot(logicalAnd(input .>= low, input .<= high)).asType(.uint32)
+        let nonFinite = logicalNot(abs(input) .< Float.infinity).asType(.uint32)
+
+        let rangeBits = (outside * bits).sum(axis: 1)
+        let nonFiniteBits = (nonFinite * bits).sum(axis: 1)
+        return rangeBits + nonFiniteBits * MLXArray(UInt32(1) << UInt32(nonFiniteShift))
+    }
+
+    /// Validate dictionary inputs; see `validateBatch(_:)` for the mask layout
+    ///
+    /// - Parameter inputs: Dictionary of [batch_size] input arrays
+    /// - Returns: UInt32 mask [batch_size]; 0 means the row is valid
+    /// - Throws: FusionSurrogatesError if any required parameter is missing
+    public static func validateBatch(_ inputs: [String: MLXArray]) throws -> MLXArray {
+        try validateInputs(inputs)
+        return try validateBatch(QLKNNNetwork.batchToInputArray(inputs))
+    }
+
+    /// Describe the problems flagged in one row of a `validateBatch` mask
+    public static func validationIssues(_ mask: UInt32) -> [String] {
+        var issues: [String] = []
+        for (j, name) in inputParameterNames.enumerated() {
+            if mask & (1 << UInt32(nonFiniteShift + j)) != 0 {
+                issues.append("\(name) is not finite")
+            } else if mask & (1 << UInt32(j)) != 0, let range = validRanges[name] {
+                issues.append("\(name) outside \(range)")
+            }
+        }
+        return issues
+    }
 }
 
 // MARK: - Error Types
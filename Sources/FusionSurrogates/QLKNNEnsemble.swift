@@ -0,0 +1,151 @@
+import Foundation
+import MLX
+import MLXNN
+
+/// Stacked ensemble of QLKNN networks evaluated in one pass
+///
+/// Weights are `_network.model.N.weight` [members, out, in] and `_network.model.N.bias`
+/// [members, out], as written by `Scripts/qlknn_ensemble.py`. Every layer is one batched
+/// matmul over the member axis, so N checkpoints cost one dispatch per layer instead of
+/// N separate forward passes.
+public final class QLKNNEnsemble {
+
+    /// Per layer: transposed weights [members, in, out] and bias [members, 1, out]
+    let layers: [(weightT: MLXArray, bias: MLXArray)]
+
+    /// Number of stacked networks
+    public let memberCount: Int
+
+    /// Names of the output columns, in order
+    public let outputNames: [String]
+
+    /// Build an ensemble from stacked `_network.model.N.{weight,bias}` arrays
+    public init(
+        weights: [String: MLXArray],
+        outputNames: [String] = QLKNN.outputParameterNames
+    ) throws {
+        var layers: [(weightT: MLXArray, bias: MLXArray)] = []
+        var memberCount: Int?
+        var width: Int?
+
+        for index in QLKNNNetwork.onnxLayerIndices {
+            let weightName = "_network.model.\(index).weight"
+            let biasName = "_network.model.\(index).bias"
+            guard let weight = weights[weightName] else {
+                throw QLKNNError.missingParameter("Missing weight: \(weightName)")
+            }
+            guard let bias = weights[biasName] else {
+                throw QLKNNError.missingParameter("Missing weight: \(biasName)")
+            }
+
+            let shape = weight.shape
+            guard shape.count == 3, bias.shape == [shape[0], shape[1]] else {
+                throw QLKNNError.invalidWeights(
+                    "\(weightName) has shape \(shape) and bias \(bias.shape), expected [members, out, in] and [members, out]"
+                )
+            }
+            guard shape[0] == (memberCount ?? shape[0]), shape[2] == (width ?? shape[2]) else {
+                throw QLKNNError.invalidWeights(
+                    "\(weightName) has shape \(shape), expected [\(memberCount ?? shape[0]), out, \(width ?? shape[2])]"
+                )
+            }
+            memberCount = shape[0]
+            width = shape[1]
+
+            layers.append((weight.transposed(0, 2, 1), bias.expandedDimensions(axis: 1)))
+        }
+
+        guard outputNames.count == width else {
+            throw QLKNNError.invalidWeights(
+                "Output layer has \(width ?? 0) outputs, but \(outputNames.count) output names were given"
+            )
+        }
+
+        self.layers = layers
+        self.memberCount = memberCount ?? 0
+        self.outputNames = outputNames
+    }
+
+    /// Load a stacked ensemble SafeTensors file
+    public static func load(
+        weightsPath: String,
+        outputNames: [String] = QLKNN.outputParameterNames
+    ) throws -> QLKNNEnsemble {
+        guard FileManager.default.fileExists(atPath: weightsPath) else {
+            throw QLKNNError.modelNotFound("Weights file not found: \(weightsPath)")
+        }
+
+        return try QLKNNEnsemble(weights: ModelLoader.load(path: weightsPath), outputNames: outputNames)
+    }
+
+    /// Stack already-loaded networks of identical shape
+    public convenience init(networks: [QLKNNNetwork]) throws {
+        guard let first = networks.first else {
+            throw QLKNNError.invalidWeights("An ensemble needs at least one network")
+        }
+
+        var weights: [String: MLXArray] = [:]
+        for index in QLKNNNetwork.onnxLayerIndices {
+            let members = networks.map { $0.linearLayer(index) }
+            guard members.allSatisfy({ $0.weight.shape == members[0].weight.shape }) else {
+                throw QLKNNError.invalidWeights("Networks differ in the shape of layer \(index)")
+            }
+            weights["_network.model.\(index).weight"] = stacked(members.map { $0.weight }, axis: 0)
+            weights["_network.model.\(index).bias"] = stacked(members.map { $0.bias! }, axis: 0)
+        }
+
+        try self.init(weights: weights, outputNames: first.outputNames)
+    }
+
+    /// Every member's outputs: [batch_size, 10] -> [members, batch_size, outputs]
+    public func members(_ input: MLXArray) -> MLXArray {
+        // [1, batch, in] broadcasts against [members, in, out]
+        var x = input.expandedDimensions(axis: 0)
+        for (index, layer) in layers.enumerated() {
+            x = matmul(x, layer.weightT) + layer.bias
+            if index != layers.count - 1 {
+                x = relu(x)
+            }
+        }
+        return x
+    }
+
+    /// Mean and (population) standard deviation over members, each [batch_size, outputs]
+    public func callAsFunction(_ input: MLXArray) -> (mean: MLXArray, std: MLXArray) {
+        let outputs = members(input)
+        return (outputs.mean(axis: 0), sqrt(outputs.variance(axis: 0)))
+    }
+
+    /// Predict ensemble mean and standard deviation by output name
+    /// - Parameter inputs: Dictionary of input arrays [String: MLXArray]
+    /// - Returns: Mean and standard deviation arrays keyed by `outputNames`
+    public func predict(
+        _ inputs: [String: MLXArray]
+    ) throws -> (mean: [String: MLXArray], std: [String: MLXArray]) {
+        try QLKNN.validateInputs(inputs)
+        let (mean, std) = self(QLKNNNetwork.batchToInputArray(inputs))
+
+        var meanByName: [String: MLXArray] = [:]
+        var stdByName: [String: MLXArray] = [:]
+        for (idx, name) in outputNames.enumerated() {
+            meanByName[name] = mean[0..., idx]
+            stdByName[name] = std[0..., idx]
+        }
+        return (meanByName, stdByName)
+    }
+}
+
+extension QLKNNNetwork {
+
+    /// Linear layer at ONNX index `index` (0, 2, ..., 10)
+    func linearLayer(_ index: Int) -> Linear {
+        switch index {
+        case 0: return layer0
+        case 2: return layer2
+        case 4: return layer4
+        case 6: return layer6
+        case 8: return layer8
+        default: return layer10
+        }
+    }
+}
@@ -7,7 +7,7 @@ import MLXNN
 /// Architecture: 5 hidden layers (133 units each) + output layer (8 outputs)
 /// Activation: ReLU
 /// Input: 10 parameters [Ati, Ate, Ane, Ani, q, smag, x, Ti_Te, LogNuStar, normni]
-/// Output: 8 fluxes [efiITG, efeITG, pfeITG, efeTEM, efiTEM, pfeTEM, efeETG, gamma_max]
+/// Output: 8 fluxes [efeITG, efiITG, pfeITG, efeTEM, efiTEM, pfeTEM, efeETG, gamma_max]
 public class QLKNNNetwork: Module, UnaryLayer {
 
     // Network layers
@@ -18,14 +18,44 @@ public class QLKNNNetwork: Module, UnaryLayer {
     @ModuleInfo var layer8: Linear
     @ModuleInfo var layer10: Linear
 
+    /// Names of the output columns, in order (`QLKNN.outputParameterNames` unless the
+    /// output layer was folded, e.g. `TORAXIntegration.headOutputNames`)
+    public let outputNames: [String]
+
+    /// ONNX `_network.model.N` indices of the Linear layers (ReLUs sit at the odd indices)
+    static let onnxLayerIndices = [0, 2, 4, 6, 8, 10]
+
     /// Initialize network with random weights (for testing)
-    public init(inputDimensions: Int = 10, outputDimensions: Int = 8, hiddenDimensions: Int = 133) {
-        self.layer0 = Linear(inputDimensions, hiddenDimensions)
-        self.layer2 = Linear(hiddenDimensions, hiddenDimensions)
-        self.layer4 = Linear(hiddenDimensions, hiddenDimensions)
-        self.layer6 = Linear(hiddenDimensions, hiddenDimensions)
-        self.layer8 = Linear(hiddenDimensions, hiddenDimensions)
-        self.layer10 = Linear(hiddenDimensions, outputDimensions)
+    public init(
+        inputDimensions: Int = 10,
+        outputDimensions: Int = 8,
+        hiddenDimensions: Int = 133,
+        outputNames: [String] = QLKNN.outputParameterNames
+    ) {
+        self.init(
+            inputDimensions: inputDimensions,
+            outputDimensions: outputDimensions,
+            hiddenLayerDimensions: Array(repeating: hiddenDimensions, count: 5),
+            outputNames: outputNames
+        )
+    }
+
+    /// Initialize network with one width per hidden layer (e.g. a pruned model
+    /// from `Scripts/prune_qlknn.py`)
+    public init(
+        inputDimensions: Int,
+        outputDimensions: Int,
+        hiddenLayerDimensions widths: [Int],
+        outputNames: [String] = QLKNN.outputParameterNames
+    ) {
+        precondition(widths.count == 5, "QLKNNNetwork has 5 hidden layers, got \(widths.count) widths")
+        self.outputNames = outputNames
+        self.layer0 = Linear(inputDimensions, widths[0])
+        self.layer2 = Linear(widths[0], widths[1])
+        self.layer4 = Linear(widths[1], widths[2])
+        self.layer6 = Linear(widths[2], widths[3])
+        self.layer8 = Linear(widths[3], widths[4])
+        self.layer10 = Linear(widths[4], outputDimensions)
         super.init()
     }
 
@@ -38,40 +68,76 @@ public class QLKNNNetwork: Module, UnaryLayer {
         return try load(weightsPath: resourceURL.path)
     }
 
-    /// Load network from SafeTensors weights file
-    public static func load(weightsPath: String) throws -> QLKNNNetwork {
+    /// Load network from a SafeTensors or packed (`_packed.bin`) weights file
+    public static func load(
+        weightsPath: String,
+        outputNames: [String] = QLKNN.outputParameterNames
+    ) throws -> QLKNNNetwork {
         guard FileManager.default.fileExists(atPath: weightsPath) else {
             throw QLKNNError.modelNotFound("Weights file not found: \(weightsPath)")
         }
 
-        // Load weights directly using MLX
-        let url = URL(fileURLWithPath: weightsPath)
-        let loadedWeights = try MLX.loadArrays(url: url)
-
-        // Create network
-        let network = QLKNNNetwork()
+        return try load(weights: ModelLoader.load(path: weightsPath), outputNames: outputNames)
+    }
 
+    /// Build network from `_network.model.N.{weight,bias}` arrays
+    public static func load(
+        weights loadedWeights: [String: MLXArray],
+        outputNames: [String] = QLKNN.outputParameterNames
+    ) throws -> QLKNNNetwork {
         // Build flattened parameters dictionary
         var params: [String: MLXArray] = [:]
 
         // Map ONNX layer names to our layer names
-        params["layer0.weight"] = loadedWeights["_network.model.0.weight"]!
-        params["layer0.bias"] = loadedWeights["_network.model.0.bias"]!
-
-        params["layer2.weight"] = loadedWeights["_network.model.2.weight"]!
-        params["layer2.bias"] = loadedWeights["_network.model.2.bias"]!
-
-        params["layer4.weight"] = loadedWeights["_network.model.4.weight"]!
-        params["layer4.bias"] = loadedWeights["_network.model.4.bias"]!
+        for index in onnxLayerIndices {
+            for kind in ["weight", "bias"] {
+                let onnxName = "_network.model.\(index).\(kind)"
+                guard let array = loadedWeights[onnxName] else {
+                    throw QLKNNError.missingParameter("Missing weight: \(onnxName)")
+                }
+                params["layer\(index).\(kind)"] = array
+            }
+        }
 
-        params["layer6.weight"] = loadedWeights["_network.model.6.weight"]!
-        params["layer6.bias"] = loadedWeights["_network.model.6.bias"]!
+        // Infer dimensions from weight shapes ([out, in]) so converted models
+        // with other input/hidden/output widths, including pruned models whose
+        // hidden layers differ in width, load without code changes
+        let firstShape = params["layer0.weight"]!.shape
+        let lastShape = params["layer10.weight"]!.shape
+        var hiddenLayerDimensions: [Int] = []
+        var previousWidth = firstShape[1]
+
+        for index in onnxLayerIndices {
+            let shape = params["layer\(index).weight"]!.shape
+            guard shape.count == 2, shape[1] == previousWidth else {
+                throw QLKNNError.invalidWeights(
+                    "layer\(index).weight has shape \(shape), expected [_, \(previousWidth)]"
+                )
+            }
+            guard params["layer\(index).bias"]!.shape == [shape[0]] else {
+                throw QLKNNError.invalidWeights(
+                    "layer\(index).bias has shape \(params["layer\(index).bias"]!.shape), expected [\(shape[0])]"
+                )
+            }
+            if index != onnxLayerIndices.last {
+                hiddenLayerDimensions.append(shape[0])
+            }
+            previousWidth = shape[0]
+        }
 
-        params["layer8.weight"] = loadedWeights["_network.model.8.weight"]!
-        params["layer8.bias"] = loadedWeights["_network.model.8.bias"]!
+        guard outputNames.count == lastShape[0] else {
+            throw QLKNNError.invalidWeights(
+                "layer10.weight has \(lastShape[0]) outputs, but \(outputNames.count) output names were given"
+            )
+        }
 
-        params["layer10.weight"] = loadedWeights["_network.model.10.weight"]!
-        params["layer10.bias"] = loadedWeights["_network.model.10.bias"]!
+        // Create network
+        let network = QLKNNNetwork(
+            inputDimensions: firstShape[1],
+            outputDimensions: lastShape[0],
+            hiddenLayerDimensions: hiddenLayerDimensions,
+            outputNames: outputNames
+        )
 
         // Update network with loaded parameters
         network.update(parameters: ModuleParameters.unflattened(params))
@@ -117,14 +183,62 @@ public class QLKNNNetwork: Module, UnaryLayer {
         let batchInput = Self.batchToInputArray(inputs)
 
         // Forward pass
-        let outputs = self(batchInput)  // [batch_size, 8]
+        let outputs = self(batchInput)  // [batch_size, outputs]
+
+        return splitOutputs(outputs)
+    }
+
+    /// Forward pass and Jacobian d(output)/d(input) in one sweep
+    /// - Parameter input: Input array [batch_size, 10]
+    /// - Returns: Outputs [batch_size, 8] and Jacobian [batch_size, 8, 10]
+    ///
+    /// Reverse mode through the forward pass's ReLU masks: the 8 rows of `layer10.weight`
+    /// are pulled back through each hidden layer with one batched matmul per layer,
+    /// instead of finite-differencing with extra forward passes.
+    public func valueAndJacobian(_ input: MLXArray) -> (output: MLXArray, jacobian: MLXArray) {
+        let hiddenLayers = [layer0, layer2, layer4, layer6, layer8]
+
+        var x = input
+        var masks: [MLXArray] = []
+        for layer in hiddenLayers {
+            let z = layer(x)
+            masks.append((z .> 0).asType(z.dtype))
+            x = relu(z)
+        }
+        let output = layer10(x)
+
+        // Adjoint rows per sample: [batch_size, 8, hidden]
+        var adjoint = expandedDimensions(layer10.weight, axis: 0) * expandedDimensions(masks[masks.count - 1], axis: 1)
+        for index in stride(from: hiddenLayers.count - 1, to: 0, by: -1) {
+            adjoint = matmul(adjoint, hiddenLayers[index].weight) * expandedDimensions(masks[index - 1], axis: 1)
+        }
+        let jacobian = matmul(adjoint, layer0.weight)  // [batch_size, 8, 10]
+
+        return (output, jacobian)
+    }
+
+    /// Jacobian d(output)/d(input) [batch_size, 8, 10]
+    public func jacobian(_ input: MLXArray) -> MLXArray {
+        valueAndJacobian(input).jacobian
+    }
+
+    /// Predict outputs and their Jacobian with respect to the inputs
+    /// - Parameter inputs: Dictionary of input arrays [String: MLXArray]
+    /// - Returns: Output arrays by name and Jacobian [batch_size, 8, 10], with rows in
+    ///   `outputNames` order and columns in `QLKNN.inputParameterNames` order
+    public func predictWithJacobian(
+        _ inputs: [String: MLXArray]
+    ) throws -> (outputs: [String: MLXArray], jacobian: MLXArray) {
+        let (outputs, jacobian) = valueAndJacobian(Self.batchToInputArray(inputs))
+        return (splitOutputs(outputs), jacobian)
+    }
 
-        // Split outputs into individual fluxes
-        let outputNames = QLKNN.outputParameterNames
+    /// Split [batch_size, outputs] into named [batch_size] arrays
+    func splitOutputs(_ outputs: MLXArray) -> [String: MLXArray] {
         var result: [String: MLXArray] = [:]
 
         for (idx, name) in outputNames.enumerated() {
-            // Extract column idx from outputs: [batch_size, 8] -> [batch_size]
+            // Extract column idx from outputs: [batch_size, outputs] -> [batch_size]
             let column = outputs[0..., idx]
             // column is already 1D, no need to squeeze
             result[name] = column
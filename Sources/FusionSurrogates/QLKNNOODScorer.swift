@@ -0,0 +1,128 @@
+import Foundation
+import MLX
+
+/// Mahalanobis out-of-distribution scorer for QLKNN inputs
+///
+/// Fitted by `Scripts/qlknn_ood.py` (or the converter's `--ood` / `--ood-reference`) on a
+/// reference sample of the training domain and stored in the model metadata under `ood`.
+/// A row's score is the squared Mahalanobis distance |W (x - mean)|², one [10, 10] matmul per
+/// batch. Rows scoring above `threshold` lie outside the reference distribution. A scorer fitted
+/// on correlated operating points also flags rows that break those correlations while staying
+/// inside every `QLKNN.validRanges` interval; the `--ood` entry is fitted on independent uniform
+/// samples, so it only flags rows near the corners of the range box. Such entries are marked with
+/// `reference.source == uniformBoxSource` and refused by `load` unless `allowUniformBox` is set.
+public struct QLKNNOODScorer {
+
+    /// `reference.source` of an entry fitted on uniform `QLKNN.validRanges` samples
+    public static let uniformBoxSource = "uniform_box"
+
+    /// Transposed whitening matrix [10, 10]
+    let whiteningT: MLXArray
+
+    /// Whitened mean W · mean [1, 10], subtracted after the matmul
+    let offset: MLXArray
+
+    /// Score above which a row is out of distribution
+    public let threshold: Float
+
+    /// `ood` entry of `<model>_metadata.json`
+    struct Entry: Decodable {
+        let mean: [Float]
+        let whitening: [[Float]]
+        let threshold: Float
+        let reference: Reference?
+    }
+
+    /// Provenance of the fit
+    struct Reference: Decodable {
+        let source: String?
+    }
+
+    private struct Metadata: Decodable {
+        let ood: Entry?
+    }
+
+    /// Build a scorer from a fitted mean [10], whitening matrix [10][10] and threshold
+    public init(mean: [Float], whitening: [[Float]], threshold: Float) throws {
+        let count = QLKNN.inputParameterNames.count
+        guard mean.count == count, whitening.count == count, whitening.allSatisfy({ $0.count == count }) else {
+            throw QLKNNError.invalidWeights(
+                "OOD scorer expects a \(count)-element mean and a \(count)x\(count) whitening matrix"
+            )
+        }
+
+        // W · mean in Double so the folded offset is rounded once
+        let offset = whitening.map { row in
+            Float(zip(row, mean).reduce(0.0) { $0 + Double($1.0) * Double($1.1) })
+        }
+
+        self.whiteningT = MLXArray(whitening.flatMap { $0 }, [count, count]).transposed()
+        self.offset = MLXArray(offset, [1, count])
+        self.threshold = threshold
+    }
+
+    /// Load the scorer from the `ood` entry of a metadata JSON file
+    ///
+    /// - Parameters:
+    ///   - metadataPath: `<model>_metadata.json` with an `ood` entry
+    ///   - allowUniformBox: Accept an entry fitted on uniform input-range samples, which only flags
+    ///     the corners of the range box and cannot detect correlated extrapolation
+    public static func load(metadataPath: String, allowUniformBox: Bool = false) throws -> QLKNNOODScorer {
+        guard FileManager.default.fileExists(atPath: metadataPath) else {
+            throw QLKNNError.modelNotFound("Metadata file not found: \(metadataPath)")
+        }
+
+        let entry: Entry?
+        do {
+            let metadataData = try Data(contentsOf: URL(fileURLWithPath: metadataPath))
+            entry = try JSONDecoder().decode(Metadata.self, from: metadataData).ood
+        } catch {
+            throw QLKNNError.invalidWeights("Failed to read OOD scorer: \(error)")
+        }
+        guard let entry else {
+            throw QLKNNError.missingParameter("Metadata has no 'ood' entry: \(metadataPath)")
+        }
+        if entry.reference?.source == uniformBoxSource && !allowUniformBox {
+            throw QLKNNError.invalidWeights(
+                "OOD scorer in \(metadataPath) is fitted on uniform input-range samples and only flags corners "
+                    + "of the range box; refit with --ood-reference on real operating points, "
+                    + "or pass allowUniformBox: true to use it as a corner check"
+            )
+        }
+
+        return try QLKNNOODScorer(mean: entry.mean, whitening: entry.whitening, threshold: entry.threshold)
+    }
+
+    /// Load the scorer bundled with the QLKNN 7_11 model
+    ///
+    /// The bundled entry is a uniform input-range fit, so this throws unless `allowUniformBox`
+    /// is true. Load a scorer fitted on real operating points with `load(metadataPath:)` instead.
+    public static func loadDefault(allowUniformBox: Bool = false) throws -> QLKNNOODScorer {
+        guard let resourceURL = Bundle.module.url(forResource: "qlknn_7_11_metadata", withExtension: "json") else {
+            throw QLKNNError.modelNotFound("Default model metadata not found in bundle")
+        }
+
+        return try load(metadataPath: resourceURL.path, allowUniformBox: allowUniformBox)
+    }
+
+    /// Squared Mahalanobis distance of each row
+    /// - Parameter input: Input batch [batch_size, 10]
+    /// - Returns: Scores [batch_size]
+    public func score(_ input: MLXArray) -> MLXArray {
+        let z = matmul(input, whiteningT) - offset
+        return (z * z).sum(axis: 1)
+    }
+
+    /// Score dictionary inputs
+    /// - Parameter inputs: Dictionary of [batch_size] input arrays
+    /// - Returns: Scores [batch_size]
+    public func score(_ inputs: [String: MLXArray]) throws -> MLXArray {
+        try QLKNN.validateInputs(inputs)
+        return score(QLKNNNetwork.batchToInputArray(inputs))
+    }
+
+    /// Boolean mask [batch_size], true where a row is out of distribution
+    public func isOutOfDistribution(_ input: MLXArray) -> MLXArray {
+        score(input) .> threshold
+    }
+}
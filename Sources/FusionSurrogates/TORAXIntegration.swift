@@ -112,27 +112,38 @@ public enum TORAXIntegration {
     /// - gamma_max: Growth rate
     ///
     /// This combines them into total chi_ion and chi_electron for TORAX.
+    /// Outputs of a TORAX-head network (see `loadHeadNetwork(weightsPath:)`) are
+    /// already combined and are passed through without further array ops.
     ///
     /// - Parameter qlknnOutputs: Dictionary of QLKNN predictions
     /// - Returns: Dictionary with combined transport coefficients
     public static func combineFluxes(_ qlknnOutputs: [String: MLXArray]) -> [String: MLXArray] {
         var combined: [String: MLXArray] = [:]
 
-        // Total ion heat diffusivity (ITG + TEM modes)
-        let efiITG = qlknnOutputs["efiITG"] ?? MLXArray(0.0)
-        let efiTEM = qlknnOutputs["efiTEM"] ?? MLXArray(0.0)
-        combined["chi_ion"] = efiITG + efiTEM
-
-        // Total electron heat diffusivity (ITG + TEM + ETG modes)
-        let efeITG = qlknnOutputs["efeITG"] ?? MLXArray(0.0)
-        let efeTEM = qlknnOutputs["efeTEM"] ?? MLXArray(0.0)
-        let efeETG = qlknnOutputs["efeETG"] ?? MLXArray(0.0)
-        combined["chi_electron"] = efeITG + efeTEM + efeETG
-
-        // Total particle flux (ITG + TEM modes)
-        let pfeITG = qlknnOutputs["pfeITG"] ?? MLXArray(0.0)
-        let pfeTEM = qlknnOutputs["pfeTEM"] ?? MLXArray(0.0)
-        combined["particle_flux"] = pfeITG + pfeTEM
+        if let chiIon = qlknnOutputs["chi_ion"],
+           let chiElectron = qlknnOutputs["chi_electron"],
+           let particleFlux = qlknnOutputs["particle_flux"] {
+            // Sums already folded into the output layer
+            combined["chi_ion"] = chiIon
+            combined["chi_electron"] = chiElectron
+            combined["particle_flux"] = particleFlux
+        } else {
+            // Total ion heat diffusivity (ITG + TEM modes)
+            let efiITG = qlknnOutputs["efiITG"] ?? MLXArray(0.0)
+            let efiTEM = qlknnOutputs["efiTEM"] ?? MLXArray(0.0)
+            combined["chi_ion"] = efiITG + efiTEM
+
+            // Total electron heat diffusivity (ITG + TEM + ETG modes)
+            let efeITG = qlknnOutputs["efeITG"] ?? MLXArray(0.0)
+            let efeTEM = qlknnOutputs["efeTEM"] ?? MLXArray(0.0)
+            let efeETG = qlknnOutputs["efeETG"] ?? MLXArray(0.0)
+            combined["chi_electron"] = efeITG + efeTEM + efeETG
+
+            // Total particle flux (ITG + TEM modes)
+            let pfeITG = qlknnOutputs["pfeITG"] ?? MLXArray(0.0)
+            let pfeTEM = qlknnOutputs["pfeTEM"] ?? MLXArray(0.0)
+            combined["particle_flux"] = pfeITG + pfeTEM
+        }
 
         // Particle diffusivity (same as particle flux in GyroBohm units)
         combined["particle_diffusivity"] = combined["particle_flux"]!
@@ -142,11 +153,32 @@ public enum TORAXIntegration {
         combined["convection_velocity"] = MLXArray.ones([nCells]) * MLXArray(0.0)
 
         // Growth rate
-        combined["growth_rate"] = qlknnOutputs["gamma_max"] ?? (MLXArray.ones([nCells]) * MLXArray(0.0))
+        combined["growth_rate"] = qlknnOutputs["growth_rate"] ?? qlknnOutputs["gamma_max"]
+            ?? (MLXArray.ones([nCells]) * MLXArray(0.0))
 
         return combined
     }
 
+    // MARK: - TORAX Head
+
+    /// Output names of a TORAX-head network, in output-layer order
+    ///
+    /// Matches `TORAX_HEAD` in `Scripts/convert_onnx_to_safetensors.py`.
+    public static let headOutputNames: [String] = [
+        "chi_ion",        // efiITG + efiTEM
+        "chi_electron",   // efeITG + efeTEM + efeETG
+        "particle_flux",  // pfeITG + pfeTEM
+        "growth_rate"     // gamma_max
+    ]
+
+    /// Load a network whose output layer has the `combineFluxes` sums folded in
+    ///
+    /// - Parameter weightsPath: `<model>_weights_torax.safetensors` written by the converter's `--torax-head`
+    /// - Returns: Network predicting `headOutputNames` directly
+    public static func loadHeadNetwork(weightsPath: String) throws -> QLKNNNetwork {
+        try QLKNNNetwork.load(weightsPath: weightsPath, outputNames: headOutputNames)
+    }
+
     // MARK: - Finite Difference Utilities
 
     /// Compute gradient using finite differences (MLX-native implementation)
@@ -215,4 +215,40 @@ struct InputValidationTests {
             #expect(Bool(false), "Wrong error type")
         }
     }
+
+    @Test("validateBatch flags out-of-range and non-finite inputs per row")
+    func validateBatchMask() throws {
+        let valid: [Float] = [5, 5, 1, 1, 2, 1, 0.3, 1, -1, 1]
+        var outOfRange = valid
+        outOfRange[0] = 200     // Ati above 150
+        outOfRange[4] = .nan    // q
+        var infinite = valid
+        infinite[6] = .infinity // x
+        var boundary = valid
+        boundary[0] = 150       // Ati at its upper bound
+
+        let input = MLXArray(valid + outOfRange + infinite + boundary, [4, 10])
+        let mask = try QLKNN.validateBatch(input).asArray(UInt32.self)
+
+        #expect(mask == [0, 1 | 1 << 4 | 1 << 20, 1 << 6 | 1 << 22, 0])
+        #expect(QLKNN.validationIssues(mask[0]).isEmpty)
+        #expect(QLKNN.validationIssues(mask[1]) == ["Ati outside 0.0...150.0", "q is not finite"])
+        #expect(QLKNN.validationIssues(mask[2]) == ["x is not finite"])
+    }
+
+    @Test("validateBatch accepts dictionary inputs and rejects bad shapes")
+    func validateBatchDictionary() throws {
+        var inputs: [String: MLXArray] = [:]
+        for name in QLKNN.inputParameterNames {
+            let range = QLKNN.validRanges[name]!
+            inputs[name] = MLXArray([range.lowerBound, range.upperBound, range.upperBound + 1], [3])
+        }
+
+        let mask = try QLKNN.validateBatch(inputs).asArray(UInt32.self)
+        #expect(mask == [0, 0, (1 << 10) - 1])
+
+        #expect(throws: FusionSurrogatesError.self) {
+            try QLKNN.validateBatch(MLXArray.repeating(1.0, count: 10))
+        }
+    }
 }
@@ -1,4 +1,5 @@
 import Testing
+import MLX
 import Foundation
 @testable import FusionSurrogates
 
@@ -34,6 +35,28 @@ struct MLXNetworkStructureTests {
         #expect(network.layer10.bias!.shape == [8])
     }
 
+    @Test("Pruned weights load with one width per hidden layer")
+    func perLayerHiddenWidths() throws {
+        let widths = [133, 132, 132, 128, 128]
+        var weights: [String: MLXArray] = [:]
+        var previous = 10
+        for (position, index) in QLKNNNetwork.onnxLayerIndices.enumerated() {
+            let width = position < widths.count ? widths[position] : 8
+            weights["_network.model.\(index).weight"] = MLXArray.zeros([width, previous])
+            weights["_network.model.\(index).bias"] = MLXArray.zeros([width])
+            previous = width
+        }
+
+        let network = try QLKNNNetwork.load(weights: weights)
+        #expect(network.layer2.weight.shape == [132, 133])
+        #expect(network.layer8.weight.shape == [128, 128])
+        #expect(network.layer10.weight.shape == [8, 128])
+
+        // Adjacent layers must still chain
+        weights["_network.model.6.weight"] = MLXArray.zeros([128, 133])
+        #expect(throws: QLKNNError.self) { try QLKNNNetwork.load(weights: weights) }
+    }
+
     @Test("Default model weights exist in bundle")
     func defaultModelExists() throws {
         let resourceURL = Bundle.module.url(
@@ -203,4 +203,36 @@ struct MLXNetworkTests {
             #expect(!value.isInfinite, "gamma_max should not be Inf")
         }
     }
+
+    @Test("Jacobian matches finite differences")
+    func jacobianMatchesFiniteDifferences() throws {
+        let network = try QLKNNNetwork.loadDefault()
+
+        let input = MLXArray([
+            Float(6.0), 6.0, 2.0, 2.0, 2.5, 1.5, 0.4, 1.2, -1.0, 1.0,
+            Float(3.0), 8.0, 1.0, 1.0, 1.8, 0.8, 0.6, 1.0, -0.5, 0.9,
+        ], [2, 10])
+
+        let (output, jacobian) = network.valueAndJacobian(input)
+        eval(output, jacobian)
+        #expect(jacobian.shape == [2, 8, 10])
+        #expect(abs(output - network(input)).max().item(Float.self) < 1e-5)
+
+        let analytic = jacobian.asArray(Float.self)
+        let scale = max(abs(jacobian).max().item(Float.self), 1.0)
+        let step: Float = 1e-3
+        for j in 0..<10 {
+            let delta = MLXArray((0..<10).map { $0 == j ? step : Float(0) }, [1, 10])
+            let difference = (network(input + delta) - network(input - delta)) / (2 * step)
+            eval(difference)
+            let numeric = difference.asArray(Float.self)
+            for sample in 0..<2 {
+                for k in 0..<8 {
+                    let a = analytic[(sample * 8 + k) * 10 + j]
+                    let n = numeric[sample * 8 + k]
+                    #expect(abs(a - n) < 1e-2 * scale, "d output \(k) / d input \(j), sample \(sample): \(a) vs \(n)")
+                }
+            }
+        }
+    }
 }
@@ -0,0 +1,92 @@
+import Testing
+import MLX
+import Foundation
+@testable import FusionSurrogates
+
+/// Tests for stacked ensemble evaluation
+@Suite("QLKNN Ensemble Tests")
+struct QLKNNEnsembleTests {
+
+    static let input = MLXArray(
+        [Float(6.0), 6.0, 2.0, 2.0, 2.5, 1.5, 0.4, 1.2, -1.0, 1.0,
+         3.0, 8.0, 1.0, 1.0, 1.8, 0.8, 0.6, 1.0, -0.5, 0.9],
+        [2, 10]
+    )
+
+    /// Default weights with the output layer scaled by `factor` (outputs scale by `factor`)
+    static func scaledWeights(_ factor: Float) throws -> [String: MLXArray] {
+        guard let resourceURL = Bundle.module.url(
+            forResource: "qlknn_7_11_weights",
+            withExtension: "safetensors"
+        ) else {
+            throw QLKNNError.modelNotFound("SafeTensors file not found")
+        }
+        var weights = try MLX.loadArrays(url: resourceURL)
+        weights["_network.model.10.weight"] = weights["_network.model.10.weight"]! * factor
+        weights["_network.model.10.bias"] = weights["_network.model.10.bias"]! * factor
+        return weights
+    }
+
+    @Test("Members match separate forward passes, mean and std over members")
+    func membersMatchSeparateNetworks() throws {
+        let base = try QLKNNNetwork.load(weights: Self.scaledWeights(1))
+        let tripled = try QLKNNNetwork.load(weights: Self.scaledWeights(3))
+        let ensemble = try QLKNNEnsemble(networks: [base, tripled])
+        #expect(ensemble.memberCount == 2)
+
+        let expected = base(Self.input)
+        let members = ensemble.members(Self.input)
+        #expect(members.shape == [2, 2, 8])
+
+        let scale = abs(expected).max().item(Float.self) + 1
+        let tolerance = 1e-5 * 3 * scale
+        #expect(abs(members[0] - expected).max().item(Float.self) < tolerance)
+        #expect(abs(members[1] - tripled(Self.input)).max().item(Float.self) < tolerance)
+
+        // Outputs y and 3y: mean 2y, population std |y|
+        let (mean, std) = ensemble(Self.input)
+        #expect(abs(mean - 2 * expected).max().item(Float.self) < tolerance)
+        #expect(abs(std - abs(expected)).max().item(Float.self) < tolerance)
+    }
+
+    @Test("Stacked SafeTensors file loads and predicts by output name")
+    func stackedFileLoads() throws {
+        var stackedWeights: [String: MLXArray] = [:]
+        let members = try [1, 2, 3].map { try Self.scaledWeights(Float($0)) }
+        for name in members[0].keys {
+            stackedWeights[name] = stacked(members.map { $0[name]! }, axis: 0)
+        }
+
+        let url = FileManager.default.temporaryDirectory
+            .appendingPathComponent("qlknn_ensemble_\(UUID().uuidString).safetensors")
+        defer { try? FileManager.default.removeItem(at: url) }
+        try MLX.save(arrays: stackedWeights, url: url)
+
+        let ensemble = try QLKNNEnsemble.load(weightsPath: url.path)
+        #expect(ensemble.memberCount == 3)
+
+        let inputs = Dictionary(uniqueKeysWithValues: QLKNN.inputParameterNames.enumerated().map { idx, name in
+            (name, Self.input[0..., idx])
+        })
+        let (mean, std) = try ensemble.predict(inputs)
+        let single = try QLKNNNetwork.loadDefault().predict(inputs)
+
+        for name in QLKNN.outputParameterNames {
+            let reference = try #require(single[name])
+            let meanValue = try #require(mean[name])
+            let stdValue = try #require(std[name])
+            let scale = abs(reference).max().item(Float.self) + 1
+            // Outputs y, 2y, 3y: mean 2y, population std sqrt(2/3) |y|
+            #expect(abs(meanValue - 2 * reference).max().item(Float.self) < 1e-4 * scale, "\(name) mean")
+            #expect(abs(stdValue - sqrt(Float(2) / 3) * abs(reference)).max().item(Float.self) < 1e-4 * scale,
+                    "\(name) std")
+        }
+    }
+
+    @Test("Unstacked weights are rejected")
+    func unstackedWeightsThrow() throws {
+        #expect(throws: QLKNNError.self) {
+            try QLKNNEnsemble(weights: Self.scaledWeights(1))
+        }
+    }
+}
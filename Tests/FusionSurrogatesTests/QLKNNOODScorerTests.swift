@@ -0,0 +1,75 @@
+import Testing
+import MLX
+import Foundation
+@testable import FusionSurrogates
+
+/// Tests for the Mahalanobis out-of-distribution scorer
+@Suite("QLKNN OOD Scorer Tests")
+struct QLKNNOODScorerTests {
+
+    @Test("Score is the squared whitened distance from the mean")
+    func scoreMatchesDefinition() throws {
+        // W = diag(1, 2, ..., 10), mean = 1: score = sum_j (j * (x_j - 1))^2
+        let count = QLKNN.inputParameterNames.count
+        let whitening = (0 ..< count).map { row in
+            (0 ..< count).map { column in row == column ? Float(row + 1) : 0 }
+        }
+        let scorer = try QLKNNOODScorer(
+            mean: [Float](repeating: 1, count: count),
+            whitening: whitening,
+            threshold: 100
+        )
+
+        let input = MLXArray([Float](repeating: 1, count: count) + [Float](repeating: 2, count: count), [2, count])
+        let scores = scorer.score(input).asArray(Float.self)
+        #expect(scores[0] == 0)
+        #expect(abs(scores[1] - 385) < 1e-3)  // 1 + 4 + ... + 100
+        #expect(scorer.isOutOfDistribution(input).asArray(Bool.self) == [false, true])
+    }
+
+    @Test("Bundled uniform-box scorer is refused unless explicitly allowed")
+    func defaultScorerRequiresOptIn() throws {
+        #expect(throws: QLKNNError.self) {
+            try QLKNNOODScorer.loadDefault()
+        }
+        _ = try QLKNNOODScorer.loadDefault(allowUniformBox: true)
+    }
+
+    @Test("Bundled scorer accepts the center of the input box and flags its corner")
+    func defaultScorerFlagsCorner() throws {
+        let scorer = try QLKNNOODScorer.loadDefault(allowUniformBox: true)
+        let center = QLKNN.inputParameterNames.map { name -> Float in
+            let range = QLKNN.validRanges[name]!
+            return (range.lowerBound + range.upperBound) / 2
+        }
+        // Every input inside its range, but all at the same extreme corner
+        let corner: [Float] = [150, 150, 110, 110, 0.66, 40, 0.95, 2.5, 0.48, 1.0]
+
+        let scores = scorer.score(MLXArray(center + corner, [2, 10])).asArray(Float.self)
+        #expect(scores[0] < 1)
+        #expect(scores[1] > scorer.threshold)
+
+        var inputs: [String: MLXArray] = [:]
+        for (j, name) in QLKNN.inputParameterNames.enumerated() {
+            inputs[name] = MLXArray([center[j], corner[j]], [2])
+        }
+        let dictionaryScores = try scorer.score(inputs).asArray(Float.self)
+        #expect(abs(dictionaryScores[1] - scores[1]) < 1e-3)
+    }
+
+    @Test("Rejects malformed parameters and metadata without an ood entry")
+    func rejectsInvalidInputs() throws {
+        #expect(throws: QLKNNError.self) {
+            try QLKNNOODScorer(mean: [0, 0], whitening: [[1, 0], [0, 1]], threshold: 1)
+        }
+
+        let path = FileManager.default.temporaryDirectory
+            .appendingPathComponent("qlknn_no_ood_metadata.json").path
+        try Data(#"{"model_name": "qlknn_7_11"}"#.utf8).write(to: URL(fileURLWithPath: path))
+        defer { try? FileManager.default.removeItem(atPath: path) }
+
+        #expect(throws: QLKNNError.self) {
+            try QLKNNOODScorer.load(metadataPath: path)
+        }
+    }
+}
@@ -1,5 +1,6 @@
 import Testing
 import MLX
+import Foundation
 @testable import FusionSurrogates
 
 /// Tests for TORAXIntegration helper functions
@@ -699,6 +700,69 @@ struct TORAXIntegrationTests {
         }
     }
 
+    @Test("TORAX-head network matches combineFluxes of the full network")
+    func toraxHeadMatchesCombinedFluxes() throws {
+        guard let resourceURL = Bundle.module.url(
+            forResource: "qlknn_7_11_weights",
+            withExtension: "safetensors"
+        ) else {
+            throw QLKNNError.modelNotFound("SafeTensors file not found")
+        }
+
+        // Fold the sums into layer 10 as the converter's --torax-head does
+        let sources: [String: [String]] = [
+            "chi_ion": ["efiITG", "efiTEM"],
+            "chi_electron": ["efeITG", "efeTEM", "efeETG"],
+            "particle_flux": ["pfeITG", "pfeTEM"],
+            "growth_rate": ["gamma_max"]
+        ]
+        let combination = TORAXIntegration.headOutputNames.flatMap { head in
+            QLKNN.outputParameterNames.map { sources[head]!.contains($0) ? Float(1) : Float(0) }
+        }
+        let matrix = MLXArray(combination, [4, 8])
+
+        var weights = try MLX.loadArrays(url: resourceURL)
+        weights["_network.model.10.weight"] = matmul(matrix, weights["_network.model.10.weight"]!)
+        weights["_network.model.10.bias"] = matmul(matrix, weights["_network.model.10.bias"]!)
+
+        let url = FileManager.default.temporaryDirectory
+            .appendingPathComponent("qlknn_torax_\(UUID().uuidString).safetensors")
+        defer { try? FileManager.default.removeItem(at: url) }
+        try MLX.save(arrays: weights, url: url)
+
+        let head = try TORAXIntegration.loadHeadNetwork(weightsPath: url.path)
+        #expect(head.outputNames == TORAXIntegration.headOutputNames)
+        #expect(head.layer10.weight.shape == [4, 133])
+
+        let full = try QLKNNNetwork.loadDefault()
+        let inputs: [String: MLXArray] = Dictionary(uniqueKeysWithValues: zip(
+            QLKNN.inputParameterNames,
+            [Float(6.0), 6.0, 2.0, 2.0, 2.5, 1.5, 0.4, 1.2, -1.0, 1.0].map { MLXArray([$0, $0 * 0.8], [2]) }
+        ))
+
+        let expected = TORAXIntegration.combineFluxes(try full.predict(inputs))
+        let actual = TORAXIntegration.combineFluxes(try head.predict(inputs))
+        for name in TORAXIntegration.headOutputNames {
+            let reference = try #require(expected[name])
+            let folded = try #require(actual[name])
+            let scale = abs(reference).max().item(Float.self) + 1
+            #expect(abs(folded - reference).max().item(Float.self) < 1e-5 * scale, "\(name) differs")
+        }
+        #expect(actual["particle_diffusivity"] != nil)
+        #expect(actual["convection_velocity"] != nil)
+    }
+
+    @Test("Output names must match the output layer width")
+    func outputNamesMismatchThrows() throws {
+        let network = try QLKNNNetwork.loadDefault()
+        let weights = Dictionary(uniqueKeysWithValues: network.parameters().flattened().map {
+            ("_network.model.\($0.0.dropFirst("layer".count))", $0.1)
+        })
+        #expect(throws: QLKNNError.self) {
+            try QLKNNNetwork.load(weights: weights, outputNames: TORAXIntegration.headOutputNames)
+        }
+    }
+
     @Test("gradient computation numerical stability")
     func gradientNumericalStability() {
         // Test with non-uniform grid spacing
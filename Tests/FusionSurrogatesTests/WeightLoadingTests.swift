@@ -128,6 +128,120 @@ struct WeightLoadingTests {
         #expect(networkParams["layer10.bias"]?.shape == [8])
     }
 
+    @Test("Network dimensions are inferred from weight shapes")
+    func loadInfersDimensionsFromWeights() throws {
+        // Narrow converted model: 10 -> 16 -> ... -> 4
+        var arrays: [String: MLXArray] = [:]
+        let shapes: [(Int, Int)] = [(16, 10), (16, 16), (16, 16), (16, 16), (16, 16), (4, 16)]
+        for (index, shape) in zip(QLKNNNetwork.onnxLayerIndices, shapes) {
+            arrays["_network.model.\(index).weight"] = MLXRandom.normal([shape.0, shape.1])
+            arrays["_network.model.\(index).bias"] = MLXArray.zeros([shape.0])
+        }
+
+        let url = FileManager.default.temporaryDirectory
+            .appendingPathComponent("qlknn_narrow_\(UUID().uuidString).safetensors")
+        defer { try? FileManager.default.removeItem(at: url) }
+        try MLX.save(arrays: arrays, url: url)
+
+        let network = try QLKNNNetwork.load(weightsPath: url.path)
+        #expect(network.layer0.weight.shape == [16, 10])
+        #expect(network.layer4.weight.shape == [16, 16])
+        #expect(network.layer10.weight.shape == [4, 16])
+
+        let output = network(MLXArray.zeros([3, 10]))
+        #expect(output.shape == [3, 4])
+
+        // A missing tensor is reported instead of crashing
+        arrays.removeValue(forKey: "_network.model.6.bias")
+        try MLX.save(arrays: arrays, url: url)
+        #expect(throws: QLKNNError.self) {
+            try QLKNNNetwork.load(weightsPath: url.path)
+        }
+    }
+
+    @Test("Packed blob loads the same weights as SafeTensors")
+    func packedBlobMatchesSafeTensors() throws {
+        guard let resourceURL = Bundle.module.url(
+            forResource: "qlknn_7_11_weights",
+            withExtension: "safetensors"
+        ) else {
+            throw QLKNNError.modelNotFound("SafeTensors file not found")
+        }
+
+        let weights = try MLX.loadArrays(url: resourceURL)
+
+        // Write a packed blob the way the converter's --packed mode does
+        var blob = Data()
+        var tensors: [String: Any] = [:]
+        for key in weights.keys.sorted() {
+            let array = weights[key]!
+            eval(array)
+            blob.append(Data(count: (64 - blob.count % 64) % 64))
+            tensors[key] = ["offset": blob.count, "shape": array.shape]
+            array.asArray(Float.self).withUnsafeBytes { blob.append(contentsOf: $0) }
+        }
+        let metadata: [String: Any] = [
+            "packed": ["alignment": 64, "dtype": "float32", "size": blob.count, "tensors": tensors]
+        ]
+
+        let directory = FileManager.default.temporaryDirectory
+            .appendingPathComponent("qlknn_packed_\(UUID().uuidString)")
+        try FileManager.default.createDirectory(at: directory, withIntermediateDirectories: true)
+        defer { try? FileManager.default.removeItem(at: directory) }
+
+        let blobURL = directory.appendingPathComponent("qlknn_7_11_packed.bin")
+        try blob.write(to: blobURL)
+        try JSONSerialization.data(withJSONObject: metadata)
+            .write(to: directory.appendingPathComponent("qlknn_7_11_metadata.json"))
+
+        let packed = try ModelLoader.load(path: blobURL.path)
+        #expect(packed.count == weights.count)
+        for (key, array) in weights {
+            let loaded = try #require(packed[key], "Missing packed tensor: \(key)")
+            #expect(loaded.shape == array.shape)
+            #expect(allClose(loaded, array).item(Bool.self), "\(key) differs after packing")
+        }
+
+        let network = try QLKNNNetwork.load(weightsPath: blobURL.path)
+        #expect(network.layer10.weight.shape == [8, 133])
+    }
+
+    @Test("Half-precision weight files load and stay close to float32")
+    func halfPrecisionWeightsLoad() throws {
+        guard let resourceURL = Bundle.module.url(
+            forResource: "qlknn_7_11_weights",
+            withExtension: "safetensors"
+        ) else {
+            throw QLKNNError.modelNotFound("SafeTensors file not found")
+        }
+
+        let weights = try MLX.loadArrays(url: resourceURL)
+        let reference = try QLKNNNetwork.load(weightsPath: resourceURL.path)
+        let input = MLXArray(
+            [Float(5.0), 5.0, 1.0, 1.0, 2.0, 1.0, 0.3, 1.0, -1.0, 1.0,
+             8.0, 6.0, 2.0, 2.0, 1.5, 0.8, 0.5, 1.2, -2.0, 0.9],
+            [2, 10]
+        )
+        let expected = reference(input)
+        let scale = abs(expected).max().item(Float.self) + 1
+
+        // (dtype, tolerance relative to the output scale) as written by the converter's --precision
+        for (dtype, tolerance) in [(DType.float16, Float(0.02)), (DType.bfloat16, Float(0.1))] {
+            let url = FileManager.default.temporaryDirectory
+                .appendingPathComponent("qlknn_\(dtype)_\(UUID().uuidString).safetensors")
+            defer { try? FileManager.default.removeItem(at: url) }
+            try MLX.save(arrays: weights.mapValues { $0.asType(dtype) }, url: url)
+
+            let network = try QLKNNNetwork.load(weightsPath: url.path)
+            #expect(network.layer0.weight.dtype == dtype)
+
+            let output = network(input)
+            #expect(output.dtype == .float32, "float32 inputs should promote the \(dtype) weights")
+            let error = abs(output - expected).max().item(Float.self)
+            #expect(error <= tolerance * scale, "\(dtype) max error \(error) exceeds \(tolerance * scale)")
+        }
+    }
+
     @Test("Loaded weights contain finite values")
     func weightsAreFinite() throws {
         guard let resourceURL = Bundle.module.url(